@@ -26,7 +26,6 @@ from gvas.utils.logger import LoggingMixin
 ##########################################################################
 
 SEND_LATENCY     = 1
-PERSISTENCE_COST = settings.defaults.actors.persistence_cost
 
 ##########################################################################
 ## Actor Program
@@ -72,8 +71,9 @@ class ActorProgram(Program, LoggingMixin):
         """
         On activation hydrate the actor to start listening for messages.
         """
-        self.logger.info("ACTOR: ID: {}, ACTIVATING".format(self.id))
+        self.logger.info("ACTOR: ID: %s, ACTIVATING", self.id)
         self.active  = True
+        self.manager.registry.update(self)
         self.hydrate.succeed()
         self.hydrate = None
 
@@ -81,18 +81,20 @@ class ActorProgram(Program, LoggingMixin):
         """
         On deactivation, dehydrate the actor to stop listening for messages.
         """
-        self.logger.info("ACTOR: ID: {}, DEACTIVATING".format(self.id))
+        self.logger.info("ACTOR: ID: %s, DEACTIVATING", self.id)
         self.active  = False
         self.hydrate = self.env.event()
+        self.manager.registry.update(self)
         yield self.hydrate
 
     def listen(self):
         """
         Listen for an incomming message
         """
-        self.logger.info("ACTOR: ID: {}, LISTENING".format(self.id))
+        self.logger.info("ACTOR: ID: %s, LISTENING", self.id)
         self.ready = True
         self.message = self.env.event()
+        self.manager.registry.update(self)
         value = yield self.message
         self.env.exit(value)
 
@@ -106,12 +108,15 @@ class ActorProgram(Program, LoggingMixin):
         """
         Fixed time cost for writing to the database.
         """
-        yield self.env.timeout(PERSISTENCE_COST)
+        yield self.env.timeout(settings.defaults.actors.persistence_cost)
 
     def send(self, message):
         """
         Sends messages using the actor manager.
         """
+        if message.src is None and self.manager.policy.local:
+            message.src = self.address
+
         yield self.env.timeout(SEND_LATENCY)
         self.manager.route(message)
 
@@ -119,12 +124,27 @@ class ActorProgram(Program, LoggingMixin):
         """
         Called on receipt of a message from the node.
         """
-        self.logger.info("ACTOR: ID: {}, RECV".format(self.id))
+        self.logger.info("ACTOR: ID: %s, RECV", self.id)
         self.ready = False
+        self.manager.registry.update(self)
         self.message.succeed(value)
         self.message = None
         self.handle(value)
 
+    def serialize(self):
+        """
+        Returns the state of the actor, e.g. for checkpoints.
+        """
+        return {
+            'id': self.id,
+            'type': self.__class__.__name__,
+            'node': self.node.id if self.node is not None else None,
+            'active': self.active,
+            'ready': self.ready,
+            'color': getattr(self, 'color', None),
+            'outbox': len(self.outbox),
+        }
+
     def run(self):
         """
         Primary execution loop of the simulated program. This loop essentially
@@ -17,18 +17,11 @@ The blue actor programs for simulating actor behavor on the cluster.
 ## Imports
 ##########################################################################
 
-import random
-
 from gvas.config import settings
+from gvas.dynamo import substream
 from .base import ActorProgram
 from gvas.cluster.network import Message
 
-##########################################################################
-## Module Constants
-##########################################################################
-
-MESSAGE_SIZE            = settings.simulations.communications.message_size
-
 ##########################################################################
 ## Actor Programs
 ##########################################################################
@@ -47,6 +40,7 @@ maybe go in three-four colors
 
     def __init__(self, *args, **kwargs):
         self.color = 'blue'
+        self.message_size = settings.simulations.communications.message_size
         super(BlueActor, self).__init__(*args, **kwargs)
 
     def next_color(self):
@@ -60,12 +54,12 @@ maybe go in three-four colors
             return self.colors[index + 1]
 
     def handle(self, message):
-        self.logger.info("ACTOR: ID: {}, WORKING ({})".format(self.id, message.color))
+        self.logger.info("ACTOR: ID: %s, WORKING (%s)", self.id, message.color)
         yield self.env.timeout(0)
 
         # add to outbox
         color = self.next_color()
         if color:
-            for i in range(random.randint(0, 2)):
-                msg = Message(None, None, 1, MESSAGE_SIZE, self.env.now, color)
+            for i in range(substream(self.env, 'actors').randint(0, 2)):
+                msg = Message(None, None, 1, self.message_size, self.env.now, color)
                 self.outbox.append(msg)
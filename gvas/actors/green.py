@@ -17,18 +17,10 @@ The green actor programs for simulating actor behavor on the cluster.
 ## Imports
 ##########################################################################
 
-import random
-
 from gvas.config import settings
 from .base import ActorProgram
 from gvas.cluster.network import Message
 
-##########################################################################
-## Module Constants
-##########################################################################
-
-MESSAGE_SIZE            = settings.simulations.communications.message_size
-
 ##########################################################################
 ## Actor Programs
 ##########################################################################
@@ -46,6 +38,7 @@ class GreenActor(ActorProgram):
 
     def __init__(self, *args, **kwargs):
         self.color = self.colors[0]
+        self.message_size = settings.simulations.communications.message_size
         super(GreenActor, self).__init__(*args, **kwargs)
 
     def next_color(self):
@@ -60,22 +53,22 @@ class GreenActor(ActorProgram):
 
     def _handle_green(self, message):
         for i in range(2):
-            msg = Message(None, None, 3, MESSAGE_SIZE, self.env.now, 'forest')
+            msg = Message(None, None, 3, self.message_size, self.env.now, 'forest')
             self.outbox.append(msg)
 
     def _handle_forest(self, message):
         if message.value > 1:
-            msg = Message(None, None, message.value - 1, MESSAGE_SIZE, self.env.now, 'forest')
+            msg = Message(None, None, message.value - 1, self.message_size, self.env.now, 'forest')
             self.outbox.append(msg)
         else:
-            msg = Message(None, None, 1, MESSAGE_SIZE, self.env.now, 'seagreen')
+            msg = Message(None, None, 1, self.message_size, self.env.now, 'seagreen')
             self.outbox.append(msg)
 
     def _handle_seagreen(self, message):
         pass
 
     def handle(self, message):
-        self.logger.info("ACTOR: ID: {}, WORKING ({})".format(self.id, message.color))
+        self.logger.info("ACTOR: ID: %s, WORKING (%s)", self.id, message.color)
         yield self.env.timeout(0)
 
         color = message.color
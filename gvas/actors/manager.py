@@ -17,20 +17,39 @@ Service for generalized actors, performs load balancing and maintains stage.
 ## Imports
 ##########################################################################
 
+import math
+
 from collections import defaultdict
 
 from gvas.base import Process
 from gvas.config import settings
+from gvas.exceptions import UnknownType
 from gvas.utils.logger import LoggingMixin
+from .registry import ActorRegistry
+from .pool import MessagePool
+from .routing import ColorPolicy, create_policy
+from .scaling import create_autoscaler
+from peak.util.imports import lazyModule
 
-from collections import deque
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
 
 ##########################################################################
 ## Module Constants
 ##########################################################################
 
-DEACTIVATION_BUFFER     = settings.simulations.balance.deactivation_buffer
-QUEUE_LAG               = settings.simulations.balance.queue_lag
+# How the manager dispatches queued messages: every timestep ("poll") or
+# whenever an actor becomes available or inactive ("event").
+DISPATCH = ('poll', 'event')
+
+# The settings of the routing policy, which is rebuilt if any change.
+ROUTING = ('routing', 'routing_replicas')
+
+# The settings of the autoscaler, which is rebuilt if any change.
+AUTOSCALING = (
+    'autoscaler', 'autoscale_target', 'autoscale_alpha', 'autoscale_setpoint',
+    'autoscale_gains', 'autoscale_base', 'autoscale_cooldown', 'autoscale_tolerance',
+)
 
 ##########################################################################
 ## Actor Manager
@@ -41,27 +60,91 @@ class ActorManager(Process, LoggingMixin):
     The primary router and actor service for actor simulations.
     """
 
+    # The simulations settings the manager reads (see the conf property)
+    section = "balance"
+
     def __init__(self, env, cluster):
         self.activations_requested = 0
         self.route_count = 0
         self.cluster = cluster  # The actor manager is a master process on the cluster
-        self.queue   = deque()  # The message queue if there are no available actors
+        self.queue   = MessagePool()  # The message queue if there are no available actors
+        self.registry = ActorRegistry(ranking=self.actors)  # Live indices of actor state
+        self.wakeup  = None     # The event the dispatcher waits on (event dispatch)
+        self.policy  = None     # Chooses the actor to route messages to
+        self.routing = None     # The settings the policy was created with
+        self.autoscaler = None  # Decides how many actors to keep active
+        self.scaling = None     # The settings the autoscaler was created with
+
+        # The dispatch mode cannot be changed during a run
+        self.dispatch_mode = self.conf.dispatch
+        if self.dispatch_mode not in DISPATCH:
+            raise UnknownType(
+                "{!r} is not a dispatch mode, use one of {}".format(
+                    self.dispatch_mode, ", ".join(DISPATCH)
+                )
+            )
+        if self.dispatch_mode == 'event':
+            self.registry.callbacks.append(self.notify)
+
         super(ActorManager, self).__init__(env)
+        self.reconfigure()
+
+    @property
+    def conf(self):
+        """
+        The settings of the manager's simulation, e.g. `simulations.balance`.
+        """
+        return getattr(settings.simulations, self.section)
+
+    def reconfigure(self):
+        """
+        Reads the balancing settings, which may be changed during a run.
+        """
+        conf = self.conf
+        self.deactivation_buffer = conf.deactivation_buffer
+        self.queue_lag = conf.queue_lag
+        self.balance_interval = conf.balance_interval
+
+        routing = [getattr(conf, key) for key in ROUTING]
+        if routing != self.routing:
+            self.routing = routing
+            self.configure_policy()
+
+        # A new autoscaler starts without the history of the old one.
+        scaling = [getattr(conf, key) for key in AUTOSCALING]
+        if scaling != self.scaling:
+            self.scaling = scaling
+            self.autoscaler = create_autoscaler(self)
+
+    def configure_policy(self):
+        """
+        Replaces the routing policy with a new one for the current settings,
+        indexing every registered actor.
+        """
+        if self.policy is not None:
+            self.registry.callbacks.remove(self.policy.update)
+
+        self.policy = self.create_policy()
+        self.registry.callbacks.append(self.policy.update)
+        for actor in self.registry:
+            self.policy.update(actor)
+
+    def create_policy(self):
+        """
+        Returns a routing policy for the current settings.
+        """
+        return create_policy(self)
 
     def _balance_up(self):
         """
         Activates inactive actors
         """
-        self.logger.info("MANAGER: ACTIVATIONS REQUESTED: {}".format(self.activations_requested))
+        self.logger.info("MANAGER: ACTIVATIONS REQUESTED: %s", self.activations_requested)
 
         if self.activations_requested:
-            # get a list of inactive programs
-            inactive = self.filter(lambda a: not a.active)
-
             # activate half of what was requested
             total = self.activations_requested / 2
-            for i in range(min(len(inactive), total)):
-                actor = inactive[i]
+            for actor in self.registry.first(self.registry.inactive, total):
                 actor.activate()
 
             # reset counter
@@ -74,17 +157,17 @@ class ActorManager(Process, LoggingMixin):
         if the queue is empty; deactivate actors that haven't been routed to,
         less the number of routes we had this timestep + some buffer (like 5 maybe)
         """
-        self.logger.info("MANAGER: DEACTIVATION PHASE".format())
+        self.logger.info("MANAGER: DEACTIVATION PHASE")
 
         self.logger.info(len(self.queue))
         if not self.queue:
-            ready = self.filter(lambda a: a.ready)
-            ready_count = len(ready)
-            total_to_deactivate = ready_count - self.route_count + DEACTIVATION_BUFFER
+            ready_count = len(self.registry.ready)
+            total_to_deactivate = ready_count - self.route_count + self.deactivation_buffer
+            total_to_deactivate = max(min(total_to_deactivate, ready_count), 0)
 
-            self.logger.info("MANAGER: DEACTIVATING {}".format(min(total_to_deactivate, ready_count)))
-            for i in range(min(total_to_deactivate, ready_count)):
-                self.env.process(ready[i].deactivate())
+            self.logger.info("MANAGER: DEACTIVATING %s", total_to_deactivate)
+            for actor in self.registry.first(self.registry.ready, total_to_deactivate):
+                self.env.process(actor.deactivate())
 
         self.route_count = 0
 
@@ -93,46 +176,202 @@ class ActorManager(Process, LoggingMixin):
         Attempts to activate or deactivate the number of actors as needed.
         """
         # activate/deactivate actors as needed
-        if self.activations_requested:
-            self._balance_up()
-        else:
-            self._balance_down()
+        self.autoscaler.balance()
+
+    def activate(self, count):
+        """
+        Activates up to count inactive actors.
+        """
+        self.logger.info("MANAGER: ACTIVATING %s", count)
+        for actor in self.registry.first(self.registry.inactive, count):
+            actor.activate()
+
+    def deactivate(self, count):
+        """
+        Deactivates up to count available (idle) actors.
+        """
+        self.logger.info("MANAGER: DEACTIVATING %s", count)
+        for actor in self.registry.first(self.registry.available, count):
+            self.env.process(actor.deactivate())
+
+    def reset(self):
+        """
+        Resets the activation requests and routes counted between balances.
+        """
+        self.activations_requested = 0
+        self.route_count = 0
+
+    @property
+    def active_count(self):
+        """
+        The number of active actors.
+        """
+        return len(self.registry) - len(self.registry.inactive)
+
+    @property
+    def busy_count(self):
+        """
+        The number of active actors that are handling a message.
+        """
+        return self.active_count - len(self.registry.available)
+
+    def dispatch(self, reverse=False):
+        """
+        Go through the queue (in reverse), routing the messages that are "old"
+        enough to available actors. The messages that are sent are removed
+        from the queue and the rest are left where they are. Routing a
+        message that cannot be sent to an available actor would only request
+        an activation and requeue it, so those messages are accounted for in
+        bulk by skip rather than routed one at a time, and the walk stops as
+        soon as no actor is available.
+        """
+        queue = self.queue
+        if reverse:
+            queue.reverse()
+
+        # Availability
+        self.policy.reset()
+        if not queue:
+            return
+
+        queue.flush()
+        routable = queue.column('sent') < self.env.now - self.queue_lag
+        colors   = queue.column('color')
+        skipped  = routable.copy()
+        sent     = []
+
+        for position in np.flatnonzero(routable & self.candidates(colors)).tolist():
+            if not self.registry.available:
+                break
+
+            message = queue.message(queue.row(position))
+            if not self.accepts(message):
+                continue
+
+            skipped[position] = False
+            self.route(message)
+            if message.dst is None:
+                # The message was requeued, keep it where it was.
+                queue.pop()
+            else:
+                sent.append(position)
+
+        self.skip(colors[skipped])
+        queue.remove(sent)
+
+    def notify(self, actor=None):
+        """
+        Wakes the dispatcher, called by the registry when an actor becomes
+        available or inactive, e.g. on listen, activation or deactivation.
+        """
+        if actor is not None and actor.active and not actor.ready:
+            return
+
+        if self.wakeup is not None and not self.wakeup.triggered:
+            self.wakeup.succeed()
+
+    def enqueue(self, message):
+        """
+        Queues a message that could not be routed.
+        """
+        message.dst = None
+        self.queue.append(message)
+
+        # The dispatcher must wait for the message to be old enough.
+        if self.dispatch_mode == 'event' and not self.saturated:
+            self.notify()
 
     def run(self):
         """
-        Go through the queue, attempting to assign queued messages to nodes.
+        Returns the dispatch process for the dispatch mode.
+        """
+        if self.dispatch_mode == 'event':
+            self.env.process(self.balancer())
+            return self.dispatcher()
+        return self.poll()
+
+    def poll(self):
         """
+        Dispatches the queue in alternating order every timestep, and
+        balances the actors every balance interval.
+        """
+        step = 0
         while True:
+            self.dispatch(reverse=True)
 
-            # Create temporary queue
-            self.queue.reverse()
-            queue = list(self.queue)
-            self.queue.clear()
+            # Send deactivate message to actors if needed
+            if step % self.balance_interval == 0:
+                self.balance()
 
-            # Availability
-            self.available = self.get_available_actors()
+            step += 1
+            yield self.env.timeout(1)
 
-            for msg in queue:
-                # send messages if they are "old" enough
-                if msg.sent < self.env.now - QUEUE_LAG:
-                    self.route(msg)
-                else:
-                    self.queue.append(msg)
+    def dispatcher(self):
+        """
+        Dispatches the queue oldest first whenever an actor becomes available
+        or inactive (and so could be routed to or activated), or a queued
+        message becomes old enough to route, rather than every timestep.
+        """
+        self.policy.reset()
+        while True:
+            if self.queue and not self.saturated:
+                self.dispatch()
 
-            # Send deactivate message to actors if needed
+            self.wakeup = self.env.event()
+            events = [self.wakeup]
+
+            # Wake up when the next queued message is old enough to route.
+            due = self.due()
+            if due is not None:
+                events.append(self.env.timeout(due - self.env.now))
+
+            yield self.env.any_of(events)
+
+    def due(self):
+        """
+        Returns the first time that a queued message that is not yet old
+        enough to route will be, or None if there is no such message or
+        no actor to route it to.
+        """
+        if not self.queue or self.saturated:
+            return None
+
+        cutoff = self.env.now - self.queue_lag
+        sent   = self.queue.column('sent')
+        young  = sent[sent >= cutoff]
+        if not len(young):
+            return None
+        return math.floor(young.min() + self.queue_lag) + 1
+
+    def balancer(self):
+        """
+        Balances the actors every balance interval (event dispatch).
+        """
+        while True:
             self.balance()
+            yield self.env.timeout(self.balance_interval)
 
-            yield self.env.timeout(1)
 
+    def serialize(self):
+        """
+        Returns the state of the manager, e.g. for checkpoints.
+        """
+        activations = self.activations_requested
+        if isinstance(activations, dict):
+            activations = dict(activations)
+
+        return {
+            'queue': list(self.queue),
+            'activations_requested': activations,
+            'route_count': self.route_count,
+        }
 
     def lookup(self, address):
         """
         Lookup an actor by address. Returns None if it cannot find an actor
         at the specified address.
         """
-        rack = self.cluster.racks.get(address.rack, {})
-        node = rack.nodes.get(address.node, {})
-        return node.programs.get(address.pid, None)
+        return self.cluster.addresses.lookup(address)
 
     def actors(self):
         """
@@ -148,21 +387,39 @@ class ActorManager(Process, LoggingMixin):
         """
         return filter(evaluator, self.actors())
 
-    def get_available_actors(self):
+    @property
+    def saturated(self):
         """
-        Select the next available actor in the cluster
+        True if there are no available or inactive actors, in which case no
+        message can be routed (or request an activation) until an actor is
+        ready again.
         """
-        while True:
-            # Phase one: look for an active and ready actor
-            for actor in self.filter(lambda a: a.active and a.ready):
-                yield actor
+        return not self.registry.available and not self.registry.inactive
+
+    def accepts(self, message):
+        """
+        True if the message could be sent to an available actor. Actors only
+        lose availability while the queue is being dispatched, so a message
+        that isn't accepted is skipped.
+        """
+        return bool(self.registry.available)
 
-            # Otherwise we need to activate an actor
-            for actor in self.filter(lambda a: not a.active):
-                yield actor
+    def candidates(self, colors):
+        """
+        Returns a mask of the queued messages, given their color codes, that
+        could be sent to an available actor.
+        """
+        return np.repeat(bool(self.registry.available), len(colors))
 
-            # No actors are available at all!
-            yield None
+    def skip(self, colors):
+        """
+        Accounts for routing the queued messages with the color codes that
+        could not be sent to an available actor without routing them: each
+        would have requested the activation of the inactive actor the policy
+        selects (if any) and been requeued.
+        """
+        self.route_count += len(colors)
+        self.activations_requested += self.policy.skip(len(colors))
 
     def route(self, message):
         """
@@ -175,9 +432,9 @@ class ActorManager(Process, LoggingMixin):
 
         # Find an available actor
         if message.dst is None:
-            actor = self.available.next()
+            actor = self.policy.select(message)
             if actor is not None:
-                message = message._replace(dst=actor.address)
+                message.dst = actor.address
 
         # attempt to send the message
         if message.dst is not None:
@@ -195,7 +452,8 @@ class ActorManager(Process, LoggingMixin):
 
                 # Mark actor as queued and send the message
                 actor.ready = False
-                self.logger.info("MANAGER: SENDING TO {}".format(actor.id))
+                self.registry.update(actor)
+                self.logger.info("MANAGER: SENDING TO %s", actor.id)
                 return source.send(message)
 
             if not actor.active:
@@ -205,12 +463,13 @@ class ActorManager(Process, LoggingMixin):
 
         # We could do nothing, so queue the message
         self.logger.info("MANAGER: QUEUEING MESSAGE")
-        message = message._replace(dst=None)
-        self.queue.append(message)
+        self.enqueue(message)
 
 
 class CommunicationsManager(ActorManager):
 
+    section = "communications"
+
     def __init__(self, env, cluster):
         super(CommunicationsManager, self).__init__(env, cluster)
         self.activations_requested = defaultdict(int)
@@ -223,11 +482,14 @@ class CommunicationsManager(ActorManager):
         count = 0
         self.logger.info("BALANCE UP")
         if self.activations_requested:
+            # at most one actor is switched or activated per request
+            total = sum(self.activations_requested.itervalues())
+
             # query for ready but may not be correct color
-            ready = self.filter(lambda a: a.active and a.ready)
+            ready = self.registry.last(self.registry.available, total)
 
             # query for inactive
-            inactive = self.filter(lambda a: not a.active)
+            inactive = self.registry.last(self.registry.inactive, total)
 
             # loop through requested activations by color
             for color, amount in self.activations_requested.iteritems():
@@ -235,7 +497,8 @@ class CommunicationsManager(ActorManager):
                     if ready:
                         actor = ready.pop()
                         actor.color = color
-                        self.logger.info("MANAGER: SWITCHING COLORS: {} ({})".format(actor.id, color))
+                        self.registry.update(actor)
+                        self.logger.info("MANAGER: SWITCHING COLORS: %s (%s)", actor.id, color)
                     elif inactive:
                         # only activate every other request
                         count += 1
@@ -243,26 +506,73 @@ class CommunicationsManager(ActorManager):
                         if True:
                             actor = inactive.pop()
                             actor.color = color
-                            self.logger.info("MANAGER: ACTIVATING: {} ({})".format(actor.id, color))
+                            self.logger.info("MANAGER: ACTIVATING: %s (%s)", actor.id, color)
                             actor.activate()
 
             # reset counter
             self.activations_requested = defaultdict(int)
 
-    def get_available_actor(self, color):
+    def create_policy(self):
+        """
+        Returns a routing policy that routes messages to actors of their color.
+        """
+        return ColorPolicy(self)
+
+    def activate(self, count):
         """
-        Select the next available actor in the cluster
+        Activates up to count inactive actors, switching them to the colors
+        with the most requested activations first.
         """
-        # Phase one: look for an active and ready actor
-        for actor in self.filter(lambda a: a.active and a.ready and a.color == color):
-            return actor
+        colors = sorted(
+            self.activations_requested.iteritems(), key=lambda item: (-item[1], item[0])
+        )
+        colors = [color for color, amount in colors for _ in xrange(amount)]
+
+        for idx, actor in enumerate(self.registry.first(self.registry.inactive, count)):
+            if colors:
+                actor.color = colors[idx % len(colors)]
+            self.logger.info("MANAGER: ACTIVATING: %s (%s)", actor.id, actor.color)
+            actor.activate()
+
+    def reset(self):
+        """
+        Resets the activation requests and routes counted between balances.
+        """
+        self.activations_requested = defaultdict(int)
+        self.route_count = 0
+
+    def accepts(self, message):
+        """
+        True if there is an available actor of the color of the message.
+        """
+        return bool(self.registry.colors.get(message.color))
 
-        # Otherwise we need to activate an actor
-        for actor in self.filter(lambda a: not a.active):
-            return actor
+    def candidates(self, colors):
+        """
+        Returns a mask of the queued messages, given their color codes, whose
+        color has available actors.
+        """
+        available = self.registry.colors
+        codes = [
+            code for symbol, code in self.queue.codes.iteritems()
+            if available.get(symbol)
+        ]
+        return np.in1d(colors, codes)
+
+    def skip(self, colors):
+        """
+        Accounts for routing the queued messages with the color codes that
+        could not be sent to an available actor without routing them: each
+        would have requested the activation of an inactive actor for its
+        color (if there are any) and been requeued.
+        """
+        self.route_count += len(colors)
+        self.policy.skip(len(colors))
 
-        # No actors are available at all!
-        return None
+        if self.registry.inactive and len(colors):
+            counts = np.bincount(colors)
+            for code in np.flatnonzero(counts).tolist():
+                self.activations_requested[self.queue.symbols[code]] += int(counts[code])
 
     def route(self, message):
         """
@@ -275,9 +585,9 @@ class CommunicationsManager(ActorManager):
 
         # Find an available actor
         if message.dst is None:
-            actor = self.get_available_actor(message.color)
+            actor = self.policy.select(message)
             if actor is not None:
-                message = message._replace(dst=actor.address)
+                message.dst = actor.address
 
         # attempt to send the message
         if message.dst is not None:
@@ -295,7 +605,8 @@ class CommunicationsManager(ActorManager):
 
                 # Mark actor as queued and send the message
                 actor.ready = False
-                self.logger.info("MANAGER: SENDING TO {} ({})".format(actor.id, message.color))
+                self.registry.update(actor)
+                self.logger.info("MANAGER: SENDING TO %s (%s)", actor.id, message.color)
                 return source.send(message)
 
             if not actor.active:
@@ -304,6 +615,5 @@ class CommunicationsManager(ActorManager):
                 self.activations_requested[message.color] += 1
 
         # We could do nothing, so queue the message
-        self.logger.info("MANAGER: QUEUEING MESSAGE ({})".format(message.color))
-        message = message._replace(dst=None)
-        self.queue.append(message)
+        self.logger.info("MANAGER: QUEUEING MESSAGE (%s)", message.color)
+        self.enqueue(message)
@@ -0,0 +1,300 @@
+# gvas.actors.pool
+# A compact, array-backed pool of the messages queued by the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Wed Jan 27 10:22:41 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: pool.py [] benjamin@bengfort.com $
+
+"""
+A compact, array-backed pool of the messages queued by the actor manager.
+
+Rather than a deque of message objects, the pool is a ring buffer of rows in
+a numpy structured array, so a queued message costs a few dozen bytes and the
+manager can select the messages that are old enough to route with a single
+vectorized comparison. The source and color of a message are interned as
+small integer codes, its size and sent time (whole numbers, since simulation
+time advances in whole timesteps) are stored as integers, and its value is
+stored as the Python object itself so that it comes back out unchanged.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+from gvas.cluster.network import Message
+from peak.util.imports import lazyModule
+
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Initial number of rows in the ring buffer, which doubles as needed.
+CAPACITY = 1024
+
+# The columns of a queued message; src and color are interned codes.
+COLUMNS = [
+    ('src', 'i4'),
+    ('value', 'O'),
+    ('size', 'i8'),
+    ('sent', 'i8'),
+    ('color', 'i4'),
+]
+
+##########################################################################
+## Message Pool
+##########################################################################
+
+class MessagePool(object):
+    """
+    A ring buffer of queued messages (whose destination is always None)
+    with O(1) append, pop, popleft and reverse, and bulk take and extend of
+    rows. Single appends are staged as tuples and written to the buffer in
+    bulk. Rows are addressed by their position in the pool (from the front)
+    and the pool is reversed by flipping which end of the buffer is its
+    front, so reversing it moves no rows.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.rows    = np.zeros(max(capacity, 1), dtype=COLUMNS)
+        self.head    = 0        # index of the first row in the buffer
+        self.count   = 0        # number of rows in the buffer
+        self.flipped = False    # if True the front of the pool is the last row
+        self.staged  = []       # appended rows not yet in the buffer
+        self.symbols = [None]   # code -> interned source or color
+        self.codes   = {None: 0}
+
+    @property
+    def capacity(self):
+        return len(self.rows)
+
+    def intern(self, symbol):
+        """
+        Returns the code of the source address or color.
+        """
+        code = self.codes.get(symbol)
+        if code is None:
+            code = self.codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+        return code
+
+    def message(self, row):
+        """
+        Returns a new message from a row of the pool.
+        """
+        src, value, size, sent, color = row.item()
+        return Message(self.symbols[src], None, value, size, sent, self.symbols[color])
+
+    def messages(self, rows):
+        """
+        Returns a list of new messages from the rows of the pool.
+        """
+        symbols = self.symbols
+        return [
+            Message(symbols[src], None, value, size, sent, symbols[color])
+            for src, value, size, sent, color in rows.tolist()
+        ]
+
+    def index(self, positions):
+        """
+        Returns the buffer indices of the rows at the positions in the pool.
+        """
+        if self.flipped:
+            return (self.head + self.count - 1 - positions) % self.capacity
+        return (self.head + positions) % self.capacity
+
+    def row(self, position):
+        """
+        Returns the row at the position in the pool (not counting staged rows).
+        """
+        return self.rows[self.index(position)]
+
+    def segments(self):
+        """
+        Returns views of the rows in the buffer, in the order of the pool, as
+        at most two contiguous (or reversed) slices of the buffer.
+        """
+        end = self.head + self.count
+        segments = [self.rows[self.head:min(end, self.capacity)]]
+        if end > self.capacity:
+            segments.append(self.rows[:end - self.capacity])
+
+        if self.flipped:
+            segments = [segment[::-1] for segment in reversed(segments)]
+        return segments
+
+    def reserve(self, count):
+        """
+        Grows the buffer to hold at least count rows, laying the rows out
+        from the start of the new buffer.
+        """
+        if count <= self.capacity:
+            return
+
+        capacity = self.capacity
+        while capacity < count:
+            capacity *= 2
+
+        rows  = np.zeros(capacity, dtype=COLUMNS)
+        count = self.count
+        if count:
+            rows[:count] = np.concatenate(self.segments())
+        self.rows, self.head, self.count, self.flipped = rows, 0, count, False
+
+    def append(self, message):
+        """
+        Adds a message to the end of the pool. Raises a ValueError if the
+        size or sent time of the message is not a whole number.
+        """
+        size, sent = message.size, message.sent
+        if int(size) != size or int(sent) != sent:
+            raise ValueError(
+                "cannot queue a message of size {!r} sent at {!r}, both must "
+                "be whole numbers".format(size, sent)
+            )
+
+        codes = self.codes
+        src   = codes.get(message.src)
+        color = codes.get(message.color)
+
+        self.staged.append((
+            src if src is not None else self.intern(message.src),
+            message.value, int(size), int(sent),
+            color if color is not None else self.intern(message.color),
+        ))
+
+        if len(self.staged) >= CAPACITY:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the staged rows to the buffer.
+        """
+        if self.staged:
+            staged, self.staged = self.staged, []
+            self.write(np.array(staged, dtype=COLUMNS))
+
+    def extend(self, rows):
+        """
+        Adds the rows (e.g. a slice of rows taken from the pool) to the end
+        of the pool in bulk.
+        """
+        self.flush()
+        self.write(rows)
+
+    def write(self, rows):
+        if not len(rows):
+            return
+
+        self.reserve(self.count + len(rows))
+        if self.flipped:
+            # The end of the pool is before the head of the buffer.
+            self.head = (self.head - len(rows)) % self.capacity
+            rows = rows[::-1]
+        start = (self.head + self.count) % self.capacity if not self.flipped else self.head
+        split = min(len(rows), self.capacity - start)
+        self.rows[start:start + split] = rows[:split]
+        self.rows[:len(rows) - split] = rows[split:]
+        self.count += len(rows)
+
+    def popleft(self):
+        """
+        Removes and returns the message at the front of the pool.
+        """
+        self.flush()
+        if not self.count:
+            raise IndexError("pop from an empty message pool")
+
+        message = self.message(self.row(0))
+        self.drop(1)
+        return message
+
+    def pop(self):
+        """
+        Removes and returns the message at the end of the pool, e.g. the
+        message that was just appended.
+        """
+        if self.staged:
+            src, value, size, sent, color = self.staged.pop()
+            return Message(self.symbols[src], None, value, size, sent, self.symbols[color])
+
+        if not self.count:
+            raise IndexError("pop from an empty message pool")
+
+        message = self.message(self.row(self.count - 1))
+        self.count -= 1
+        if self.flipped:
+            self.head = (self.head + 1) % self.capacity
+        return message
+
+    def drop(self, count):
+        """
+        Removes count rows from the front of the pool.
+        """
+        if not self.flipped:
+            self.head = (self.head + count) % self.capacity
+        self.count -= count
+
+    def remove(self, positions):
+        """
+        Removes the rows at the (sorted) positions in the pool, moving the
+        rows in front of them back to fill the gaps, so that it costs as much
+        as the last position rather than the length of the pool.
+        """
+        if not len(positions):
+            return
+
+        self.flush()
+        positions = np.asarray(positions)
+        index = self.index(np.arange(positions[-1] + 1))
+        keep  = np.ones(len(index), dtype=bool)
+        keep[positions] = False
+
+        self.rows[index[len(positions):]] = self.rows[index[keep]]
+        self.drop(len(positions))
+
+    def reverse(self):
+        """
+        Reverses the order of the messages in the pool.
+        """
+        self.flush()
+        self.flipped = not self.flipped
+
+    def take(self, reverse=False):
+        """
+        Removes every row from the pool and returns them as a contiguous
+        array, in the reverse order they were added if reverse is True.
+        """
+        self.flush()
+        rows = np.concatenate(self.segments()) if self.count else self.rows[:0].copy()
+
+        self.clear()
+        return rows[::-1] if reverse else rows
+
+    def column(self, name):
+        """
+        Returns a copy of the named column of the rows in the pool, in order.
+        """
+        self.flush()
+        return np.concatenate([segment[name] for segment in self.segments()])
+
+    def clear(self):
+        self.head    = 0
+        self.count   = 0
+        self.flipped = False
+        self.staged  = []
+
+    def __len__(self):
+        return self.count + len(self.staged)
+
+    def __iter__(self):
+        self.flush()
+        for segment in self.segments():
+            for message in self.messages(segment):
+                yield message
@@ -17,18 +17,10 @@ The red actor programs for simulating actor behavor on the cluster.
 ## Imports
 ##########################################################################
 
-import random
-
 from gvas.config import settings
 from .base import ActorProgram
 from gvas.cluster.network import Message
 
-##########################################################################
-## Module Constants
-##########################################################################
-
-MESSAGE_SIZE            = settings.simulations.communications.message_size
-
 ##########################################################################
 ## Actor Programs
 ##########################################################################
@@ -42,6 +34,7 @@ class RedActor(ActorProgram):
 
     def __init__(self, *args, **kwargs):
         self.color = self.colors[0]
+        self.message_size = settings.simulations.communications.message_size
         super(RedActor, self).__init__(*args, **kwargs)
 
     def next_color(self):
@@ -56,24 +49,24 @@ class RedActor(ActorProgram):
 
     def _handle_red(self, message):
         for i in range(4):
-            msg = Message(None, None, 1, MESSAGE_SIZE, self.env.now, 'magenta')
+            msg = Message(None, None, 1, self.message_size, self.env.now, 'magenta')
             self.outbox.append(msg)
 
     def _handle_magenta(self, message):
         for i in range(2):
-            msg = Message(None, None, 1, MESSAGE_SIZE, self.env.now, 'crimson')
+            msg = Message(None, None, 1, self.message_size, self.env.now, 'crimson')
             self.outbox.append(msg)
 
     def _handle_crimson(self, message):
         for i in range(3):
-            msg = Message(None, None, 1, MESSAGE_SIZE, self.env.now, 'apple')
+            msg = Message(None, None, 1, self.message_size, self.env.now, 'apple')
             self.outbox.append(msg)
 
     def _handle_apple(self, message):
         pass
 
     def handle(self, message):
-        self.logger.info("ACTOR: ID: {}, WORKING ({})".format(self.id, message.color))
+        self.logger.info("ACTOR: ID: %s, WORKING (%s)", self.id, message.color)
         yield self.env.timeout(0)
 
         color = message.color
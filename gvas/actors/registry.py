@@ -0,0 +1,240 @@
+# gvas.actors.registry
+# Live indices of actor state maintained for the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 11 14:02:17 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: registry.py [] benjamin@bengfort.com $
+
+"""
+Live indices of actor state maintained for the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+from itertools import islice
+from collections import defaultdict
+
+##########################################################################
+## Actor Index
+##########################################################################
+
+class ActorIndex(dict):
+    """
+    A dictionary of actor id to actor that iterates over the actors in the
+    order of their rank in the registry rather than in hash order, so that
+    selecting the first actors of an index is the same as filtering the
+    cluster. Actors must be added and discarded with add and discard, and
+    the index must not be changed while it is being iterated over.
+
+    The ranks of the indexed actors are counted in a binary indexed (Fenwick)
+    tree so that adding or discarding an actor and finding the actor at any
+    position of the order each take O(log n) steps, and iterating over the
+    first (or last) k actors takes O(k log n) steps.
+    """
+
+    def __init__(self, ranks):
+        super(ActorIndex, self).__init__()
+        self.ranks = ranks  # The rank of each actor by id (shared)
+        self.slots = {}     # The id of each indexed actor by rank
+        self.tree  = [0]    # The counts of the indexed ranks (one-based)
+
+    def add(self, actor):
+        key = actor.id
+        if key not in self:
+            rank = self.ranks[key]
+            self._count(rank, 1)
+            self.slots[rank] = key
+        self[key] = actor
+
+    def discard(self, key):
+        if key in self:
+            del self[key]
+            rank = self.ranks[key]
+            del self.slots[rank]
+            self._count(rank, -1)
+
+    def _count(self, rank, delta):
+        """
+        Adds delta to the count of the rank, growing the tree to fit it.
+        """
+        if rank >= len(self.tree) - 1:
+            self._grow(rank + 1)
+
+        tree = self.tree
+        pos  = rank + 1
+        while pos < len(tree):
+            tree[pos] += delta
+            pos += pos & -pos
+
+    def _grow(self, size):
+        """
+        Rebuilds the tree with a power of two capacity of at least size.
+        """
+        capacity = 1
+        while capacity < size:
+            capacity *= 2
+
+        tree = [0] * (capacity + 1)
+        for rank in self.slots:
+            tree[rank + 1] += 1
+
+        for pos in xrange(1, capacity + 1):
+            parent = pos + (pos & -pos)
+            if parent <= capacity:
+                tree[parent] += tree[pos]
+        self.tree = tree
+
+    def _select(self, k):
+        """
+        Returns the id of the actor at position k (from zero) of the order.
+        """
+        tree = self.tree
+        pos  = 0
+        step = len(tree) - 1
+        while step:
+            if pos + step < len(tree) and tree[pos + step] <= k:
+                pos += step
+                k   -= tree[pos]
+            step //= 2
+        return self.slots[pos]
+
+    def __iter__(self):
+        return (self._select(k) for k in xrange(len(self)))
+
+    def __reversed__(self):
+        return (self._select(k) for k in xrange(len(self) - 1, -1, -1))
+
+    iterkeys = __iter__
+
+    def itervalues(self):
+        return (self[key] for key in self)
+
+    def iteritems(self):
+        return ((key, self[key]) for key in self)
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def values(self):
+        return list(self.itervalues())
+
+    def items(self):
+        return list(self.iteritems())
+
+##########################################################################
+## Actor Registry
+##########################################################################
+
+class ActorRegistry(object):
+    """
+    Rather than walking every rack, node, and program in the cluster to find
+    actors in a particular state, the actor manager keeps a registry that is
+    updated by the actors themselves whenever their state changes. Each index
+    is a dictionary of actor id to actor so that membership changes are cheap
+    and iteration order is deterministic between runs.
+
+    Actors are added to the registry on their first state change, e.g. when
+    their process first deactivates at the start of the simulation. Each is
+    ranked by its position in the ranking (e.g. the order the manager walks
+    the cluster) or otherwise in the order it registered, and the indices
+    iterate over actors by rank. Every callback of the registry is called
+    with each actor that is updated, e.g. to maintain the index of a routing
+    policy.
+    """
+
+    def __init__(self, callbacks=None, ranking=None):
+        self.ranks     = {}                 # The rank of each actor by id
+        self.ranking   = ranking            # Returns all actors in rank order
+        self.actors    = self.index()       # All actors that have registered
+        self.available = self.index()       # Actors that are active and ready
+        self.inactive  = self.index()       # Actors that are not active
+        self.ready     = self.index()       # Actors that are ready (any state)
+        self.colors    = defaultdict(self.index)  # Available actors by their color
+        self._colors   = {}                 # The color each actor is indexed by
+        self.callbacks = list(callbacks or [])  # Called with updated actors
+
+    def index(self):
+        """
+        Returns a new, empty index of actors ordered by their rank.
+        """
+        return ActorIndex(self.ranks)
+
+    def update(self, actor):
+        """
+        Re-indexes the actor according to its current state. Must be called
+        any time the active, ready, or color attributes of an actor change.
+        """
+        key = actor.id
+        available = actor.active and actor.ready
+
+        if key not in self.actors:
+            self.rank(actor)
+
+        self.actors.add(actor)
+        self._index(self.ready, actor, actor.ready)
+        self._index(self.inactive, actor, not actor.active)
+        self._index(self.available, actor, available)
+
+        # Move the actor out of the index of its previous color.
+        color = getattr(actor, 'color', None)
+        if key in self._colors:
+            self.colors[self._colors.pop(key)].discard(key)
+
+        if available:
+            self.colors[color].add(actor)
+            self._colors[key] = color
+
+        for callback in self.callbacks:
+            callback(actor)
+
+    def rank(self, actor):
+        """
+        Ranks the actor, and every other unranked actor of the ranking, in
+        the order of the ranking or otherwise after all ranked actors.
+        """
+        if actor.id not in self.ranks and self.ranking is not None:
+            for other in self.ranking():
+                if other.id not in self.ranks:
+                    self.ranks[other.id] = len(self.ranks)
+
+        if actor.id not in self.ranks:
+            self.ranks[actor.id] = len(self.ranks)
+
+    def first(self, index, n=None):
+        """
+        Returns a list of (at most) the first n actors in the given index, or
+        all of the actors in the index if n is None. The list is a snapshot
+        so actors can safely change state while it is being iterated over.
+        """
+        return list(islice(index.itervalues(), n))
+
+    def last(self, index, n=None):
+        """
+        Returns a list of (at most) the last n actors in the given index in
+        rank order, or all of the actors in the index if n is None. Like
+        first, the list is a snapshot of the index.
+        """
+        actors = [index[key] for key in islice(reversed(index), n)]
+        actors.reverse()
+        return actors
+
+    def _index(self, index, actor, member):
+        """
+        Adds or removes the actor from the index based on membership.
+        """
+        if member:
+            index.add(actor)
+        else:
+            index.discard(actor.id)
+
+    def __len__(self):
+        return len(self.actors)
+
+    def __iter__(self):
+        return self.actors.itervalues()
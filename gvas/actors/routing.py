@@ -0,0 +1,495 @@
+# gvas.actors.routing
+# Policies the actor manager uses to pick the actor to route a message to.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 29 09:52:17 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: routing.py [] benjamin@bengfort.com $
+
+"""
+Policies the actor manager uses to pick the actor to route a message to.
+
+A policy selects an available (active and ready) actor for a message with no
+destination, or an inactive actor if none is available so that the manager
+requests an activation, or None. Except for the default "first" policy, which
+walks the indices of the registry, each policy keeps its own index of the
+available actors up to date from the registry so that selecting an actor
+does not walk the cluster. The manager calls the update method of its policy
+with every actor the registry updates (and every registered actor when the
+policy is created during a run).
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import heapq
+import hashlib
+
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+from gvas.dynamo import substream
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# The phases of the walk of the first policy.
+AVAILABLE = "available"
+INACTIVE  = "inactive"
+
+##########################################################################
+## Routing Policies
+##########################################################################
+
+class RoutingPolicy(object):
+    """
+    Base class of routing policies, which choose among available actors.
+    """
+
+    # If True, actors put their own address on messages they send so that
+    # the policy can route by where the message came from.
+    local = False
+
+    def __init__(self, manager, **options):
+        self.manager = manager
+
+    def update(self, actor):
+        """
+        Registry callback, called with every actor whose state changes.
+        """
+        pass
+
+    def select(self, message):
+        """
+        Returns the actor to route the message to: the chosen available
+        actor, otherwise an inactive actor to activate, otherwise None.
+        """
+        actor = self.choose(message)
+        if actor is None:
+            actor = next(self.manager.registry.inactive.itervalues(), None)
+        return actor
+
+    def choose(self, message):
+        """
+        Returns an available actor for the message or None.
+        """
+        raise NotImplementedError("Routing policies must choose an actor.")
+
+    def skip(self, count):
+        """
+        Called when count messages were requeued without being routed
+        because no actor was available to send them to. Returns the number
+        of them that would have been routed to an inactive actor.
+        """
+        return count if self.manager.registry.inactive else 0
+
+    def reset(self):
+        """
+        Called before the manager dispatches its queue.
+        """
+        pass
+
+
+class FirstPolicy(RoutingPolicy):
+    """
+    The original routing of the manager, which walks a snapshot of the
+    available actors, then a snapshot of the inactive actors, then returns
+    None, and starts over with new snapshots. Each snapshot is taken when the
+    walk reaches it and the walk is restarted before every dispatch, so an
+    actor in a snapshot may no longer be available when it is routed to.
+    """
+
+    def __init__(self, manager, **options):
+        super(FirstPolicy, self).__init__(manager, **options)
+        self.reset()
+
+    def reset(self):
+        self.phase  = AVAILABLE
+        self.actors = None  # the snapshot of the phase, taken when reached
+        self.cursor = 0     # the position of the walk in the snapshot
+
+    def snapshot(self):
+        registry = self.manager.registry
+        index = registry.available if self.phase == AVAILABLE else registry.inactive
+        self.actors = registry.first(index)
+        self.cursor = 0
+
+    def advance(self):
+        """
+        Moves the walk on to the next phase, returning False if the walk has
+        reached its end (where it returns None) and starts over.
+        """
+        self.actors = None
+        if self.phase == AVAILABLE:
+            self.phase = INACTIVE
+            return True
+
+        self.phase = AVAILABLE
+        return False
+
+    def select(self, message):
+        while True:
+            if self.actors is None:
+                self.snapshot()
+
+            if self.cursor < len(self.actors):
+                self.cursor += 1
+                return self.actors[self.cursor - 1]
+
+            if not self.advance():
+                return None
+
+    def skip(self, count):
+        # Each skipped message would have taken the next actor of the walk,
+        # or None at the end of the walk, after which the walk starts over.
+        # No actor changes state while messages are skipped, so every walk
+        # after the first takes the same actors and is skipped as a whole.
+        taken = 0
+        while count > 0:
+            if self.actors is None:
+                self.snapshot()
+
+            step = min(count, len(self.actors) - self.cursor)
+            self.cursor += step
+            count -= step
+            taken += step
+
+            if count and not self.advance():
+                count -= 1  # None at the end of the walk
+                registry = self.manager.registry
+                walk = len(registry.available) + len(registry.inactive)
+                walks, count = divmod(count, walk + 1)
+                taken += walks * walk
+        return taken
+
+
+class IndexedPolicy(RoutingPolicy):
+    """
+    Base class of policies that index the available actors, which are added
+    and removed as the registry updates them. If the policy has a color it
+    only indexes the available actors of that color.
+    """
+
+    def __init__(self, manager, **options):
+        super(IndexedPolicy, self).__init__(manager, **options)
+        self.indexed = {}   # available actors by id
+        self.color   = options.get('color')
+
+    def update(self, actor):
+        """
+        Indexes the actor if it is available.
+        """
+        available = actor.active and actor.ready
+        if self.color is not None:
+            available = available and actor.color == self.color
+        if available and actor.id not in self.indexed:
+            self.indexed[actor.id] = actor
+            self.add(actor)
+        elif not available and actor.id in self.indexed:
+            del self.indexed[actor.id]
+            self.remove(actor)
+
+    def add(self, actor):
+        pass
+
+    def remove(self, actor):
+        pass
+
+
+class RoundRobinPolicy(IndexedPolicy):
+    """
+    Routes to the available actors in turn, by id, from a sorted index.
+    """
+
+    def __init__(self, manager, **options):
+        super(RoundRobinPolicy, self).__init__(manager, **options)
+        self.ids    = []    # sorted ids of the available actors
+        self.cursor = -1    # the id of the last actor routed to
+
+    def add(self, actor):
+        insort(self.ids, actor.id)
+
+    def remove(self, actor):
+        del self.ids[bisect_left(self.ids, actor.id)]
+
+    def choose(self, message):
+        if not self.ids:
+            return None
+
+        idx = bisect_right(self.ids, self.cursor)
+        self.cursor = self.ids[idx if idx < len(self.ids) else 0]
+        return self.indexed[self.cursor]
+
+
+class LoadPolicy(IndexedPolicy):
+    """
+    Base class of policies that track the load of each node, the number of
+    its actors that are busy (active but not ready).
+    """
+
+    def __init__(self, manager, **options):
+        super(LoadPolicy, self).__init__(manager, **options)
+        self.load = defaultdict(int)    # node id -> busy actors
+        self.busy = set()               # ids of the busy actors
+
+    def update(self, actor):
+        busy = actor.active and not actor.ready
+        if busy != (actor.id in self.busy):
+            if busy:
+                self.busy.add(actor.id)
+            else:
+                self.busy.discard(actor.id)
+            self.load[actor.node.id] += 1 if busy else -1
+            self.loaded(actor.node)
+
+        super(LoadPolicy, self).update(actor)
+
+    def loaded(self, node):
+        """
+        Called when the load of the node changes.
+        """
+        pass
+
+
+class LeastLoadedPolicy(LoadPolicy):
+    """
+    Routes to an available actor on the node with the fewest busy actors,
+    found with a heap of (load, node) entries that are discarded lazily once
+    the load of the node changes or it has no available actors.
+    """
+
+    def __init__(self, manager, **options):
+        super(LeastLoadedPolicy, self).__init__(manager, **options)
+        self.nodes = defaultdict(dict)  # node id -> available actors by id
+        self.heap  = []
+
+    def push(self, node):
+        if len(self.heap) > 4 * len(self.nodes) + 64:
+            # Drop the stale entries before the heap grows without bound.
+            self.heap = [(self.load[nid], nid) for nid, actors in self.nodes.iteritems() if actors]
+            heapq.heapify(self.heap)
+        heapq.heappush(self.heap, (self.load[node.id], node.id))
+
+    def loaded(self, node):
+        if self.nodes.get(node.id):
+            self.push(node)
+
+    def add(self, actor):
+        self.nodes[actor.node.id][actor.id] = actor
+        self.push(actor.node)
+
+    def remove(self, actor):
+        self.nodes[actor.node.id].pop(actor.id, None)
+
+    def choose(self, message):
+        while self.heap:
+            load, nid = self.heap[0]
+            actors = self.nodes.get(nid)
+            if actors and load == self.load[nid]:
+                return next(actors.itervalues())
+            heapq.heappop(self.heap)
+        return None
+
+
+class PowerOfTwoPolicy(LoadPolicy):
+    """
+    Samples two available actors at random and routes to the one on the
+    node with fewer busy actors. The available actors are kept in a list
+    (with their positions) for O(1) sampling and removal.
+    """
+
+    def __init__(self, manager, **options):
+        super(PowerOfTwoPolicy, self).__init__(manager, **options)
+        self.actors    = []
+        self.positions = {}
+        self.random    = substream(manager.env, 'routing')
+
+    def add(self, actor):
+        self.positions[actor.id] = len(self.actors)
+        self.actors.append(actor)
+
+    def remove(self, actor):
+        # Swap the last actor into the position of the removed one.
+        idx  = self.positions.pop(actor.id)
+        last = self.actors.pop()
+        if last is not actor:
+            self.actors[idx] = last
+            self.positions[last.id] = idx
+
+    def choose(self, message):
+        if len(self.actors) < 2:
+            return self.actors[0] if self.actors else None
+
+        first, second = [self.actors[idx] for idx in self.random.sample(xrange(len(self.actors)), 2)]
+        if self.load[second.node.id] < self.load[first.node.id]:
+            return second
+        return first
+
+
+class RackLocalPolicy(IndexedPolicy):
+    """
+    Routes to an available actor on the rack the message was sent from to
+    avoid the egress latency between racks, otherwise (or for messages from
+    outside the cluster) on the first rack with an available actor.
+
+    Because the policy is local, actors put their own address on the
+    messages they send (see `ActorProgram.send`), which changes how those
+    messages travel: the manager sends them from the node of the sending
+    actor rather than from the rack of their destination, so they use the
+    bandwidth of the sending rack and pay the egress latency between racks.
+    """
+
+    local = True
+
+    def __init__(self, manager, **options):
+        super(RackLocalPolicy, self).__init__(manager, **options)
+        self.racks = defaultdict(dict)  # rack id -> available actors by id
+        self.order = []                 # sorted ids of the indexed racks
+
+    def add(self, actor):
+        rid = actor.node.rack.id
+        if rid not in self.racks:
+            insort(self.order, rid)
+        self.racks[rid][actor.id] = actor
+
+    def remove(self, actor):
+        self.racks[actor.node.rack.id].pop(actor.id, None)
+
+    def choose(self, message):
+        if message.src is not None:
+            actors = self.racks.get(message.src.rack)
+            if actors:
+                return next(actors.itervalues())
+
+        for rid in self.order:
+            if self.racks[rid]:
+                return next(self.racks[rid].itervalues())
+        return None
+
+
+class ConsistentHashPolicy(IndexedPolicy):
+    """
+    Routes messages by their key (the color of the message, or its value if
+    it has no color) to the actor that owns the key on a consistent hash
+    ring of every registered actor, or the next available actor clockwise
+    from it, so that messages with the same key go to the same actor while
+    it is available. Each actor has `routing_replicas` points on the ring.
+    Only the points of the available actors are kept on the ring, so the
+    owner of a key is found with a single bisection.
+    """
+
+    def __init__(self, manager, **options):
+        super(ConsistentHashPolicy, self).__init__(manager, **options)
+        self.replicas = options.get('replicas', manager.conf.routing_replicas)
+        self.ring     = []  # sorted (hash, actor id) points of the available actors
+        self.points   = {}  # the points of every actor by id
+
+    @staticmethod
+    def digest(key):
+        return int(hashlib.md5(str(key)).hexdigest()[:16], 16)
+
+    def key(self, message):
+        return message.color if message.color is not None else message.value
+
+    def add(self, actor):
+        points = self.points.get(actor.id)
+        if points is None:
+            points = self.points[actor.id] = [
+                (self.digest("{}:{}".format(actor.id, idx)), actor.id)
+                for idx in xrange(self.replicas)
+            ]
+
+        for point in points:
+            insort(self.ring, point)
+
+    def remove(self, actor):
+        for point in self.points[actor.id]:
+            del self.ring[bisect_left(self.ring, point)]
+
+    def choose(self, message):
+        if not self.ring:
+            return None
+
+        idx = bisect_left(self.ring, (self.digest(self.key(message)),))
+        return self.indexed[self.ring[idx if idx < len(self.ring) else 0][1]]
+
+
+class ColorPolicy(RoutingPolicy):
+    """
+    Routes each message to an actor of its color (the communications
+    simulation) with a policy of the configured kind for every color, which
+    only indexes the available actors of that color. The policy of a color
+    is created when the first message of the color is routed. The "first"
+    policy routes to the first available actor of the color in the registry.
+    """
+
+    def __init__(self, manager, policy=None, **options):
+        super(ColorPolicy, self).__init__(manager, **options)
+        self.klass    = policy_class(policy or manager.conf.routing)
+        self.local    = self.klass.local
+        self.options  = options
+        self.policies = {}  # color -> the policy of the actors of the color
+
+    def partition(self, color):
+        """
+        Returns the policy of the color, which indexes the registered actors
+        when it is created.
+        """
+        policy = self.policies.get(color)
+        if policy is None:
+            policy = self.klass(self.manager, color=color, **self.options)
+            self.policies[color] = policy
+            for actor in self.manager.registry:
+                policy.update(actor)
+        return policy
+
+    def update(self, actor):
+        # Every policy is updated so that one loses an actor that changes color.
+        for policy in self.policies.itervalues():
+            policy.update(actor)
+
+    def choose(self, message):
+        if self.klass is FirstPolicy:
+            actors = self.manager.registry.colors.get(message.color)
+            return next(actors.itervalues(), None) if actors else None
+        return self.partition(message.color).choose(message)
+
+##########################################################################
+## Routing Policy Registry
+##########################################################################
+
+POLICIES = {
+    'first': FirstPolicy,
+    'round-robin': RoundRobinPolicy,
+    'least-loaded': LeastLoadedPolicy,
+    'rack-local': RackLocalPolicy,
+    'power-of-two': PowerOfTwoPolicy,
+    'consistent-hash': ConsistentHashPolicy,
+}
+
+
+def policy_class(policy):
+    """
+    Returns the class of the named routing policy.
+    """
+    if policy not in POLICIES:
+        raise UnknownType(
+            "{!r} is not a routing policy, use one of {}".format(
+                policy, ", ".join(sorted(POLICIES))
+            )
+        )
+    return POLICIES[policy]
+
+
+def create_policy(manager, policy=None, **options):
+    """
+    Returns the routing policy named by the `routing` setting of the
+    manager's simulation, e.g. `simulations.balance.routing`.
+    """
+    return policy_class(policy or manager.conf.routing)(manager, **options)
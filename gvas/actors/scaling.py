@@ -0,0 +1,242 @@
+# gvas.actors.scaling
+# Autoscalers that decide how many actors the actor manager keeps active.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Feb 01 10:07:44 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: scaling.py [] benjamin@bengfort.com $
+
+"""
+Autoscalers that decide how many actors the actor manager keeps active.
+
+The manager balances its actors every balance interval by calling its
+autoscaler. Except for the default "heuristic" autoscaler, which applies the
+manager's own fixed heuristics, an autoscaler is a controller that observes
+the manager (the backlog, and the active and busy actors) and returns the
+number of actors that should be active, which the manager reaches by
+activating inactive actors or deactivating idle ones.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import math
+
+from confire import ImproperlyConfigured
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Autoscalers
+##########################################################################
+
+class Autoscaler(object):
+    """
+    Base class of autoscalers, which are controllers of the number of
+    active actors configured by the `autoscale_*` settings.
+    """
+
+    def __init__(self, manager, **options):
+        self.manager = manager
+
+    def target(self):
+        """
+        Returns the number of actors that should be active.
+        """
+        raise NotImplementedError("Autoscalers must have a target.")
+
+    def balance(self):
+        """
+        Activates or deactivates actors to reach the target, then resets the
+        requests and routes the manager counted since the last balance.
+        """
+        manager = self.manager
+        target  = max(0, min(int(self.target()), len(manager.registry)))
+        delta   = target - manager.active_count
+
+        if delta > 0:
+            manager.activate(delta)
+        elif delta < 0:
+            manager.deactivate(-delta)
+
+        manager.reset()
+        return delta
+
+
+class HeuristicAutoscaler(Autoscaler):
+    """
+    Activates half of the requested activations if there were any, otherwise
+    deactivates the ready actors that weren't routed to, less a buffer (the
+    original balancing of the manager).
+    """
+
+    def target(self):
+        return self.manager.active_count
+
+    def balance(self):
+        if self.manager.activations_requested:
+            self.manager._balance_up()
+        else:
+            self.manager._balance_down()
+
+
+class PIDAutoscaler(Autoscaler):
+    """
+    A PID controller of the backlog: the error is the backlog less the
+    `autoscale_setpoint`, and the output of the controller with the
+    (proportional, integral, derivative) `autoscale_gains` is the number of
+    actors to keep active beyond the busy ones. The integral is clamped so
+    its term never exceeds the number of actors (anti-windup).
+    """
+
+    def __init__(self, manager, **options):
+        super(PIDAutoscaler, self).__init__(manager, **options)
+        conf = manager.conf
+        self.setpoint = options.get('setpoint', conf.autoscale_setpoint)
+        self.kp, self.ki, self.kd = options.get('gains', conf.autoscale_gains)
+        if self.ki < 0:
+            raise ImproperlyConfigured(
+                "The integral gain of the PID autoscaler must not be negative."
+            )
+
+        self.integral = 0.0
+        self.error    = None
+
+    def target(self):
+        manager = self.manager
+        error   = len(manager.queue) - self.setpoint
+        dt      = manager.balance_interval
+
+        self.integral += error * dt
+        if self.ki:
+            limit = len(manager.registry) / float(self.ki)
+            self.integral = max(-limit, min(self.integral, limit))
+
+        derivative = (error - self.error) / float(dt) if self.error is not None else 0.0
+        self.error = error
+
+        output = self.kp * error + self.ki * self.integral + self.kd * derivative
+        return manager.busy_count + int(round(output))
+
+
+class TargetUtilizationAutoscaler(Autoscaler):
+    """
+    Keeps the utilization of the active actors, the busy actors plus the
+    backlog (one actor's worth of work per message) over the active actors,
+    at `autoscale_target`.
+    """
+
+    def __init__(self, manager, **options):
+        super(TargetUtilizationAutoscaler, self).__init__(manager, **options)
+        self.utilization = options.get('utilization', manager.conf.autoscale_target)
+        if self.utilization <= 0:
+            raise ImproperlyConfigured(
+                "The target utilization of the autoscaler must be positive."
+            )
+
+    def load(self):
+        """
+        The number of actors the busy actors and the backlog could keep busy.
+        """
+        return self.manager.busy_count + len(self.manager.queue)
+
+    def target(self):
+        return int(math.ceil(self.load() / self.utilization))
+
+
+class EWMAAutoscaler(TargetUtilizationAutoscaler):
+    """
+    Predicts the load as an exponentially weighted moving average, with the
+    weight `autoscale_alpha` on the latest load, and provisions for the
+    prediction at the target utilization.
+    """
+
+    def __init__(self, manager, **options):
+        super(EWMAAutoscaler, self).__init__(manager, **options)
+        self.alpha = options.get('alpha', manager.conf.autoscale_alpha)
+        if not 0 < self.alpha <= 1:
+            raise ImproperlyConfigured(
+                "The weight of the EWMA autoscaler must be in (0, 1]."
+            )
+
+        self.predicted = None
+
+    def target(self):
+        load = self.load()
+        if self.predicted is None:
+            self.predicted = float(load)
+        else:
+            self.predicted = self.alpha * load + (1 - self.alpha) * self.predicted
+        return int(math.ceil(self.predicted / self.utilization))
+
+
+class HysteresisAutoscaler(Autoscaler):
+    """
+    Damps another autoscaler (`autoscale_base`): changes within
+    `autoscale_tolerance` of the active actors are ignored, and after the
+    actors are scaled they aren't scaled up or down again until the (up,
+    down) `autoscale_cooldown` timesteps have passed. The damped autoscaler
+    must be a controller with a target of its own, the heuristic autoscaler
+    only keeps the active actors it has.
+    """
+
+    def __init__(self, manager, **options):
+        super(HysteresisAutoscaler, self).__init__(manager, **options)
+        conf = manager.conf
+        base = options.get('base', conf.autoscale_base)
+        if base in ('heuristic', 'hysteresis'):
+            raise ImproperlyConfigured(
+                "The hysteresis autoscaler cannot damp the {!r} autoscaler, "
+                "which has no target of its own.".format(base)
+            )
+
+        self.base = create_autoscaler(manager, base)
+        self.tolerance = options.get('tolerance', conf.autoscale_tolerance)
+        self.cooldown  = options.get('cooldown', conf.autoscale_cooldown)
+        self.scaled    = None   # when the actors were last scaled
+
+    def target(self):
+        active = self.manager.active_count
+        target = self.base.target()
+        delta  = target - active
+
+        if abs(delta) <= self.tolerance * active:
+            return active
+
+        if self.scaled is not None:
+            cooldown = self.cooldown[0] if delta > 0 else self.cooldown[1]
+            if self.manager.env.now - self.scaled < cooldown:
+                return active
+
+        self.scaled = self.manager.env.now
+        return target
+
+##########################################################################
+## Autoscaler Registry
+##########################################################################
+
+AUTOSCALERS = {
+    'heuristic': HeuristicAutoscaler,
+    'pid': PIDAutoscaler,
+    'ewma': EWMAAutoscaler,
+    'target-utilization': TargetUtilizationAutoscaler,
+    'hysteresis': HysteresisAutoscaler,
+}
+
+
+def create_autoscaler(manager, autoscaler=None, **options):
+    """
+    Returns the autoscaler named by the `autoscaler` setting of the manager's
+    simulation, e.g. `simulations.balance.autoscaler`.
+    """
+    autoscaler = autoscaler or manager.conf.autoscaler
+    if autoscaler not in AUTOSCALERS:
+        raise UnknownType(
+            "{!r} is not an autoscaler, use one of {}".format(
+                autoscaler, ", ".join(sorted(AUTOSCALERS))
+            )
+        )
+    return AUTOSCALERS[autoscaler](manager, **options)
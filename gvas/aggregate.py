@@ -0,0 +1,205 @@
+# gvas.aggregate
+# Merges the results of replicated simulation runs into summary statistics.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 15 09:48:26 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: aggregate.py [] benjamin@bengfort.com $
+
+"""
+Merges the results of replicated simulation runs into summary statistics.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+from gvas.results import Results
+from peak.util.imports import lazyModule
+
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+PERCENTILES = (5, 25, 50, 75, 95)   # Percentiles reported for every metric
+RESERVOIR   = 100                   # Replicas sampled for the percentiles
+Z_SCORE     = 1.96                  # Normal approximation of a 95% interval
+
+##########################################################################
+## Metric Aggregate
+##########################################################################
+
+class MetricAggregate(object):
+    """
+    Per-timestep running statistics for a single metric across replicas. The
+    mean and variance are computed exactly with Welford's online algorithm,
+    while percentiles are computed from a uniform reservoir sample of at most
+    `reservoir` replicas (exact while there are fewer replicas than that), so
+    memory is bounded by the number of timesteps and not by the replicas.
+
+    Replicas may record different numbers of values for a metric, so counts
+    are kept per timestep and shorter replicas simply don't contribute to
+    the later timesteps.
+    """
+
+    def __init__(self, reservoir=RESERVOIR, random=None):
+        self.replicas  = 0
+        self.reservoir = reservoir
+        self.random    = random or np.random.RandomState()
+        self.count     = np.zeros(0, dtype=np.int64)
+        self.mean      = np.zeros(0)
+        self.sqdev     = np.zeros(0)
+        self.samples   = np.empty((0, 0))
+
+    def update(self, values):
+        """
+        Adds the values of a single replica to the running statistics.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        size   = len(values)
+        self.resize(size)
+
+        # Welford's online update of the mean and sum of squared deviations
+        self.count[:size] += 1
+        delta = values - self.mean[:size]
+        self.mean[:size]  += delta / self.count[:size]
+        self.sqdev[:size] += delta * (values - self.mean[:size])
+
+        # Reservoir sampling of entire replicas for the percentiles
+        if self.replicas < self.reservoir:
+            row = self.replicas
+        else:
+            row = self.random.randint(0, self.replicas + 1)
+
+        if row < self.reservoir:
+            if row >= self.samples.shape[0]:
+                self.samples = self.grow(self.samples, (row + 1, self.samples.shape[1]))
+            self.samples[row, :] = np.nan
+            self.samples[row, :size] = values
+
+        self.replicas += 1
+
+    def resize(self, size):
+        """
+        Grows the statistics to the given number of timesteps if needed.
+        """
+        if size <= len(self.mean):
+            return
+
+        self.count   = self.grow(self.count, (size,), 0)
+        self.mean    = self.grow(self.mean, (size,), 0.0)
+        self.sqdev   = self.grow(self.sqdev, (size,), 0.0)
+        self.samples = self.grow(self.samples, (self.samples.shape[0], size))
+
+    def grow(self, array, shape, fill=np.nan):
+        """
+        Returns a copy of the array grown to the shape, padded with fill.
+        """
+        grown = np.empty(shape, dtype=array.dtype)
+        grown.fill(fill)
+        grown[tuple(slice(0, dim) for dim in array.shape)] = array
+        return grown
+
+    @property
+    def stddev(self):
+        """
+        The per-timestep sample standard deviation (zero for a single value).
+        """
+        count = np.maximum(self.count - 1, 1)
+        return np.sqrt(self.sqdev / count)
+
+    def interval(self, z=Z_SCORE):
+        """
+        Returns the lower and upper bounds of the confidence interval of the
+        mean at each timestep using the normal approximation.
+        """
+        error = z * self.stddev / np.sqrt(np.maximum(self.count, 1))
+        return self.mean - error, self.mean + error
+
+    def percentile(self, q):
+        """
+        Returns the qth percentile at each timestep of the sampled replicas.
+        """
+        return np.nanpercentile(self.samples, q, axis=0)
+
+    def summary(self, percentiles=PERCENTILES, z=Z_SCORE):
+        """
+        Returns a dictionary of summary statistic name to per-timestep array.
+        """
+        lower, upper = self.interval(z)
+        summary = {
+            'mean': self.mean.copy(),
+            'stddev': self.stddev,
+            'lower': lower,
+            'upper': upper,
+            'count': self.count.copy(),
+        }
+
+        for q in percentiles:
+            summary['p{}'.format(q)] = self.percentile(q)
+
+        return summary
+
+##########################################################################
+## Results Aggregate
+##########################################################################
+
+class Aggregate(object):
+    """
+    Merges the results of many replicas of a simulation, one at a time, into
+    a `MetricAggregate` per result key so that replicas can be discarded as
+    soon as they have been added. The aggregate can be converted back into a
+    Results object whose columns are named "metric.statistic", e.g.
+    "utilization.mean" or "backlog.p95", to be dumped like any other run.
+    """
+
+    def __init__(self, percentiles=PERCENTILES, reservoir=RESERVOIR, seed=None):
+        self.percentiles = percentiles
+        self.reservoir   = reservoir
+        self.random      = np.random.RandomState(seed)
+        self.metrics     = {}
+        self.seeds       = []
+        self.header      = {}
+
+    def update(self, results):
+        """
+        Adds a replica's results to the aggregate.
+        """
+        for key, values in results.results.iteritems():
+            if key not in self.metrics:
+                self.metrics[key] = MetricAggregate(self.reservoir, self.random)
+            self.metrics[key].update(values)
+
+        self.seeds.append(getattr(results, 'randseed', None))
+        self.header = results.header()
+
+    def to_results(self):
+        """
+        Returns a Results object of the summary statistics of every metric.
+        """
+        data = dict(self.header)
+        data.pop('timer', None)
+        data.pop('randseed', None)
+        data.pop('overrides', None)
+
+        columns = {}
+        for key, metric in self.metrics.iteritems():
+            for stat, values in metric.summary(self.percentiles).iteritems():
+                columns["{}.{}".format(key, stat)] = values
+
+        data.update({
+            'replicas': len(self),
+            'seeds': sorted(self.seeds),
+            'percentiles': list(self.percentiles),
+        })
+
+        return Results(results=columns, **data)
+
+    def __len__(self):
+        return len(self.seeds)
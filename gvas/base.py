@@ -18,15 +18,35 @@ The base API for simulation processes and scripts.
 ##########################################################################
 
 import simpy
-import random
+import hashlib
 
 from datetime import datetime
 from gvas.config import settings
-from gvas.dynamo import Sequence
+from gvas.dynamo import Sequence, RandomStreams
 from gvas.results import Results
+from gvas.checkpoint import Checkpoint
 from gvas.utils.logger import LoggingMixin
 from gvas.utils.timez import HUMAN_DATETIME
 
+##########################################################################
+## Simulation Environment
+##########################################################################
+
+class Environment(simpy.Environment):
+    """
+    A simpy environment that carries the random streams of its simulation,
+    so that every process can draw from a seeded substream of the simulation
+    (see `gvas.dynamo.substream`) rather than the global random module. It
+    also carries the sequence that named processes are numbered from, so
+    that ids only depend on the simulation and not on any other simulation
+    that has run in the same Python process.
+    """
+
+    def __init__(self, initial_time=0, random_seed=None):
+        super(Environment, self).__init__(initial_time)
+        self.random  = RandomStreams(random_seed)
+        self.counter = Sequence()
+
 ##########################################################################
 ## Base Process Objects
 ##########################################################################
@@ -53,7 +73,8 @@ class NamedProcess(Process):
     counter = Sequence()
 
     def __init__(self, env):
-        self._id = self.counter.next()
+        counter  = getattr(env, 'counter', self.counter)
+        self._id = counter.next()
         super(NamedProcess, self).__init__(env)
 
     @property
@@ -74,10 +95,16 @@ class Simulation(LoggingMixin):
         """
         Instantiates the simpy environment and other configurations.
         """
-        random.seed(kwargs.get('random_seed', settings.random_seed))
-
+        self.random_seed  = kwargs.get('random_seed', settings.random_seed)
         self.max_sim_time = kwargs.get('max_sim_time', settings.max_sim_time)
-        self.env = simpy.Environment()
+
+        if settings.profiling.enabled:
+            from gvas.profiler import ProfiledEnvironment
+            self.env = ProfiledEnvironment(random_seed=self.random_seed)
+        else:
+            self.env = Environment(random_seed=self.random_seed)
+
+        self.random = self.env.random
 
     @property
     def diary(self):
@@ -86,7 +113,11 @@ class Simulation(LoggingMixin):
         attempts to auto-configure the results object before being loaded.
         """
         if not hasattr(self, '_diary'):
-            self._diary = Results(simulation=self.__class__.__name__)
+            self._diary = Results(
+                simulation=self.__class__.__name__,
+                randseed=self.random_seed,
+                timesteps=self.max_sim_time,
+            )
         return self._diary
 
     def script(self):
@@ -119,6 +150,65 @@ class Simulation(LoggingMixin):
 
         self.logger.info(message)
 
+        # Report the processes that dominated the run if it was profiled.
+        profiler = getattr(self.env, 'profiler', None)
+        if profiler is not None:
+            self.logger.info(profiler.summary(settings.profiling.top))
+            if settings.profiling.results:
+                self.diary.profile = profiler.report(settings.profiling.top)
+
+    def reconfigure(self):
+        """
+        Override to re-read any settings that may be changed in the middle of
+        a run, e.g. when a variant is forked from a checkpoint.
+        """
+        pass
+
+    def state(self):
+        """
+        Returns a JSON serializable description of the state of the running
+        simulation that is fingerprinted by checkpoints, so that a simulation
+        replayed to a checkpoint can be verified. Subclasses should extend
+        the state with their cluster, actors, and other processes.
+        """
+        return {
+            'now': self.env.now,
+            'random': dict(
+                (name, hashlib.md5(repr(stream.getstate())).hexdigest())
+                for name, stream in self.random.streams.iteritems()
+            ),
+            'events': sorted(
+                (time, priority, event.__class__.__name__)
+                for time, priority, eid, event in self.env._queue
+            ),
+            'results': self.diary.fingerprint(),
+        }
+
+    def checkpoint(self):
+        """
+        Writes a checkpoint of the simulation to the checkpoint directory and
+        returns the path to the checkpoint.
+        """
+        path = Checkpoint.create(self).save(settings.checkpoint.directory)
+        self.logger.info("Checkpoint written to %s", path)
+        return path
+
+    def advance(self, until):
+        """
+        Runs the simulation environment until the given timestep, writing a
+        checkpoint every `settings.checkpoint.interval` timesteps (if set).
+        """
+        interval = settings.checkpoint.interval
+        if interval:
+            checkpoint = (self.env.now // interval + 1) * interval
+            while checkpoint < until:
+                self.env.run(until=checkpoint)
+                self.checkpoint()
+                checkpoint += interval
+
+        if self.env.now < until:
+            self.env.run(until=until)
+
     def run(self):
         """
         The entry point for all simulations.
@@ -131,7 +221,7 @@ class Simulation(LoggingMixin):
 
             # Set up the simulation environment and run
             self.script()
-            self.env.run(until=self.max_sim_time)
+            self.advance(self.max_sim_time)
 
         # Call clean and completion functions
         self.complete()
@@ -0,0 +1,292 @@
+# gvas.bench
+# Benchmarks of the simulation engine with tracked throughput baselines.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 22 09:36:18 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: bench.py [] benjamin@bengfort.com $
+
+"""
+Benchmarks of the simulation engine with tracked throughput baselines.
+
+A benchmark suite (see `benchmarks/suite.yaml`) names the simulations to run
+and the scales to run them at, each a set of dotted setting overrides. Every
+simulation is run at every scale, one at a time, in a fresh process so that
+its peak memory usage can be measured. The throughput of each benchmark is
+compared against a baseline written by an earlier run to flag regressions.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import sys
+import json
+import yaml
+import gvas
+import platform
+import resource
+import multiprocessing
+
+from timeit import default_timer
+
+from gvas.config import settings, PROJECT
+from gvas.sweep import prepare
+from gvas.exceptions import BenchmarkError, UnknownSimulation
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# The default benchmark suite
+SUITE = os.path.join(PROJECT, "benchmarks", "suite.yaml")
+
+# Metrics compared against the baseline, and whether higher is better.
+METRICS = (
+    ('events_per_second', True),
+    ('messages_per_second', True),
+    ('wall_time', False),
+    ('peak_rss', False),
+)
+
+# The relative change in a metric that is flagged as a regression.
+TOLERANCE = 0.10
+
+##########################################################################
+## Benchmark Suite
+##########################################################################
+
+def load_suite(fp):
+    """
+    Loads a benchmark suite from a YAML file with the keys:
+
+        - simulations: the registered simulations to benchmark
+        - overrides: dotted setting overrides used by every benchmark
+        - scales: a mapping of scale name to dotted setting overrides
+
+    Returns a list of (simulation, scale, overrides) benchmarks.
+    """
+    from gvas.sims import registry
+
+    suite = yaml.safe_load(fp)
+    if not isinstance(suite, dict) or not suite.get('scales'):
+        raise BenchmarkError("A benchmark suite must be a mapping with scales.")
+
+    unknown = set(suite) - set(('simulations', 'overrides', 'scales'))
+    if unknown:
+        raise BenchmarkError(
+            "Unknown benchmark suite keys: {}".format(", ".join(sorted(unknown)))
+        )
+
+    simulations = suite.get('simulations') or sorted(registry)
+    for name in simulations:
+        if name not in registry:
+            raise UnknownSimulation('"{}" is not a valid simulation.'.format(name))
+
+    benchmarks = []
+    for name in simulations:
+        for scale in sorted(suite['scales']):
+            overrides = dict(suite.get('overrides') or {})
+            overrides.update(suite['scales'][scale] or {})
+            benchmarks.append((name, scale, overrides))
+
+    return benchmarks
+
+##########################################################################
+## Worker Process
+##########################################################################
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process in megabytes.
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss / 1048576.0  # bytes on OS X
+    return rss / 1024.0         # kilobytes on Linux
+
+
+def count_events(task):
+    """
+    Runs a benchmark in a fresh worker process in a profiled environment
+    (see `gvas.profiler`) and returns the number of events it processed.
+    A simulation is determined by its settings and seed, so every run of a
+    benchmark processes the same events and they are only counted once.
+    """
+    from gvas.sims import registry
+
+    name, scale, overrides = task
+    prepare(overrides)
+    settings.profiling.enabled = True
+
+    simulation = registry[name].klass()
+    simulation.run()
+    return simulation.env.profiler.events
+
+
+def run_benchmark(task, events=0):
+    """
+    Runs a single benchmark in a fresh worker process and returns a record
+    of its measurements. The simulation is not profiled, so that the wall
+    time does not include the overhead of profiling; the throughput is
+    computed from the events counted by `count_events`, if given.
+    """
+    from gvas.sims import registry
+
+    name, scale, overrides = task
+    prepare(overrides)
+    settings.profiling.enabled = False
+
+    simulation = registry[name].klass()
+    started = default_timer()
+    simulation.run()
+    elapsed = default_timer() - started
+
+    cluster = getattr(simulation, 'cluster', None)
+    messages = cluster.get_routed_count() if cluster is not None else 0
+
+    return {
+        'simulation': name,
+        'scale': scale,
+        'max_sim_time': simulation.max_sim_time,
+        'events': events,
+        'messages': messages,
+        'wall_time': elapsed,
+        'events_per_second': events / elapsed if elapsed else 0.0,
+        'messages_per_second': messages / elapsed if elapsed else 0.0,
+        'peak_rss': peak_rss(),
+    }
+
+##########################################################################
+## Benchmark Runner
+##########################################################################
+
+class Benchmark(object):
+    """
+    Runs every benchmark of a suite in turn, each in its own process (one
+    at a time, so that benchmarks don't compete for the cpu). The events of
+    each benchmark are counted in a profiled run, then it is repeated
+    without profiling and the fastest run is kept. Iterating over the
+    runner yields the record of each benchmark as it completes.
+    """
+
+    def __init__(self, benchmarks, repeat=1):
+        self.benchmarks = benchmarks
+        self.repeat     = max(repeat, 1)
+        self.records    = []
+
+    def __iter__(self):
+        pool = multiprocessing.Pool(1, maxtasksperchild=1)
+
+        try:
+            for task in self.benchmarks:
+                events = pool.apply(count_events, (task,))
+                best   = None
+                for _ in xrange(self.repeat):
+                    record = pool.apply(run_benchmark, (task, events))
+                    if best is None or record['wall_time'] < best['wall_time']:
+                        best = record
+
+                self.records.append(best)
+                yield best
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def __len__(self):
+        return len(self.benchmarks)
+
+    def serialize(self):
+        """
+        Returns the records along with the environment they were run in.
+        """
+        return {
+            'version': gvas.get_version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': self.repeat,
+            'benchmarks': self.records,
+        }
+
+    def dump(self, fp):
+        """
+        Writes the records to a file as JSON, e.g. to use as a baseline.
+        """
+        json.dump(self.serialize(), fp, indent=2, sort_keys=True)
+
+##########################################################################
+## Baseline Comparison
+##########################################################################
+
+def compare(records, baseline, tolerance=TOLERANCE):
+    """
+    Compares the records of a benchmark run with the records of a baseline
+    (as written by `Benchmark.dump`) and returns a list of the regressions
+    as (simulation, scale, metric, baseline, value, change) tuples, where
+    change is the relative change from the baseline.
+    """
+    previous = dict(
+        ((record['simulation'], record['scale']), record)
+        for record in baseline.get('benchmarks', [])
+    )
+
+    regressions = []
+    for record in records:
+        base = previous.get((record['simulation'], record['scale']))
+        if base is None:
+            continue
+
+        for metric, higher in METRICS:
+            if not base.get(metric):
+                continue
+
+            change = (record[metric] - base[metric]) / float(base[metric])
+            if (higher and change < -tolerance) or (not higher and change > tolerance):
+                regressions.append((
+                    record['simulation'], record['scale'], metric,
+                    base[metric], record[metric], change,
+                ))
+
+    return regressions
+
+
+def report(records, baseline=None):
+    """
+    Returns a table of the records, with the relative change in throughput
+    from the baseline if one is given.
+    """
+    previous = dict(
+        ((record['simulation'], record['scale']), record)
+        for record in (baseline or {}).get('benchmarks', [])
+    )
+
+    lines = [
+        "{:<16} {:<8} {:>10} {:>12} {:>12} {:>10} {:>10} {:>8}".format(
+            "simulation", "scale", "events", "events/sec", "msgs/sec",
+            "wall (s)", "rss (MB)", "change"
+        )
+    ]
+
+    for record in records:
+        base = previous.get((record['simulation'], record['scale']))
+        if base and base.get('events_per_second'):
+            change = "{:+0.1%}".format(
+                record['events_per_second'] / base['events_per_second'] - 1
+            )
+        else:
+            change = "-"
+
+        lines.append(
+            "{simulation:<16} {scale:<8} {events:>10,} {events_per_second:>12,.0f} "
+            "{messages_per_second:>12,.0f} {wall_time:>10.3f} {peak_rss:>10.1f} ".format(**record)
+            + "{:>8}".format(change)
+        )
+
+    return "\n".join(lines)
@@ -0,0 +1,205 @@
+# gvas.cache
+# A content-addressed local cache of simulation results.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Wed Jan 20 09:55:41 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: cache.py [] benjamin@bengfort.com $
+
+"""
+A content-addressed local cache of simulation results.
+
+Because a simulation is fully determined by its class, settings, random seed,
+and the version of the library, its results are cached under a key computed
+from those, so that an identical run (e.g. when a sweep is extended with more
+values) loads its results rather than running again. Runs that fork variants
+at a warmup timestep are keyed by the warmup and the variant as well.
+
+Only the results of whole runs are cached: no state of a simulation is ever
+stored (see `gvas.checkpoint` for why it cannot be), so a run that isn't
+cached is always simulated from the start. A new variant of a cached warmup
+recomputes the warmup, which is only shared by the variants forked from it
+within a single sweep, and a warmup is not run at all if all of its variants
+are cached.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import json
+import gvas
+import hashlib
+
+from gvas.config import settings
+from gvas.results import Results
+from gvas.checkpoint import configuration
+from gvas.utils.serialize import JSONEncoder
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Settings that have no effect on the results of a simulation.
+IGNORED_SETTINGS = ('logging', 'checkpoint', 'cache', 'profiling', 'vizualization')
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def merge(conf, overrides):
+    """
+    Returns a copy of the nested configuration dictionary updated with the
+    nested overrides.
+    """
+    conf = dict(conf)
+    for key, val in overrides.iteritems():
+        if isinstance(val, dict) and isinstance(conf.get(key), dict):
+            conf[key] = merge(conf[key], val)
+        else:
+            conf[key] = val
+    return conf
+
+
+def cache_key(simulation, conf=None, warmup=None, variant=None):
+    """
+    Returns the cache key of a run of the simulation class (or its dotted
+    path) with the nested configuration, which defaults to the current
+    settings. The key includes the random seed and max sim time because they
+    are part of the configuration. Returns None if there is no random seed,
+    since an unseeded run cannot be reproduced.
+    """
+    if not isinstance(simulation, basestring):
+        simulation = "{}.{}".format(simulation.__module__, simulation.__name__)
+
+    conf = dict(conf if conf is not None else configuration(settings))
+    if conf.get('random_seed') is None:
+        return None
+
+    for key in IGNORED_SETTINGS:
+        conf.pop(key, None)
+
+    data = json.dumps({
+        'simulation': simulation,
+        'settings': conf,
+        'warmup': warmup,
+        'variant': variant,
+        'version': gvas.get_version(),
+    }, cls=JSONEncoder, sort_keys=True)
+
+    return hashlib.sha1(data).hexdigest()
+
+##########################################################################
+## Results Cache
+##########################################################################
+
+class ResultsCache(object):
+    """
+    Stores the results of whole simulation runs as npz files named by their
+    key in a local directory. Entries are touched when they are read, and the
+    least recently used entries are evicted when the cache exceeds its size.
+    """
+
+    extension = ".npz"
+
+    def __init__(self, directory=None, max_size=None):
+        self.directory = os.path.expanduser(directory or settings.cache.directory)
+        self.max_size  = max_size if max_size is not None else settings.cache.max_size
+
+    def path(self, key):
+        """
+        Returns the path to the entry for the key.
+        """
+        return os.path.join(self.directory, key + self.extension)
+
+    def get(self, key):
+        """
+        Returns the cached results for the key or None if they aren't cached.
+        """
+        if key is None:
+            return None
+
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+
+        os.utime(path, None)
+        with open(path, 'rb') as fp:
+            return Results.load(fp)
+
+    def put(self, key, results):
+        """
+        Atomically writes the results into the cache, then evicts the least
+        recently used entries if the cache has grown beyond its size. Results
+        without a key are not cached.
+        """
+        if key is None:
+            return None
+
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+
+        path = self.path(key)
+        temp = "{}.{}.tmp{}".format(path[:-len(self.extension)], os.getpid(), self.extension)
+        with open(temp, 'wb') as fp:
+            results.dump(fp)
+        os.rename(temp, path)
+
+        self.evict()
+        return path
+
+    def entries(self):
+        """
+        Returns a list of (mtime, size, path) of the entries in the cache,
+        from the least to the most recently used.
+        """
+        if not os.path.exists(self.directory):
+            return []
+
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension) or ".tmp" in name:
+                continue
+
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        return sorted(entries)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache is within its
+        maximum size (in megabytes). Returns the number of entries removed.
+        """
+        entries = self.entries()
+        size    = sum(entry[1] for entry in entries)
+        limit   = self.max_size * 1024 * 1024
+        evicted = 0
+
+        for mtime, nbytes, path in entries:
+            if size <= limit:
+                break
+
+            os.remove(path)
+            size -= nbytes
+            evicted += 1
+
+        return evicted
+
+    def clear(self):
+        """
+        Removes every entry from the cache.
+        """
+        for mtime, nbytes, path in self.entries():
+            os.remove(path)
+
+    def __contains__(self, key):
+        return key is not None and os.path.exists(self.path(key))
+
+    def __len__(self):
+        return len(self.entries())
@@ -0,0 +1,276 @@
+# gvas.checkpoint
+# Checkpoints of running simulations that can be replayed and forked.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 18 10:21:04 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: checkpoint.py [] benjamin@bengfort.com $
+
+"""
+Checkpoints of running simulations that can be replayed and forked.
+
+The processes of a simulation are Python generators suspended in the simpy
+event queue, which cannot be pickled. Instead, because a simulation is fully
+determined by its settings and random seed, a checkpoint records those along
+with the results so far and a fingerprint of the state of the simulation
+(cluster, actors, manager queue, random streams, pending events, and the
+running digests of the results, so that fingerprinting a checkpoint only
+costs as much as the results recorded since the last one).
+
+A checkpoint is not a snapshot that a simulation can be restored from: none
+of the pending events, the manager queue, or the random states are stored.
+Instead the simulation is replayed from the start up to the checkpoint and
+verified against the fingerprint. Replaying costs as much as running the
+simulation up to the checkpoint again, so a checkpoint saves no computation
+across invocations. It only guarantees that the replayed simulation is the
+one that was checkpointed, and within a single invocation several variants
+can be forked from one replay so that they share its prefix.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import json
+import gvas
+import hashlib
+import traceback
+import multiprocessing
+
+from confire import Configuration
+from gvas.config import settings
+from gvas.results import Results
+from gvas.utils.serialize import JSONEncoder
+from gvas.exceptions import CheckpointError, CheckpointMismatch
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def configuration(conf):
+    """
+    Returns the options of a configuration as a nested dictionary.
+    """
+    return dict(
+        (key, configuration(val) if isinstance(val, Configuration) else val)
+        for key, val in conf.options()
+    )
+
+
+def fingerprint(state):
+    """
+    Returns a hex digest of the JSON serialized state of a simulation.
+    """
+    data = json.dumps(state, cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha1(data).hexdigest()
+
+
+def import_class(path):
+    """
+    Imports a class from its dotted path, e.g. "gvas.sims.BalanceSimulation".
+    """
+    module, name = path.rsplit(".", 1)
+    return getattr(__import__(module, fromlist=[name]), name)
+
+##########################################################################
+## Checkpoint
+##########################################################################
+
+class Checkpoint(object):
+    """
+    A checkpoint of a simulation at a timestep (before any of the events at
+    that timestep are processed), stored as JSON.
+    """
+
+    @classmethod
+    def create(klass, simulation):
+        """
+        Creates a checkpoint of the current state of a running simulation.
+        """
+        sclass = simulation.__class__
+        return klass(
+            simulation   = "{}.{}".format(sclass.__module__, sclass.__name__),
+            settings     = configuration(settings),
+            random_seed  = simulation.random_seed,
+            max_sim_time = simulation.max_sim_time,
+            now          = simulation.env.now,
+            digest       = fingerprint(simulation.state()),
+            header       = simulation.diary.header(),
+            results      = simulation.diary.results,
+        )
+
+    @classmethod
+    def load(klass, fp):
+        """
+        Loads a checkpoint from a JSON file.
+        """
+        return klass(**json.load(fp))
+
+    def __init__(self, **kwargs):
+        self.version = gvas.get_version()
+        self.header  = {}
+        self.results = {}
+
+        for key, val in kwargs.iteritems():
+            setattr(self, key, val)
+
+    def dump(self, fp):
+        """
+        Writes the checkpoint to a file as JSON.
+        """
+        json.dump(self.__dict__, fp, cls=JSONEncoder)
+
+    def save(self, directory):
+        """
+        Atomically writes the checkpoint into the directory, named by the
+        simulation, seed, and timestep, and returns the path it was saved to.
+        """
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        name = "{}-{}-{:08d}.json".format(
+            self.simulation.rsplit(".", 1)[-1], self.random_seed, int(self.now)
+        )
+        path = os.path.join(directory, name)
+
+        with open(path + ".tmp", 'w') as fp:
+            self.dump(fp)
+        os.rename(path + ".tmp", path)
+        return path
+
+    def replay(self, silent=True):
+        """
+        Reconfigures the settings from the checkpoint, then replays the
+        simulation from the start up to the checkpoint and verifies it.
+        Returns the replayed simulation, ready to be continued with `advance`.
+        Raises a CheckpointMismatch if the replay does not match the
+        checkpoint, e.g. if the code of the simulation has changed since it
+        was written.
+        """
+        settings.configure(self.settings)
+        if silent:
+            settings.logging.silent = True
+
+        klass = import_class(self.simulation)
+        simulation = klass(
+            random_seed=self.random_seed, max_sim_time=self.max_sim_time
+        )
+
+        simulation.setup()
+        simulation.script()
+        if self.now > 0:
+            simulation.env.run(until=self.now)
+
+        digest = fingerprint(simulation.state())
+        if digest != self.digest:
+            raise CheckpointMismatch(
+                "{} replayed to timestep {} does not match the checkpoint "
+                "(written by version {})".format(
+                    klass.__name__, self.now, self.version
+                )
+            )
+
+        return simulation
+
+    def run(self, **kwargs):
+        """
+        Replays the simulation to the checkpoint and runs it to completion,
+        which costs as much as running it from the start.
+        """
+        simulation = self.replay(**kwargs)
+        with simulation.diary.timer:
+            simulation.advance(simulation.max_sim_time)
+        simulation.complete()
+        return simulation
+
+    def fork(self, variants, paths, workers=None, **kwargs):
+        """
+        Replays the simulation once, then continues each variant (a dict of
+        dotted setting overrides) from the replayed state in its own forked
+        process, writing its results to the corresponding path. The replayed
+        prefix is shared (copy on write) by all of the variants. Yields the
+        variant and path of each variant as it completes.
+        """
+        simulation = self.replay(**kwargs)
+        workers = workers or multiprocessing.cpu_count()
+        running = []
+
+        for variant, path in zip(variants, paths):
+            if len(running) >= workers:
+                yield self.join(*running.pop(0))
+
+            process = multiprocessing.Process(
+                target=continue_variant, args=(simulation, variant, path)
+            )
+            process.start()
+            running.append((process, variant, path))
+
+        for process, variant, path in running:
+            yield self.join(process, variant, path)
+
+    def join(self, process, variant, path):
+        """
+        Waits for a forked variant to complete.
+        """
+        process.join()
+        if process.exitcode != 0:
+            raise CheckpointError(
+                "variant {!r} exited with code {}".format(variant, process.exitcode)
+            )
+        return variant, path
+
+    def to_results(self):
+        """
+        Returns the results recorded up to the checkpoint.
+        """
+        return Results(results=self.results, **self.header)
+
+
+def continue_variant(simulation, variant, path):
+    """
+    Applies the variant to a replayed simulation in a forked process, then
+    runs it to completion and writes its results to the path.
+    """
+    from gvas.sweep import nest
+
+    # Variants would overwrite each other's checkpoints, so don't write any.
+    settings.checkpoint.interval = 0
+    settings.configure(nest(variant))
+    simulation.max_sim_time = variant.get('max_sim_time', simulation.max_sim_time)
+    simulation.diary.variant = variant
+    simulation.reconfigure()
+
+    with simulation.diary.timer:
+        simulation.advance(simulation.max_sim_time)
+    simulation.complete()
+
+    with open(path, 'wb') as fp:
+        simulation.diary.dump(fp)
+
+
+def fork_variant(simulation, variant, path):
+    """
+    Continues the variant of a running simulation in a child process forked
+    with `os.fork` and waits for it to write its results to the path. Unlike
+    `multiprocessing.Process` this can be used in a pool worker process.
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            continue_variant(simulation, variant, path)
+            code = 0
+        except Exception:
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+
+    _, status = os.waitpid(pid, 0)
+    if status != 0:
+        raise CheckpointError(
+            "variant {!r} exited with status {}".format(variant, status)
+        )
@@ -28,28 +28,22 @@ from gvas.config import settings
 # Utility to generate a default cluster
 ##########################################################################
 
-CLUSTER_SIZE    = settings.defaults.cluster.size
-RACK_SIZE       = settings.defaults.rack.size
-NODE_CPUS       = settings.defaults.node.cpus
-NODE_MEMORY     = settings.defaults.node.memory
-NODE_COUNT      = settings.defaults.cluster.node_count
-
 def default_cluster_generator(env, **kwargs):
     """
     Helper function for generating default clusters from the settings.
     """
     rack_options = {
-        'size': kwargs.get('rsize', RACK_SIZE)
+        'size': kwargs.get('rsize', settings.defaults.rack.size)
     }
 
     node_options = {
-        'cpus': kwargs.get('cpus', NODE_CPUS),
-        'memory': kwargs.get('memory', NODE_MEMORY)
+        'cpus': kwargs.get('cpus', settings.defaults.node.cpus),
+        'memory': kwargs.get('memory', settings.defaults.node.memory)
     }
 
     return Cluster.create(
         env,
-        size=kwargs.get('csize', CLUSTER_SIZE),
+        size=kwargs.get('csize', settings.defaults.cluster.size),
         rack_options=rack_options,
         node_options=node_options,
     )
@@ -63,7 +57,7 @@ def create_default_cluster(env, **kwargs):
     cluster = generator.next()
 
     # Add nodes
-    for _ in xrange(kwargs.get('node_count', NODE_COUNT)):
+    for _ in xrange(kwargs.get('node_count', settings.defaults.cluster.node_count)):
         cluster.add()
 
     return cluster
@@ -17,23 +17,85 @@ Simulation class to model a cluster of resources.
 # Imports
 ##########################################################################
 
-import random
-
+from bisect import bisect_left, insort
 from gvas.config import settings
+from gvas.dynamo import substream
 from gvas.exceptions import ClusterLacksCapacity
 from .base import Machine
 from .rack import Rack
 from .node import Node
+from .network import AddressTable
+from .delivery import create_delivery
 
 ##########################################################################
 # Classes
 ##########################################################################
 
+class CapacityIndex(object):
+    """
+    Buckets the nodes of a cluster by their number of idle cpus, keeping a
+    sorted list of the non-empty bucket keys so that the node with the
+    fewest idle cpus that can still fit a request is found by bisection
+    rather than by scanning every node in the cluster.
+    """
+
+    def __init__(self):
+        self.buckets = {}   # idle cpus -> {node id: node}
+        self.keys    = []   # sorted idle cpus of non-empty buckets
+        self.idle    = {}   # node id -> idle cpus the node is bucketed by
+
+    def update(self, node):
+        """
+        Re-buckets the node by its current number of idle cpus.
+        """
+        self.remove(node)
+
+        idle = node.idle_cpus
+        if idle not in self.buckets:
+            self.buckets[idle] = {}
+            insort(self.keys, idle)
+
+        self.buckets[idle][node.id] = node
+        self.idle[node.id] = idle
+
+    def remove(self, node):
+        """
+        Removes the node from the index if it is in it.
+        """
+        idle = self.idle.pop(node.id, None)
+        if idle is None:
+            return
+
+        bucket = self.buckets[idle]
+        del bucket[node.id]
+        if not bucket:
+            del self.buckets[idle]
+            del self.keys[bisect_left(self.keys, idle)]
+
+    def find(self, cpus, memory=0):
+        """
+        Returns the node with the fewest idle cpus that has at least the
+        requested cpus and memory free, or None if no node does.
+        """
+        for idle in self.keys[bisect_left(self.keys, cpus):]:
+            for node in self.buckets[idle].itervalues():
+                if node.idle_memory >= memory:
+                    return node
+        return None
+
+    def __len__(self):
+        return len(self.idle)
+
+
 class Cluster(Machine):
 
     def __init__(self, env, *args, **kwargs):
         rack_options = kwargs.get('rack_options', {})
         node_options = kwargs.get('node_options', {})
+
+        # Delivers the messages in flight on every rack network.
+        self.delivery = kwargs.get('delivery', create_delivery(env))
+
         self.rack_generator = kwargs.get(
             'rack_generator',
             Rack.create(
@@ -53,6 +115,12 @@ class Cluster(Machine):
             Node.create(env, **node_options)
         )
 
+        # Flat index of every program address in the cluster.
+        self.addresses = AddressTable()
+
+        # Index of the nodes in the cluster by their free capacity.
+        self.capacity = CapacityIndex()
+
         racks = [self.rack_generator.next() for i in range(self.size)]
         self.racks = dict((r.id, r) for r in racks)
         super(self.__class__, self).__init__(env, *args, **kwargs)        
@@ -77,9 +145,9 @@ class Cluster(Machine):
     def random(self, evaluator=lambda n: True):
         """
         Uses the evaluator function to test against the Node instances and
-        return a random match.
+        return a random match drawn from the placement substream.
         """
-        return random.choice(self.filter(evaluator))
+        return substream(self.env, 'placement').choice(self.filter(evaluator))
 
     def send(self, *args, **kwargs):
         """
@@ -109,6 +177,20 @@ class Cluster(Machine):
         rack.add(node)
         return node
 
+    def assign(self, program):
+        """
+        Assigns the program to the node with the least free capacity that can
+        still run it. Raises ClusterLacksCapacity if no node can.
+        """
+        node = self.capacity.find(program.cpus, program.memory)
+        if node is None:
+            raise ClusterLacksCapacity(
+                'no node has {} cpus and {}GB free.'
+                .format(program.cpus, program.memory)
+            )
+
+        node.assign(program)
+        return node
 
     def remove(self, node):
         """
@@ -155,6 +237,34 @@ class Cluster(Machine):
 
         raise ClusterLacksCapacity()
 
+    def serialize(self):
+        """
+        Returns the topology and network state of the cluster, e.g. for
+        checkpoints.
+        """
+        return {
+            'id': self.id,
+            'delivery': self.delivery.serialize(),
+            'racks': [
+                {
+                    'id': rack.id,
+                    'bandwidth': rack.network.bandwidth,
+                    'messages': rack.network.message_count,
+                    'backlog': rack.network.depth,
+                    'nodes': [
+                        {
+                            'id': node.id,
+                            'cpus': node.cpus,
+                            'memory': node.memory,
+                            'programs': sorted(node.programs.keys()),
+                        }
+                        for node in sorted(rack.nodes.itervalues(), key=lambda n: n.id)
+                    ],
+                }
+                for rack in sorted(self.racks.itervalues(), key=lambda r: r.id)
+            ],
+        }
+
     def get_message_count(self):
         """
         Returns the number of messages on the network
@@ -163,6 +273,23 @@ class Cluster(Machine):
             r.network.message_count for r in self.racks.itervalues()
         )
 
+    def get_routed_count(self):
+        """
+        Returns the number of messages sent on the network so far
+        """
+        return sum(
+            r.routed for r in self.racks.itervalues()
+        )
+
+    def get_queue_stats(self):
+        """
+        Returns the (rack id, backlog depth, mean wait) of every rack network
+        """
+        return [
+            (r.id, r.network.depth, r.network.mean_wait)
+            for r in sorted(self.racks.itervalues(), key=lambda r: r.id)
+        ]
+
     def get_total_message_size(self):
         """
         Returns the total size of the messages on the network
@@ -0,0 +1,186 @@
+# gvas.cluster.delivery
+# Schedulers that deliver messages in flight on the rack networks.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 25 09:47:13 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: delivery.py [] benjamin@bengfort.com $
+
+"""
+Schedulers that deliver messages in flight on the rack networks.
+
+A rack puts a message on its bus by reserving the bandwidth for it and then
+handing it to the delivery scheduler of the cluster along with its latency.
+The scheduler calls the rack's recv when the latency has elapsed. Messages
+that are due at the same tick are delivered together in the order they were
+sent, so a scheduler needs far fewer simpy events than messages.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import math
+
+from gvas.config import settings
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Batched Delivery
+##########################################################################
+
+class BatchedDelivery(object):
+    """
+    Batches messages by rack and delivery time, with one timed callback on
+    the simpy event queue for every (rack, tick) that has messages due.
+    """
+
+    def __init__(self, env):
+        self.env     = env
+        self.pending = {}   # (rack id, delivery time) -> (rack, messages)
+
+    def schedule(self, rack, message, latency):
+        """
+        Delivers the message to the rack after the latency.
+        """
+        key = (rack.id, self.env.now + latency)
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = (rack, [])
+            self.env.timeout(latency, key).callbacks.append(self._deliver)
+        batch[1].append(message)
+
+    def _deliver(self, event):
+        """
+        simpy callback that delivers the batch of messages due to a rack.
+        """
+        rack, messages = self.pending.pop(event.value)
+        for message in messages:
+            rack.recv(message)
+
+    def serialize(self):
+        """
+        Returns the (delivery time, rack id, messages) of the pending
+        batches, e.g. for checkpoints.
+        """
+        return sorted(
+            (due, rid, len(batch[1])) for (rid, due), batch in self.pending.iteritems()
+        )
+
+    def __len__(self):
+        return sum(len(batch[1]) for batch in self.pending.itervalues())
+
+##########################################################################
+## Timing Wheel
+##########################################################################
+
+class TimingWheel(object):
+    """
+    A calendar queue of messages bucketed by the tick they are due, modulo
+    the number of slots in the wheel, so that scheduling and delivering a
+    message are O(1) list operations rather than heap operations. There is
+    a single timed callback for the whole cluster at every tick that has
+    messages due, which delivers them in the order they were sent.
+
+    Messages are delivered at whole ticks (fractional delivery times are
+    rounded up), and the wheel grows if a latency does not fit in it.
+    """
+
+    def __init__(self, env, slots=None):
+        self.env       = env
+        self.slots     = slots or settings.defaults.network.wheel_slots
+        self.wheel     = [[] for _ in xrange(self.slots)]
+        self.scheduled = set()  # ticks with a pending callback
+        self.count     = 0      # the number of messages in the wheel
+
+    def schedule(self, rack, message, latency):
+        """
+        Delivers the message to the rack after the latency.
+        """
+        due = int(math.ceil(self.env.now + latency))
+        if due - self.env.now >= self.slots:
+            self.resize(due - self.env.now + 1)
+
+        self.wheel[due % self.slots].append((due, rack, message))
+        self.count += 1
+
+        # Wake up at the tick unless a wakeup is already pending for it.
+        if due not in self.scheduled:
+            self.wakeup(due)
+
+    def wakeup(self, tick):
+        """
+        Schedules the timed callback that delivers the messages at the tick.
+        """
+        self.scheduled.add(tick)
+        self.env.timeout(tick - self.env.now, tick).callbacks.append(self._tick)
+
+    def _tick(self, event):
+        """
+        simpy callback that delivers the messages due at the current tick.
+        """
+        tick = event.value
+        self.scheduled.discard(tick)
+
+        # Swap the bucket out so messages sent with no latency are kept.
+        slot = tick % self.slots
+        batch, self.wheel[slot] = self.wheel[slot], []
+        self.count -= len(batch)
+
+        for due, rack, message in batch:
+            rack.recv(message)
+
+    def resize(self, slots):
+        """
+        Grows the wheel to at least the number of slots, rebucketing the
+        messages in the wheel.
+        """
+        while self.slots < slots:
+            self.slots *= 2
+
+        entries = [entry for bucket in self.wheel for entry in bucket]
+        entries.sort(key=lambda entry: entry[0])
+
+        self.wheel = [[] for _ in xrange(self.slots)]
+        for entry in entries:
+            self.wheel[entry[0] % self.slots].append(entry)
+
+    def serialize(self):
+        """
+        Returns the (delivery time, rack id, messages) of the pending
+        messages, e.g. for checkpoints.
+        """
+        counts = {}
+        for bucket in self.wheel:
+            for due, rack, message in bucket:
+                counts[(due, rack.id)] = counts.get((due, rack.id), 0) + 1
+        return sorted(key + (count,) for key, count in counts.iteritems())
+
+    def __len__(self):
+        return self.count
+
+##########################################################################
+## Delivery Schedulers
+##########################################################################
+
+SCHEDULERS = {
+    'batched': BatchedDelivery,
+    'wheel': TimingWheel,
+}
+
+
+def create_delivery(env, scheduler=None):
+    """
+    Returns the delivery scheduler named by `defaults.network.delivery`.
+    """
+    scheduler = scheduler or settings.defaults.network.delivery
+    if scheduler not in SCHEDULERS:
+        raise UnknownType(
+            "{!r} is not a delivery scheduler, use one of {}".format(
+                scheduler, ", ".join(sorted(SCHEDULERS))
+            )
+        )
+    return SCHEDULERS[scheduler](env)
@@ -0,0 +1,151 @@
+# gvas.cluster.latency
+# Models of the latency of a network as a function of its utilization.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Tue Jan 26 10:31:08 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: latency.py [] benjamin@bengfort.com $
+
+"""
+Models of the latency of a network as a function of its utilization.
+
+A latency model is called with the utilization of the network, the fraction
+of its capacity in use between 0 and 1, and returns the latency in whole
+ticks (fractional latencies are rounded up). A network only calls its model
+when its bandwidth changes and caches the latency in between, and does not
+call a constant model at all.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import math
+
+from bisect import bisect_right
+from confire import ImproperlyConfigured
+
+from gvas.config import settings
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Latency Models
+##########################################################################
+
+class LatencyModel(object):
+    """
+    Base class of latency models, which are configured with the latency of
+    an idle network and optionally any of the `latency_*` settings.
+    """
+
+    constant = False
+
+    def __init__(self, base_latency, **options):
+        self.base_latency = base_latency
+
+    def delay(self, utilization):
+        """
+        Returns the (possibly fractional) latency at the given utilization.
+        """
+        raise NotImplementedError("Latency models must implement a delay.")
+
+    def __call__(self, utilization):
+        # Round off floating point error before rounding up to a tick.
+        return int(math.ceil(round(self.delay(utilization), 6)))
+
+
+class ConstantLatency(LatencyModel):
+    """
+    The latency is the base latency no matter how congested the network is.
+    """
+
+    constant = True
+
+    def delay(self, utilization):
+        return self.base_latency
+
+
+class LinearLatency(LatencyModel):
+    """
+    The latency grows linearly with the utilization, by `latency_slope`
+    ticks at full utilization.
+    """
+
+    def __init__(self, base_latency, **options):
+        super(LinearLatency, self).__init__(base_latency, **options)
+        self.slope = options.get('slope', settings.defaults.network.latency_slope)
+
+    def delay(self, utilization):
+        return self.base_latency + self.slope * utilization
+
+
+class MM1Latency(LatencyModel):
+    """
+    The latency of an M/M/1 queue, the base latency (the service time)
+    divided by the idle fraction of the network, which grows without bound
+    as the network saturates so it is capped at `latency_max` ticks.
+    """
+
+    def __init__(self, base_latency, **options):
+        super(MM1Latency, self).__init__(base_latency, **options)
+        self.maximum = options.get('maximum', settings.defaults.network.latency_max)
+
+    def delay(self, utilization):
+        if utilization >= 1:
+            return self.maximum
+        return min(self.base_latency / (1.0 - utilization), self.maximum)
+
+
+class PiecewiseLatency(LatencyModel):
+    """
+    Looks the latency up in `latency_table`, a list of [utilization,
+    latency] steps: the latency is that of the step with the greatest
+    utilization that does not exceed the network's, or the base latency
+    below the first step.
+    """
+
+    def __init__(self, base_latency, **options):
+        super(PiecewiseLatency, self).__init__(base_latency, **options)
+        table = options.get('table', settings.defaults.network.latency_table)
+        if not table:
+            raise ImproperlyConfigured(
+                "The piecewise latency model requires a latency table."
+            )
+
+        table = sorted(tuple(step) for step in table)
+        self.thresholds = [step[0] for step in table]
+        self.latencies  = [step[1] for step in table]
+
+    def delay(self, utilization):
+        idx = bisect_right(self.thresholds, utilization)
+        if idx == 0:
+            return self.base_latency
+        return self.latencies[idx - 1]
+
+##########################################################################
+## Latency Model Registry
+##########################################################################
+
+MODELS = {
+    'constant': ConstantLatency,
+    'linear': LinearLatency,
+    'mm1': MM1Latency,
+    'piecewise': PiecewiseLatency,
+}
+
+
+def create_latency_model(base_latency, model=None, **options):
+    """
+    Returns the latency model named by `defaults.network.latency_model`.
+    """
+    model = model or settings.defaults.network.latency_model
+    if model not in MODELS:
+        raise UnknownType(
+            "{!r} is not a latency model, use one of {}".format(
+                model, ", ".join(sorted(MODELS))
+            )
+        )
+    return MODELS[model](base_latency, **options)
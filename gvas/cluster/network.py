@@ -18,23 +18,86 @@ Simulation class to model a network resource that has available bandwidth.
 ##########################################################################
 
 import simpy
+import heapq
 
 from gvas.config import settings
-from gvas.exceptions import BandwidthExceeded
+from gvas.exceptions import BandwidthExceeded, UnknownType
+from .latency import LatencyModel, create_latency_model
 
-from collections import namedtuple
+from itertools import count
+from collections import namedtuple, defaultdict, deque
 
 ##########################################################################
 # Classes
 ##########################################################################
 
-Message = namedtuple('Message', 'src, dst, value, size, sent, color')
 Address = namedtuple('Address', 'rack, node, port, pid')
 
 
+class Message(object):
+    """
+    A message on the network. Messages are slotted rather than tuples to
+    keep large backlogs compact, and the destination is the mutable routing
+    header: it is set in place as the message is routed and queued rather
+    than copying the message at every hop.
+    """
+
+    __slots__ = ('src', 'dst', 'value', 'size', 'sent', 'color')
+
+    def __init__(self, src, dst, value, size, sent, color):
+        self.src   = src
+        self.dst   = dst
+        self.value = value
+        self.size  = size
+        self.sent  = sent
+        self.color = color
+
+    def _replace(self, **kwargs):
+        """
+        Returns a copy of the message with the given fields replaced.
+        """
+        message = Message(*self)
+        for field, value in kwargs.iteritems():
+            setattr(message, field, value)
+        return message
+
+    def serialize(self):
+        """
+        Returns the fields of the message in order, e.g. for checkpoints.
+        """
+        return list(self)
+
+    def __iter__(self):
+        return iter((self.src, self.dst, self.value, self.size, self.sent, self.color))
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return tuple(self) != tuple(other)
+
+    # Messages are mutable so they cannot be hashed.
+    __hash__ = None
+
+    def __reduce__(self):
+        return (Message, tuple(self))
+
+    def __repr__(self):
+        return "Message(src={!r}, dst={!r}, value={!r}, size={!r}, sent={!r}, color={!r})".format(*self)
+
+
+# What a network does with a message when it lacks the bandwidth for it.
+OVERFLOW = ('raise', 'fifo', 'priority')
+
+
 class Network(object):
 
     def __init__(self, env, parent=None, *args, **kwargs):
+        self.env = env
         self.parent = parent
         self.message_count = 0
         self.capacity = kwargs.get(
@@ -51,6 +114,33 @@ class Network(object):
             capacity=self.capacity
         )
 
+        # The latency is only recomputed when the bandwidth changes.
+        self.latency_model = kwargs.get('latency_model', None)
+        if not isinstance(self.latency_model, LatencyModel):
+            self.latency_model = create_latency_model(
+                self.base_latency, self.latency_model
+            )
+        self._latency = self.latency_model(0.0)
+
+        # Backlog of messages waiting for bandwidth if not raising.
+        self.overflow = kwargs.get(
+            'overflow',
+            settings.defaults.network.overflow
+        )
+        if self.overflow not in OVERFLOW:
+            raise UnknownType(
+                "{!r} is not a network overflow, use one of {}".format(
+                    self.overflow, ", ".join(OVERFLOW)
+                )
+            )
+
+        self.backlog = [] if self.overflow == 'priority' else deque()
+        self.sequence = count()
+        self.queued = 0         # messages that have waited for bandwidth
+        self.admitted = 0       # queued messages that have been sent
+        self.wait_time = 0      # total time admitted messages waited
+        self.max_depth = 0      # the longest the backlog has been
+
     @classmethod
     def create(cls, env, parent=None, *args, **kwargs):
         """
@@ -69,6 +159,58 @@ class Network(object):
             raise BandwidthExceeded()
         self.medium.get(size)
         self.message_count += 1
+        self.update_latency()
+
+    def request(self, size, item):
+        """
+        Sends the item if there is bandwidth for it. Otherwise, unless the
+        network overflow is "raise", the item waits in the backlog until
+        there is: in the order it was requested ("fifo") or smallest first
+        ("priority"). Returns a list of (item, latency) pairs of the items
+        that were sent, which are the requested item and, in priority order,
+        any smaller backlog. The latency of each item is the latency of the
+        network once its bandwidth was reserved, i.e. when it was sent.
+        """
+        if self.overflow == 'raise':
+            self.send(size)
+            return [(item, self._latency)]
+
+        if size > self.capacity:
+            raise BandwidthExceeded()
+
+        if not self.backlog and self.medium.level >= size:
+            self.send(size)
+            return [(item, self._latency)]
+
+        entry = (size, next(self.sequence), self.env.now, item)
+        if self.overflow == 'priority':
+            heapq.heappush(self.backlog, entry)
+        else:
+            self.backlog.append(entry)
+
+        self.queued += 1
+        self.max_depth = max(self.max_depth, len(self.backlog))
+        return self.admit()
+
+    def admit(self):
+        """
+        Sends the items at the front of the backlog while there is bandwidth
+        for them, and returns the list of (item, latency) pairs that were
+        sent, with the latency of the network when each item was sent.
+        """
+        admitted = []
+        while self.backlog and self.medium.level >= self.backlog[0][0]:
+            if self.overflow == 'priority':
+                size, _, queued, item = heapq.heappop(self.backlog)
+            else:
+                size, _, queued, item = self.backlog.popleft()
+
+            self.send(size)
+            self.admitted += 1
+            self.wait_time += self.env.now - queued
+            admitted.append((item, self._latency))
+
+        return admitted
 
     def recv(self, size):
         """
@@ -80,6 +222,30 @@ class Network(object):
             self.message_count -= 1
         except ValueError:
             raise
+        self.update_latency()
+
+    def update_latency(self):
+        """
+        Recomputes the latency from the model after the bandwidth changes.
+        """
+        if not self.latency_model.constant:
+            self._latency = self.latency_model(self.utilization)
+
+    @property
+    def depth(self):
+        """
+        The number of messages waiting in the backlog for bandwidth.
+        """
+        return len(self.backlog)
+
+    @property
+    def mean_wait(self):
+        """
+        The mean time that the messages sent from the backlog waited.
+        """
+        if not self.admitted:
+            return 0.0
+        return float(self.wait_time) / self.admitted
 
     @property
     def bandwidth(self):
@@ -92,12 +258,18 @@ class Network(object):
     @property
     def latency(self):
         """
-        Computed property to return the network's latency. This value is
-        derived from the base_latency plus a function of the available
-        bandwidth.
+        Returns the network's latency. This value is derived from the
+        base_latency and the utilization of the network by the latency model
+        (see `gvas.cluster.latency`) whenever the bandwidth changes.
         """
-        delay = 100 - int(float(self.bandwidth) / float(self.capacity) * 100)
-        return self.base_latency #+ delay
+        return self._latency
+
+    @property
+    def utilization(self):
+        """
+        Returns the fraction of the capacity of the network that is in use.
+        """
+        return float(self.capacity - self.medium.level) / self.capacity
 
     @property
     def traffic(self):
@@ -119,6 +291,76 @@ class Network(object):
         return "<{}>".format(self.__str__())
 
 
+class AddressTable(object):
+    """
+    A flat, cluster-wide index of the programs assigned to nodes so that an
+    address can be resolved with a single hash lookup rather than walking
+    racks and nodes. Programs are indexed both by pid and by (rack, node,
+    port) so that port-addressed messages can also be delivered directly.
+    """
+
+    def __init__(self):
+        self.pids  = {}                 # pid -> program
+        self.ports = defaultdict(list)  # (rack, node, port) -> programs
+
+    def register(self, program):
+        """
+        Adds a program to the table; the program must be assigned to a node
+        that is in a rack.
+        """
+        self.pids[program.id] = program
+        for key in self.keys(program):
+            self.ports[key].append(program)
+
+    def unregister(self, program):
+        """
+        Removes a program from the table, must be called before the program
+        or its node is moved elsewhere in the cluster.
+        """
+        self.pids.pop(program.id, None)
+        for key in self.keys(program):
+            programs = self.ports.get(key, [])
+            if program in programs:
+                programs.remove(program)
+            if not programs:
+                self.ports.pop(key, None)
+
+    def keys(self, program):
+        """
+        Returns the (rack, node, port) keys for the given program.
+        """
+        node = program.node
+        return [(node.rack.id, node.id, port) for port in program.ports]
+
+    def lookup(self, address):
+        """
+        Returns the program with the pid in the address if it is on the
+        addressed rack and node, otherwise None.
+        """
+        program = self.pids.get(address.pid, None)
+        if program is None:
+            return None
+
+        node = program.node
+        if node.id == address.node and node.rack.id == address.rack:
+            return program
+        return None
+
+    def resolve(self, address):
+        """
+        Returns the list of programs a message to the address is delivered
+        to: either the program with the given pid or every program listening
+        on the port of the addressed node.
+        """
+        if address.pid is not None:
+            program = self.lookup(address)
+            return [program] if program is not None else []
+        return self.ports.get((address.rack, address.node, address.port), [])
+
+    def __len__(self):
+        return len(self.pids)
+
+
 ##########################################################################
 # Execution
 ##########################################################################
@@ -36,6 +36,9 @@ class Node(Machine):
         self.cpus = kwargs.get('cpus', settings.defaults.node.cpus)
         self.memory = kwargs.get('memory', settings.defaults.node.memory)
         self.programs = {}
+        self.used_cpus = 0
+        self.used_memory = 0
+        self._address = None     # Cached address, rebuilt if the rack changes
         super(self.__class__, self).__init__(env, *args, **kwargs)
 
     def send(self, message=None, **kwargs):
@@ -56,28 +59,36 @@ class Node(Machine):
         """
         Obtains a message from the parent Rack.
         """
-        delivered = False
+        # Deliver message by process id or by port number
+        programs = self.resolve(message.dst)
+        for program in programs:
+            program.recv(message)
 
-        if message.dst.pid is not None:
-            # Deliver message by process id.
-            program = self.programs.get(message.dst.pid, None)
-            if program is not None:
-                program.recv(message)
-                delivered = True
-
-        else:
-            # Attempt to deliver by port number
-            for program in self.programs.itervalues():
-                if message.dst.port in program.ports:
-                    program.recv(message)
-                    delivered = True
-
-        if not delivered:
+        if not programs:
             raise UndeliverableMessage(
                 "A message was unable to be delivered to {}"
                 .format(self.address)
             )
 
+    def resolve(self, address):
+        """
+        Returns the programs on this node a message to the address is
+        delivered to, from the address table of the cluster or, if the node
+        is not in a cluster, by looking up its own programs.
+        """
+        cluster = self.cluster
+        if cluster is not None:
+            return cluster.addresses.resolve(address)
+
+        if address.pid is not None:
+            program = self.programs.get(address.pid, None)
+            return [program] if program is not None else []
+
+        return [
+            program for program in self.programs.itervalues()
+            if address.port in program.ports
+        ]
+
     def assign(self, program):
         """
         Ingests a new Program for processing.  If there aren't enough resources
@@ -92,8 +103,35 @@ class Node(Machine):
                                     .format(program.memory, self.idle_memory))
 
         self.programs[program.id] = program
+        self.used_cpus += program.cpus
+        self.used_memory += program.memory
         program.node = self
 
+        if self.cluster is not None:
+            self.cluster.addresses.register(program)
+            self.cluster.capacity.update(self)
+
+    def unassign(self, program):
+        """
+        Removes a Program from this node, releasing its resources. Returns the
+        removed program or None if it wasn't assigned to this node.
+        """
+        if program.id not in self.programs:
+            return None
+
+        if self.cluster is not None:
+            self.cluster.addresses.unregister(program)
+
+        self.programs.pop(program.id)
+        self.used_cpus -= program.cpus
+        self.used_memory -= program.memory
+        program.node = None
+
+        if self.cluster is not None:
+            self.cluster.capacity.update(self)
+
+        return program
+
     def run(self):
         """
         Method to kickoff process simulation.
@@ -104,8 +142,21 @@ class Node(Machine):
     def address(self):
         """
         Addressable identifier for this node containing the Rack and Node ID.
+        The address is cached until the node is moved to another rack.
+        """
+        if self._address is None or self._address.rack != self.rack.id:
+            self._address = Address(self.rack.id, self.id, None, None)
+        return self._address
+
+    @property
+    def cluster(self):
+        """
+        The cluster this node is in, or None if the node has not been added
+        to a rack in a cluster.
         """
-        return Address(self.rack.id, self.id, None, None)
+        if self.rack is None:
+            return None
+        return self.rack.cluster
 
     @property
     def id(self):
@@ -122,16 +173,14 @@ class Node(Machine):
         """
         Number of available CPUs for this node.
         """
-        used = sum([p.cpus for p in self.programs.itervalues()])
-        return self.cpus - used
+        return self.cpus - self.used_cpus
 
     @property
     def idle_memory(self):
         """
         Gigabytes of available memory for this node
         """
-        used = sum([p.memory for p in self.programs.itervalues()])
-        return self.memory - used
+        return self.memory - self.used_memory
 
     def __str__(self):
         return "Node: id: {}, cpus={},  memory={}".format(
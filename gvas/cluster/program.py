@@ -32,6 +32,7 @@ class Program(NamedProcess):
         self.memory = kwargs.pop('memory', settings.defaults.program.memory)
         self.ports = set(kwargs.pop('ports', []))
         self.node = kwargs.pop('node', None)
+        self._address = None    # Cached (node address, program address)
         super(Program, self).__init__(env, *args, **kwargs)
 
     @classmethod
@@ -57,8 +58,12 @@ class Program(NamedProcess):
     def address(self):
         """
         Returns the address for this program, specializing to the first port.
+        The address is cached until the address of its node changes.
         """
-        return self.node.address._replace(port=next(iter(self.ports)), pid=self.id)
+        base = self.node.address
+        if self._address is None or self._address[0] is not base:
+            self._address = (base, base._replace(port=next(iter(self.ports)), pid=self.id))
+        return self._address[1]
 
     def __str__(self):
         return "Program: id: {}, cpus={},  memory={}".format(
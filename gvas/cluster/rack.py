@@ -22,6 +22,7 @@ from gvas.exceptions import RackLacksCapacity
 from .base import Machine
 from .node import Node
 from .network import Network, Address
+from .delivery import create_delivery
 
 ##########################################################################
 # Classes
@@ -45,8 +46,14 @@ class Rack(Machine):
             settings.defaults.rack.egress_latency
         )
         self.nodes = {}
+        self.routed = 0     # the number of messages sent from this rack
         self.network = Network.create(env, parent=self).next()
+        self.delivery = kwargs.get(
+            'delivery',
+            self.cluster.delivery if self.cluster is not None else create_delivery(env)
+        )
         super(self.__class__, self).__init__(env, *args, **kwargs)
+        self._address = Address(self.id, None, None, None)
 
     def filter(self, evaluator):
         """
@@ -66,43 +73,29 @@ class Rack(Machine):
         """
         Generalized method to put message onto the contained network.
         """
-        # put on internal network
-        self.env.process(self._send(message))
+        self.routed += 1
 
-        # determine destination rack
-        rack_id = message.dst.rack
-        node_id = message.dst.node
+        # put on internal network
+        self.transmit(message)
 
         # put on external network if needed
-        if self.id != rack_id:
-            dest_rack = self.cluster.racks[rack_id]
-            self.env.process(
-                dest_rack._send(
-                    message,
-                    outbound=True,
-                )
-            )
+        if self.id != message.dst.rack:
+            dest_rack = self.cluster.racks[message.dst.rack]
+            dest_rack.transmit(message, dest_rack.egress_latency)
 
-    def _send(self, message, outbound=False):
+    def transmit(self, message, egress=0):
         """
-        simpy process to simulate sending a message onto a bus and then triggering
-        the recv after an appropriate latency period.
+        Simulates sending a message onto the bus by reserving its bandwidth,
+        then triggering the recv after the latency period (the latency of the
+        network when the bandwidth is reserved, plus any egress latency).
+        Rather than a process per message, the delivery scheduler (see the
+        delivery module) batches messages so that all of the messages due at
+        a tick are delivered together in the order they were sent.
         """
-        # print "Rack {}: sending message (address: {}, size: {}, value: {}) at {}\n".format(self.id, address, size, value, self.env.now)
-
-        # reserve bandwidth to put msg on the bus
-        self.network.send(message.size)
-
-        # computed total latency
-        latency = self.network.latency
-        if outbound:
-            latency += self.egress_latency
-
-        # yield for required latency
-        yield self.env.timeout(latency)
-
-        # initiate recv to pick msg off the bus
-        self.recv(message)
+        # reserve bandwidth to put msg on the bus (or wait for it)
+        for (message, egress), latency in self.network.request(message.size, (message, egress)):
+            # recv once the latency has elapsed
+            self.delivery.schedule(self, message, latency + egress)
 
     def recv(self, message):
         """
@@ -113,6 +106,11 @@ class Rack(Machine):
         # de-allocate the reserved bandwidth on the bus
         self.network.recv(message.size)
 
+        # send any messages that were waiting for the bandwidth
+        if self.network.backlog:
+            for (queued, egress), latency in self.network.admit():
+                self.delivery.schedule(self, queued, latency + egress)
+
         # hand off to local node if we have it otherwise ignore as outgoing traffic
         if message.dst.rack == self.id:
             self.nodes[message.dst.node].recv(message)
@@ -132,10 +130,22 @@ class Rack(Machine):
         self.nodes[node.id] = node
         node.rack = self
 
+        # index the node's capacity and the addresses of its programs
+        if self.cluster is not None:
+            self.cluster.capacity.update(node)
+            for program in node.programs.itervalues():
+                self.cluster.addresses.register(program)
+
     def remove(self, node):
         """
         Removes a node from the cluster.
         """
+        # remove the node and its programs from the cluster indices
+        if self.cluster is not None and node.id in self.nodes:
+            self.cluster.capacity.remove(node)
+            for program in node.programs.itervalues():
+                self.cluster.addresses.unregister(program)
+
         # for funsies, return the removed node or None if it wasnt found.
         return self.nodes.pop(node.id, None)
 
@@ -160,7 +170,7 @@ class Rack(Machine):
         """
         Returns the rack addressable address.
         """
-        return Address(self.id, None, None, None)
+        return self._address
 
     @property
     def space(self):
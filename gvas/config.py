@@ -58,6 +58,13 @@ class DefaultsConfiguration(SerializableConfiguration):
     class NetworkConfiguration(SerializableConfiguration):
         capacity = 1000
         base_latency = 10
+        delivery = "batched"    # or "wheel", see gvas.cluster.delivery
+        wheel_slots = 64
+        overflow = "raise"      # or "fifo" or "priority" to queue messages
+        latency_model = "constant"  # or "linear", "mm1", or "piecewise"
+        latency_slope = 100     # linear: extra latency at full utilization
+        latency_max = 1000      # mm1: latency of a saturated network
+        latency_table = None    # piecewise: [[utilization, latency], ...]
 
     class NodeConfiguration(SerializableConfiguration):
         cpus = 4
@@ -109,6 +116,18 @@ class SimulationsConfiguration(SerializableConfiguration):
         message_stddev   = 8
         deactivation_buffer = 5
         queue_lag           = 0
+        balance_interval    = 1         # timesteps between balancing the actors
+        dispatch            = "poll"    # dispatch queued messages on "poll" or "event"
+        routing             = "first"   # the policy that picks actors (gvas.actors.routing)
+        routing_replicas    = 16        # points per actor on the consistent hash ring
+        autoscaler          = "heuristic"   # how the actors are balanced (gvas.actors.scaling)
+        autoscale_target    = 0.8       # target utilization of the active actors
+        autoscale_alpha     = 0.5       # weight of the latest load in the moving average
+        autoscale_setpoint  = 0         # the backlog the pid controller holds
+        autoscale_gains     = [0.05, 0.005, 0.0]    # pid proportional, integral, derivative
+        autoscale_base      = "target-utilization"  # the autoscaler hysteresis damps
+        autoscale_cooldown  = [2, 10]   # timesteps after scaling to wait to scale up, down
+        autoscale_tolerance = 0.1       # fraction of the active actors not worth scaling
 
     class CommnunicationsSimulationConfiguration(BalanceSimulationConfiguration):
 
@@ -130,11 +149,56 @@ class LoggingConfiguration(Configuration):
     """
 
     level   = "INFO"
+    silent  = False     # Drop debug and info messages in silent simulations
     logfmt  = "[%(time)5d] %(message)s"
     datefmt = "%Y-%m-%dT%H:%M:%S%z"
     disable_existing_loggers = False
 
 
+##########################################################################
+## Checkpoint Configuration
+##########################################################################
+
+class CheckpointConfiguration(Configuration):
+    """
+    How often the state of a running simulation is checkpointed to disk, see
+    the `gvas.checkpoint` module for more info.
+    """
+
+    interval  = 0               # Timesteps between checkpoints (0 disables)
+    directory = "checkpoints"   # Where checkpoints are written
+
+
+##########################################################################
+## Cache Configuration
+##########################################################################
+
+class CacheConfiguration(Configuration):
+    """
+    The local cache of the results of whole simulation runs (not of their
+    state), see the `gvas.cache` module for more info.
+    """
+
+    enabled   = False                               # Use the cache for runs
+    directory = os.path.expanduser("~/.gvas/cache") # Where results are cached
+    max_size  = 1024                                # Megabytes before eviction
+
+
+##########################################################################
+## Profiling Configuration
+##########################################################################
+
+class ProfilingConfiguration(Configuration):
+    """
+    Opt-in counting and timing of the events of every process in a
+    simulation, see the `gvas.profiler` module for more info.
+    """
+
+    enabled   = False   # Profile the simulation environment
+    top       = 10      # Number of processes to report
+    results   = False   # Add the profile to the results
+
+
 ##########################################################################
 ## Application Configuration
 ##########################################################################
@@ -161,6 +225,15 @@ class GVASSimulationConfiguration(Configuration):
     # Logging parameters
     logging       = LoggingConfiguration()
 
+    # Checkpoint parameters
+    checkpoint    = CheckpointConfiguration()
+
+    # Results cache parameters
+    cache         = CacheConfiguration()
+
+    # Event profiling parameters
+    profiling     = ProfilingConfiguration()
+
     defaults      = DefaultsConfiguration()
     simulations   = SimulationsConfiguration()
 
@@ -21,3 +21,7 @@ A module containing all the GVAS commands
 from .list import ListCommand
 from .run import RunCommand
 from .viz import VizCommand
+from .sweep import SweepCommand
+from .replicate import ReplicateCommand
+from .replay import ReplayCommand
+from .bench import BenchCommand
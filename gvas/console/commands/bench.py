@@ -0,0 +1,116 @@
+# gvas.console.commands.bench
+# Runs the benchmark suite and compares it against a baseline.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 22 11:15:30 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: bench.py [] benjamin@bengfort.com $
+
+"""
+Runs the benchmark suite and compares it against a baseline.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import json
+import argparse
+
+from gvas.bench import SUITE, TOLERANCE
+from gvas.bench import Benchmark, load_suite, compare, report
+from gvas.exceptions import BenchmarkError, BenchmarkRegression
+from gvas.console.commands.base import Command
+
+##########################################################################
+## Command
+##########################################################################
+
+class BenchCommand(Command):
+
+    name = "bench"
+    help = "benchmarks the simulations and compares them to a baseline"
+
+    args = {
+        ('-S', '--suite'): {
+            'type': argparse.FileType('r'),
+            'default': None,
+            'metavar': 'PATH',
+            'help': 'YAML file of the benchmark suite (defaults to benchmarks/suite.yaml)',
+        },
+        ('-s', '--scale'): {
+            'type': str,
+            'nargs': '+',
+            'default': None,
+            'metavar': 'SCALE',
+            'help': 'only run the benchmarks at these scales',
+        },
+        ('-n', '--repeat'): {
+            'type': int,
+            'default': 1,
+            'metavar': 'N',
+            'help': 'number of times to run each benchmark, keeping the fastest',
+        },
+        ('-b', '--baseline'): {
+            'type': argparse.FileType('r'),
+            'default': None,
+            'metavar': 'PATH',
+            'help': 'JSON file of a previous run to compare the benchmarks to',
+        },
+        ('-t', '--tolerance'): {
+            'type': float,
+            'default': TOLERANCE,
+            'metavar': 'PCT',
+            'help': 'relative change from the baseline that is a regression',
+        },
+        ('-o', '--output'): {
+            'type': str,
+            'default': None,
+            'metavar': 'PATH',
+            'help': 'specify location to write the benchmarks to (e.g. a new baseline)',
+        },
+        'name': {
+            'nargs': '*',
+            'type': str,
+            'help': 'the simulations to benchmark (defaults to the whole suite)',
+        },
+    }
+
+    def handle(self, args):
+        """
+        Handle command line arguments
+        """
+        benchmarks = load_suite(args.suite or open(SUITE, 'r'))
+        if args.name:
+            benchmarks = [bench for bench in benchmarks if bench[0] in args.name]
+        if args.scale:
+            benchmarks = [bench for bench in benchmarks if bench[1] in args.scale]
+        if not benchmarks:
+            raise BenchmarkError("No benchmarks in the suite match the arguments.")
+
+        baseline = json.load(args.baseline) if args.baseline else None
+        runner   = Benchmark(benchmarks, args.repeat)
+        records  = list(runner)
+
+        # Written after the run, so the baseline can be updated in place.
+        if args.output is not None:
+            with open(args.output, 'w') as fp:
+                runner.dump(fp)
+
+        output = report(records, baseline)
+        if baseline is None:
+            return output
+
+        regressions = compare(records, baseline, args.tolerance)
+        if regressions:
+            raise BenchmarkRegression("\n".join([output, ""] + [
+                "{} at {} scale: {} regressed {:+0.1%} ({:0.3f} to {:0.3f})".format(
+                    name, scale, metric, change, before, after
+                )
+                for name, scale, metric, before, after, change in regressions
+            ]))
+
+        return output + "\n\nNo regressions from the baseline."
@@ -0,0 +1,119 @@
+# gvas.console.commands.replay
+# Replays a GVAS simulation to a checkpoint to finish it or fork variants.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 18 14:47:30 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: replay.py [] benjamin@bengfort.com $
+
+"""
+Replays a GVAS simulation to a checkpoint to finish it or fork variants.
+
+The simulation is replayed from the start and verified against the
+checkpoint, which costs as much as running it up to the checkpoint again.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import yaml
+import argparse
+
+from gvas.sweep import expand, check_variants
+from gvas.checkpoint import Checkpoint
+from gvas.console.commands.base import Command
+
+##########################################################################
+## Command
+##########################################################################
+
+class ReplayCommand(Command):
+
+    name = "replay"
+    help = (
+        "replays a simulation to a verified checkpoint, then finishes it or "
+        "forks variants of it; the replay reruns the simulation from the "
+        "start, so it saves no computation over running it again"
+    )
+
+    args = {
+        ('-o', '--output'): {
+            'type': str,
+            'default': None,
+            'metavar': 'PATH',
+            'help': 'location to write the results (a directory for variants)',
+        },
+        ('-V', '--variants'): {
+            'type': argparse.FileType('r'),
+            'default': None,
+            'metavar': 'SPEC',
+            'help': 'YAML file of the runs and grid of variants to fork',
+        },
+        ('-w', '--workers'): {
+            'type': int,
+            'default': None,
+            'metavar': 'N',
+            'help': 'number of variants to run at once (defaults to the cpu count)',
+        },
+        ('-f', '--format'): {
+            'choices': ('json', 'npz'),
+            'default': 'json',
+            'help': 'the file format to write the results of each variant in',
+        },
+        'checkpoint': {
+            'nargs': 1,
+            'type': argparse.FileType('r'),
+            'help': 'the checkpoint to replay the simulation to',
+        },
+    }
+
+    def handle(self, args):
+        """
+        Handle command line arguments
+        """
+        checkpoint = Checkpoint.load(args.checkpoint[0])
+        sname = checkpoint.simulation.rsplit(".", 1)[-1]
+
+        if args.variants is not None:
+            return self.fork(checkpoint, args)
+
+        simulation = checkpoint.run()
+
+        if args.output is None:
+            args.output = "{}-{}.json".format(sname, simulation.diary.get_finished().strftime("%Y%m%d"))
+        with open(args.output, 'wb') as fp:
+            simulation.diary.dump(fp)
+
+        return "Results for {} replayed to timestep {} written to {}".format(
+            sname, int(checkpoint.now), args.output
+        )
+
+    def fork(self, checkpoint, args):
+        """
+        Forks every variant in the specification from the checkpoint.
+        """
+        variants = check_variants(expand(yaml.safe_load(args.variants)))
+
+        output = args.output or os.getcwd()
+        if not os.path.exists(output):
+            os.makedirs(output)
+
+        sname = checkpoint.simulation.rsplit(".", 1)[-1]
+        paths = [
+            os.path.join(output, "{}-{:08d}-{:03d}.{}".format(
+                sname, int(checkpoint.now), idx, args.format
+            ))
+            for idx in xrange(len(variants))
+        ]
+
+        for variant, path in checkpoint.fork(variants, paths, args.workers):
+            continue
+
+        return "Results for {} variants of {} forked at timestep {} written to {}".format(
+            len(variants), sname, int(checkpoint.now), output
+        )
@@ -0,0 +1,110 @@
+# gvas.console.commands.replicate
+# Executes replicas of a GVAS simulation with different random seeds.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 15 10:31:52 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: replicate.py [] benjamin@bengfort.com $
+
+"""
+Executes replicas of a GVAS simulation with different random seeds.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+
+from gvas.sweep import Replicas
+from gvas.aggregate import PERCENTILES, RESERVOIR
+from gvas.console.commands.base import Command
+
+##########################################################################
+## Command
+##########################################################################
+
+class ReplicateCommand(Command):
+
+    name = "replicate"
+    help = "executes replicas of a simulation and aggregates their results"
+
+    args = {
+        ('-n', '--replicas'): {
+            'type': int,
+            'default': 10,
+            'metavar': 'N',
+            'help': 'number of replicas (random seeds) to run',
+        },
+        ('-s', '--seed'): {
+            'type': int,
+            'default': None,
+            'metavar': 'SEED',
+            'help': 'the first random seed (defaults to the configured seed)',
+        },
+        ('-w', '--workers'): {
+            'type': int,
+            'default': None,
+            'metavar': 'N',
+            'help': 'number of worker processes (defaults to the cpu count)',
+        },
+        ('-p', '--percentiles'): {
+            'type': float,
+            'nargs': '+',
+            'default': list(PERCENTILES),
+            'metavar': 'Q',
+            'help': 'percentiles to compute at every timestep',
+        },
+        ('-r', '--reservoir'): {
+            'type': int,
+            'default': RESERVOIR,
+            'metavar': 'N',
+            'help': 'maximum number of replicas sampled for the percentiles',
+        },
+        ('-o', '--output'): {
+            'type': str,
+            'default': None,
+            'metavar': 'PATH',
+            'help': 'specify location to write the aggregate to (.json or .npz)',
+        },
+        'name': {
+            'nargs': 1,
+            'type': str,
+            'help': 'the simulation to execute',
+        },
+    }
+
+    def handle(self, args):
+        """
+        Handle command line arguments
+        """
+        sname = args.name[0]
+        percentiles = [int(q) if q == int(q) else q for q in args.percentiles]
+        replicas = Replicas(
+            sname, args.replicas, args.seed, args.workers,
+            percentiles=percentiles, reservoir=args.reservoir,
+        )
+
+        path = args.output or "{}-replicas.json".format(sname)
+
+        # Rewrite the partial aggregate as each replica finishes, so that the
+        # file on disk always reflects every replica completed so far.
+        for idx, seed, aggregate in replicas:
+            self.write(aggregate, path)
+
+        return "Aggregate of {} replicas of {} simulation written to {}".format(
+            len(replicas), sname, path
+        )
+
+    def write(self, aggregate, path):
+        """
+        Atomically replaces the aggregate results at the given path.
+        """
+        base, ext = os.path.splitext(path)
+        temp = "{}.tmp{}".format(base, ext)
+        with open(temp, 'wb') as fp:
+            aggregate.to_results().dump(fp)
+        os.rename(temp, path)
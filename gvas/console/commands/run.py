@@ -25,6 +25,9 @@ from gvas.console.utils import color_format
 from gvas.console.commands.base import Command
 
 from gvas.sims import registry
+from gvas.cache import ResultsCache, cache_key
+from gvas.results import is_stream, STREAM_CHUNK
+from gvas.config import settings
 from gvas.exceptions import UnknownSimulation
 
 ##########################################################################
@@ -38,10 +41,37 @@ class RunCommand(Command):
 
     args = {
         ('-o', '--output'): {
-            'type': argparse.FileType('w'),
+            'type': argparse.FileType('wb'),
             'default': None,
             'metavar': 'PATH',
-            'help': 'specify location to write output to'
+            'help': 'specify location to write output to (.json, .npz or .jsonl)'
+        },
+        ('-c', '--chunk'): {
+            'type': int,
+            'default': STREAM_CHUNK,
+            'metavar': 'N',
+            'help': 'number of timesteps per chunk when streaming to .jsonl',
+        },
+        ('-k', '--checkpoint'): {
+            'type': int,
+            'default': None,
+            'metavar': 'N',
+            'help': 'write a checkpoint of the simulation every N timesteps',
+        },
+        ('-C', '--cache'): {
+            'action': 'store_true',
+            'default': False,
+            'help': 'load the results from the results cache if this run is cached',
+        },
+        ('-p', '--profile'): {
+            'action': 'store_true',
+            'default': False,
+            'help': 'count and time the events of every process and add them to the results',
+        },
+        ('-s', '--silent'): {
+            'action': 'store_true',
+            'default': False,
+            'help': 'do not log debug or info messages during the simulation',
         },
         'name': {
             'nargs': '+',
@@ -61,15 +91,51 @@ class RunCommand(Command):
         if sname not in registry:
             raise UnknownSimulation('"{}" is not a valid simulation.'.format(sname))
 
+        # silence the simulation logging if requested
+        if args.silent:
+            settings.logging.silent = True
+
+        # checkpoint the simulation if requested
+        if args.checkpoint is not None:
+            settings.checkpoint.interval = args.checkpoint
+
+        # profile the simulation if requested
+        if args.profile:
+            settings.profiling.enabled = True
+            settings.profiling.results = True
+
         # instantiate requested simulation
         simulation = registry[sname].klass()
-        simulation.run()
+
+        # Stream the output data to a JSON lines file during the run.
+        if args.output is not None and is_stream(args.output):
+            simulation.diary.stream(args.output, args.chunk)
+            try:
+                simulation.run()
+            finally:
+                # Write whatever was recorded, even if the simulation crashed.
+                simulation.diary.close()
+
+            return "Results for {} simulation streamed to {}".format(sname, args.output.name)
+
+        # Load the results of an identical run from the cache or cache them.
+        if args.cache or settings.cache.enabled:
+            cache = ResultsCache()
+            key   = cache_key(simulation.__class__)
+            diary = cache.get(key)
+            if diary is None:
+                simulation.run()
+                diary = simulation.diary
+                cache.put(key, diary)
+        else:
+            simulation.run()
+            diary = simulation.diary
 
         # Dump the output data to a file.
         if args.output is None:
-            path = "{}-{}.json".format(sname, simulation.diary.get_finished().strftime("%Y%m%d"))
+            path = "{}-{}.json".format(sname, diary.get_finished().strftime("%Y%m%d"))
             args.output = open(path, 'w')
-        simulation.diary.dump(args.output)
+        diary.dump(args.output)
 
 
         return "Results for {} simulation written to {}".format(sname, args.output.name)
@@ -0,0 +1,94 @@
+# gvas.console.commands.sweep
+# Executes a GVAS simulation across a grid of configurations.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 14 11:02:19 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: sweep.py [] benjamin@bengfort.com $
+
+"""
+Executes a GVAS simulation across a grid of configurations.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import yaml
+import argparse
+
+from gvas.sweep import Sweep
+from gvas.cache import ResultsCache
+from gvas.config import settings
+from gvas.console.commands.base import Command
+
+##########################################################################
+## Command
+##########################################################################
+
+class SweepCommand(Command):
+
+    name = "sweep"
+    help = "executes a simulation for every configuration in a sweep"
+
+    args = {
+        ('-w', '--workers'): {
+            'type': int,
+            'default': None,
+            'metavar': 'N',
+            'help': 'number of worker processes (defaults to the cpu count)',
+        },
+        ('-o', '--output'): {
+            'type': str,
+            'default': os.getcwd(),
+            'metavar': 'DIR',
+            'help': 'directory to write the results of each run to',
+        },
+        ('-f', '--format'): {
+            'choices': ('json', 'npz'),
+            'default': 'json',
+            'help': 'the file format to write the results of each run in',
+        },
+        ('-C', '--cache'): {
+            'action': 'store_true',
+            'default': False,
+            'help': 'load unchanged runs from the results cache and cache new runs',
+        },
+        'name': {
+            'nargs': 1,
+            'type': str,
+            'help': 'the simulation to execute',
+        },
+        'spec': {
+            'nargs': 1,
+            'type': argparse.FileType('r'),
+            'help': 'YAML file of the runs, grid, seeds, and variants to sweep over',
+        },
+    }
+
+    def handle(self, args):
+        """
+        Handle command line arguments
+        """
+        sname = args.name[0]
+        cache = ResultsCache() if args.cache or settings.cache.enabled else None
+        sweep = Sweep(sname, yaml.safe_load(args.spec[0]), args.workers, cache)
+
+        if not os.path.exists(args.output):
+            os.makedirs(args.output)
+
+        # Write the results of each run as soon as it completes.
+        for idx, overrides, results in sweep:
+            path = os.path.join(
+                args.output, "{}-{:03d}.{}".format(sname, idx, args.format)
+            )
+            with open(path, 'wb') as fp:
+                results.dump(fp)
+
+        return "Results for {} runs of {} simulation written to {}".format(
+            len(sweep), sname, args.output
+        )
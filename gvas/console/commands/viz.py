@@ -54,7 +54,7 @@ class VizCommand(Command):
         },
         'results': {
             'nargs': '+',
-            'type': argparse.FileType('r'),
+            'type': argparse.FileType('rb'),
             'help': 'the path to the results file to visualize',
         },
     }
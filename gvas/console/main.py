@@ -36,6 +36,10 @@ EPILOG      = "For any bugs or concerns, please use issues on Github"
 COMMANDS    = [
     ListCommand,
     RunCommand,
+    SweepCommand,
+    ReplicateCommand,
+    ReplayCommand,
+    BenchCommand,
     VizCommand,
 ]
 
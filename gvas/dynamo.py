@@ -20,11 +20,66 @@ events or other sequences that we will use in our processes.
 ##########################################################################
 
 import random
+import hashlib
 
 from gvas.viz import plot_kde
 from gvas.viz import plot_time
 from gvas.config import settings
 from gvas.exceptions import UnknownType
+from peak.util.imports import lazyModule
+
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+
+##########################################################################
+## Random Streams
+##########################################################################
+
+class RandomStreams(object):
+    """
+    The random state of a simulation, split into independent named substreams
+    (e.g. for the stream generator, actor behavior, and placement) that are
+    each seeded from the root seed and the name of the substream. Because the
+    substreams don't share state, the values drawn from one do not depend on
+    how many values were drawn from another, and adding a new substream does
+    not change the values of the existing ones.
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(32)
+
+        self.seed    = seed
+        self.streams = {}
+
+    def spawn(self, name):
+        """
+        Returns the 32-bit seed of the named substream.
+        """
+        digest = hashlib.md5("{}:{}".format(self.seed, name)).hexdigest()
+        return int(digest[:8], 16)
+
+    def stream(self, name):
+        """
+        Returns the named substream, a `random.Random` instance.
+        """
+        if name not in self.streams:
+            self.streams[name] = random.Random(self.spawn(name))
+        return self.streams[name]
+
+    __getitem__ = stream
+
+
+def substream(env, name):
+    """
+    Returns the named random substream of the environment. Environments that
+    don't have random streams, e.g. a bare `simpy.Environment`, fall back to
+    the global random module.
+    """
+    streams = getattr(env, 'random', None)
+    if streams is None:
+        return random
+    return streams.stream(name)
 
 ##########################################################################
 ## Base Dynamo
@@ -36,11 +91,41 @@ class Dynamo(object):
     A dynamo is a numeric generator for use in our simulation. Right now this
     simply exposes the standard interface for a Python iterator, but may do
     more in the future.
+
+    Random dynamos draw single values from their own `random.Random` instance
+    and many values at once from a numpy random state once they are seeded,
+    e.g. from a substream of the simulation. Unseeded dynamos draw from the
+    global `random` module (and seed their numpy state from it on first use).
     """
 
     def next(self):
         raise NotImplementedError("Dynamos must have a next method.")
 
+    def seed(self, seed=None):
+        """
+        Reseeds the random state used for single and vectorized values.
+        Returns the dynamo so that it can be seeded as it is constructed.
+        """
+        self._random = random.Random(seed)
+        self._rng = np.random.RandomState(seed)
+        return self
+
+    @property
+    def random(self):
+        """
+        The random instance (or module) used for single values.
+        """
+        return getattr(self, '_random', None) or random
+
+    @property
+    def rng(self):
+        """
+        The numpy random state used for vectorized values.
+        """
+        if getattr(self, '_rng', None) is None:
+            self._rng = np.random.RandomState(self.random.randint(0, 2**32 - 1))
+        return self._rng
+
     def __iter__(self):
         return self
 
@@ -102,16 +187,25 @@ class Distribution(Dynamo):
     """
     A Distribution is a Dynamo (an iterator that generates numbers) but
     because it models random samples, a `get` method is aliased to `next`.
+
+    Distributions can also generate many samples at once as a numpy array
+    with the `sample` method.
     """
 
     def get(self):
         return self.next()
 
+    def sample(self, n):
+        """
+        Returns a numpy array of n samples from the distribution.
+        """
+        raise NotImplementedError("Distributions must have a sample method.")
+
     def plot(self, n=100, **kwargs):
         """
         Vizualizes the density estimate of the distribution.
         """
-        random.seed(kwargs.get('random_seed', settings.random_seed))
+        self.seed(kwargs.pop('random_seed', settings.random_seed))
         series = [self.get() for x in xrange(n)]
         axe = plot_kde(series, **kwargs)
 
@@ -154,12 +248,16 @@ class UniformDistribution(Distribution):
         self.dtype = dtype
 
     def next(self):
-        jump = {
-            'int': random.randint,
-            'float': random.uniform,
-        }
+        if self.dtype == 'int':
+            return self.random.randint(*self.range)
+        return self.random.uniform(*self.range)
 
-        return jump[self.dtype](*self.range)
+    def sample(self, n):
+        minval, maxval = self.range
+        if self.dtype == 'int':
+            # Like random.randint, the maximum value is inclusive.
+            return self.rng.randint(minval, maxval + 1, size=n)
+        return self.rng.uniform(minval, maxval, size=n)
 
 
 ## Alias for Uniform Distribution
@@ -176,13 +274,48 @@ class NormalDistribution(Distribution):
         self.sigma = stddev
 
     def next(self):
-        return random.gauss(self.mean, self.sigma)
+        return self.random.gauss(self.mean, self.sigma)
+
+    def sample(self, n):
+        return self.rng.normal(self.mean, self.sigma, size=n)
 
 
 ## Alias for Normal Distribution
 Normal = NormalDistribution
 
 
+class Prefetch(Distribution):
+    """
+    Wraps a distribution so that single samples are served from a buffer
+    that is refilled with one vectorized `sample` call of the given block
+    size, rather than making a Python random call on every `next`.
+    """
+
+    def __init__(self, distribution, block=1024):
+        self.distribution = distribution
+        self.block  = block
+        self.buffer = []
+        self.index  = 0
+
+    def next(self):
+        if self.index >= len(self.buffer):
+            self.buffer = self.distribution.sample(self.block).tolist()
+            self.index  = 0
+
+        value = self.buffer[self.index]
+        self.index += 1
+        return value
+
+    def sample(self, n):
+        return self.distribution.sample(n)
+
+    def seed(self, seed=None):
+        self.distribution.seed(seed)
+        self.buffer = []
+        self.index  = 0
+        return self
+
+
 ##########################################################################
 ## Stream
 ##########################################################################
@@ -227,7 +360,7 @@ class Stream(Dynamo):
 
             return False
 
-        if random.random() <= self.prob:
+        if self.random.random() <= self.prob:
             self.in_spike  = True
             self.spike_ts  = self.period.next()
             self.spike_by  = self.scalar.next()
@@ -244,11 +377,69 @@ class Stream(Dynamo):
 
         return val
 
+    def seed(self, seed=None):
+        """
+        Reseeds the stream and the distributions that it is composed of.
+        """
+        super(Stream, self).seed(seed)
+        for dist in (self.volume, self.scalar, self.period):
+            dist.seed(self.rng.randint(0, 2**32 - 1))
+        return self
+
+    def series(self, n):
+        """
+        Returns a numpy array of the next n volumes of the stream. Rather than
+        stepping through `spike` for every value, the spike schedule is
+        computed from vectorized samples, looping only over spike starts. The
+        spike state is carried between calls so that consecutive series form
+        a single continuous stream.
+        """
+        volume  = self.volume.sample(n)
+        periods = self.period.sample(n)
+        scalars = self.scalar.sample(n)
+        starts  = np.flatnonzero(self.rng.random_sample(n) <= self.prob)
+
+        # A spike is (start, duration, scale); its volume is scaled from the
+        # start for the duration and then a step must pass before another
+        # spike can start. A spike in progress is treated as started at -1.
+        spikes = []
+        if self.in_spike:
+            spikes.append((-1, self.spike_ts, self.spike_by))
+
+        for start in starts:
+            if spikes and start <= sum(spikes[-1][:2]):
+                continue
+            spikes.append((start, periods[start], scalars[start]))
+
+        scale = np.ones(n)
+        for start, duration, scalar in spikes:
+            scale[max(start, 0):start+duration] = scalar
+
+        # Carry the last spike over if it is still in progress.
+        self.in_spike = False
+        if spikes:
+            start, duration, scalar = spikes[-1]
+            if n <= start + duration:
+                self.in_spike = True
+                self.spike_ts = duration - (n - 1 - start)
+                self.spike_by = scalar
+
+        return volume * scale
+
+    def trace(self, chunk=1024):
+        """
+        Lazily iterates over the volume of the stream, computing the series
+        in chunks of the given size.
+        """
+        while True:
+            for val in self.series(chunk).tolist():
+                yield val
+
     def plot(self, n=100, **kwargs):
         """
         Vizualizes the volume of the stream over time.
         """
-        random.seed(kwargs.get('random_seed', settings.random_seed))
+        self.seed(kwargs.pop('random_seed', settings.random_seed))
         series = [self.next() for x in xrange(n)]
         axe = plot_time(series, **kwargs)
 
@@ -38,6 +38,41 @@ class UnknownSimulation(GVASException):
     pass
 
 
+class InvalidSweep(GVASException):
+    """
+    A parameter sweep specification could not be expanded into runs.
+    """
+    pass
+
+
+class CheckpointError(GVASException):
+    """
+    A simulation could not be checkpointed, replayed, or continued.
+    """
+    pass
+
+
+class CheckpointMismatch(CheckpointError):
+    """
+    A simulation replayed to a checkpoint does not match the checkpoint.
+    """
+    pass
+
+
+class BenchmarkError(GVASException):
+    """
+    A benchmark suite or baseline could not be loaded or run.
+    """
+    pass
+
+
+class BenchmarkRegression(BenchmarkError):
+    """
+    A benchmark performed worse than its baseline.
+    """
+    pass
+
+
 ##########################################################################
 ## Console Exceptions
 ##########################################################################
@@ -0,0 +1,220 @@
+# gvas.profiler
+# Opt-in event-count and wall-time profiling of simulation environments.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 21 10:14:52 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: profiler.py [] benjamin@bengfort.com $
+
+"""
+Opt-in event-count and wall-time profiling of simulation environments.
+
+A profiled environment attributes every event to the process that handles
+it, named by the class of the process and its generator method, e.g.
+"ActorProgram.run" or "StreamingData.run". It counts the events each process
+schedules and processes and the wall time spent in its callbacks, so that
+the processes that dominate a run can be found.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+from timeit import default_timer
+from collections import defaultdict
+
+from simpy.events import Process, NORMAL
+
+from gvas.base import Environment
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+SCRIPT = "script"   # Label of events scheduled outside of any callback
+
+##########################################################################
+## Helpers
+##########################################################################
+
+def label(callback):
+    """
+    Returns the name of the process (or other object) an event callback
+    belongs to. The name of a process is looked up once and then stored on
+    the process, since looking into its generator frame is slow.
+    """
+    owner = getattr(callback, '__self__', None)
+
+    if isinstance(owner, Process):
+        name = getattr(owner, 'profile_label', None)
+        if name is None:
+            generator = owner._generator
+            frame = generator.gi_frame
+            obj = frame.f_locals.get('self') if frame is not None else None
+            if obj is not None:
+                name = "{}.{}".format(obj.__class__.__name__, generator.__name__)
+            else:
+                name = generator.__name__
+            owner.profile_label = name
+        return name
+
+    if isinstance(owner, type):
+        return "{}.{}".format(owner.__name__, callback.__name__)
+
+    if owner is not None:
+        return "{}.{}".format(owner.__class__.__name__, callback.__name__)
+
+    return getattr(callback, '__name__', repr(callback))
+
+##########################################################################
+## Profiler
+##########################################################################
+
+class Profiler(object):
+    """
+    Counts the scheduled and processed events, and the wall time spent
+    processing them, per process label.
+    """
+
+    def __init__(self):
+        self.current   = SCRIPT
+        self.scheduled = defaultdict(int)
+        self.processed = defaultdict(int)
+        self.elapsed   = defaultdict(float)
+        self.events    = 0
+        self.wall_time = 0.0
+
+    @property
+    def events_per_second(self):
+        """
+        The number of events processed per second of wall time.
+        """
+        if not self.wall_time:
+            return 0.0
+        return self.events / self.wall_time
+
+    def hotspots(self, top=None):
+        """
+        Returns the (label, processed, scheduled, elapsed) of the processes
+        that took the most wall time, with at most `top` processes.
+        """
+        labels = set(self.processed) | set(self.scheduled)
+        rows = sorted((
+            (name, self.processed[name], self.scheduled[name], self.elapsed[name])
+            for name in labels
+        ), key=lambda row: (-row[3], -row[1], row[0]))
+        return rows[:top] if top else rows
+
+    def report(self, top=None):
+        """
+        Returns a JSON serializable summary of the profile.
+        """
+        return {
+            'events': self.events,
+            'wall_time': self.wall_time,
+            'events_per_second': self.events_per_second,
+            'processes': [
+                {
+                    'process': name,
+                    'processed': processed,
+                    'scheduled': scheduled,
+                    'elapsed': elapsed,
+                }
+                for name, processed, scheduled, elapsed in self.hotspots(top)
+            ],
+        }
+
+    def summary(self, top=10):
+        """
+        Returns a human readable summary of the events/sec and the `top`
+        processes that took the most wall time.
+        """
+        lines = [
+            "{:,} events in {:0.3f} seconds ({:,.0f} events/sec)".format(
+                self.events, self.wall_time, self.events_per_second
+            )
+        ]
+
+        for name, processed, scheduled, elapsed in self.hotspots(top):
+            share = 100.0 * elapsed / self.wall_time if self.wall_time else 0.0
+            lines.append(
+                "  {:<32} {:>10,} processed {:>10,} scheduled {:>8.3f}s ({:0.1f}%)".format(
+                    name, processed, scheduled, elapsed, share
+                )
+            )
+
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.summary()
+
+##########################################################################
+## Profiled Environment
+##########################################################################
+
+class ProfiledCallbacks(list):
+    """
+    The callbacks of a scheduled event, which count the event and label and
+    time each of its callbacks as the environment iterates over them to
+    process the event (the environment only iterates over them once).
+    """
+
+    def __init__(self, profiler, event):
+        super(ProfiledCallbacks, self).__init__(event.callbacks)
+        self.profiler = profiler
+        self.name     = event.__class__.__name__
+
+    def __iter__(self):
+        profiler = self.profiler
+        profiler.events += 1
+
+        if not len(self):
+            profiler.processed[self.name] += 1
+
+        try:
+            for callback in list.__iter__(self):
+                name = label(callback)
+                profiler.current = name
+                profiler.processed[name] += 1
+
+                before = default_timer()
+                yield callback
+                profiler.elapsed[name] += default_timer() - before
+        finally:
+            profiler.current = SCRIPT
+
+
+class ProfiledEnvironment(Environment):
+    """
+    An environment that records every event in its profiler. It is only
+    used if profiling is enabled, so that unprofiled runs pay nothing.
+    """
+
+    def __init__(self, initial_time=0, random_seed=None):
+        super(ProfiledEnvironment, self).__init__(initial_time, random_seed)
+        self.profiler = Profiler()
+
+    def schedule(self, event, priority=NORMAL, delay=0):
+        """
+        Counts the event against the process that scheduled it and replaces
+        its callbacks with profiled callbacks.
+        """
+        self.profiler.scheduled[self.profiler.current] += 1
+        event.callbacks = ProfiledCallbacks(self.profiler, event)
+        super(ProfiledEnvironment, self).schedule(event, priority, delay)
+
+    def step(self):
+        """
+        Processes the next event with `simpy.Environment.step`, timing it.
+        """
+        profiler = self.profiler
+        started  = default_timer()
+
+        try:
+            super(ProfiledEnvironment, self).step()
+        finally:
+            profiler.current = SCRIPT
+            profiler.wall_time += default_timer() - started
@@ -17,18 +17,150 @@ Manages the serialization of experimental results and their reporting.
 ## Imports
 ##########################################################################
 
+import os
 import json
 import gvas
+import hashlib
 
 from gvas.config import settings
 from gvas.viz import plot_results
 from gvas.utils.serialize import JSONEncoder
+from gvas.utils.serialize import dump_npz, load_npz
 from gvas.utils.decorators import Timer
 from gvas.utils.timez import HUMAN_DATETIME
 from gvas.utils.timez import epochptime
-
+from peak.util.imports import lazyModule
 from collections import defaultdict
 
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+pd = lazyModule('pandas')
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+BINARY_EXTENSION = ".npz"   # Results files with this extension are binary
+STREAM_EXTENSION = ".jsonl" # Results files with this extension are streamed
+STREAM_CHUNK     = 1000     # Default number of values per streamed chunk
+
+##########################################################################
+## Helper Functions
+##########################################################################
+
+def extension(fp):
+    """
+    Returns the lower case extension of the name of a results file.
+    """
+    name = getattr(fp, 'name', '')
+    return os.path.splitext(name)[1].lower()
+
+
+def is_binary(fp):
+    """
+    Determines if a results file is binary from the extension of its name.
+    """
+    return extension(fp) == BINARY_EXTENSION
+
+
+def is_stream(fp):
+    """
+    Determines if a results file is JSON lines from the extension of its name.
+    """
+    return extension(fp) == STREAM_EXTENSION
+
+##########################################################################
+## Result Columns
+##########################################################################
+
+class Column(object):
+    """
+    Stores the values of a single metric in a preallocated, typed numpy
+    array that doubles in size when it is full. The dtype is taken from the
+    first value appended and is promoted if a later value requires it (e.g.
+    an int column that is updated with a float).
+
+    The column also keeps a running digest of every value appended to it
+    (including values that have been cleared), which is only updated with
+    the values appended since it was last taken.
+    """
+
+    def __init__(self, values=None, capacity=0):
+        self.capacity = capacity
+        self.length   = 0
+        self.data     = None
+        self.digest   = hashlib.sha1()
+        self.hashed   = 0   # The number of values added to the digest
+
+        if values is not None and len(values):
+            self.data   = np.asarray(values)
+            self.length = len(self.data)
+
+    def append(self, value):
+        """
+        Appends a value to the column, growing or promoting it as needed.
+        """
+        dtype = np.asarray(value).dtype
+
+        if self.data is None:
+            self.resize(max(self.capacity, 1), dtype)
+        else:
+            size  = len(self.data)
+            dtype = np.promote_types(self.data.dtype, dtype)
+            if self.length == size:
+                self.resize(size * 2, dtype)
+            elif dtype != self.data.dtype:
+                self.resize(size, dtype)
+
+        self.data[self.length] = value
+        self.length += 1
+
+    def resize(self, size, dtype):
+        """
+        Reallocates the column with the given size and dtype.
+        """
+        data = np.empty(size, dtype=dtype)
+        if self.data is not None:
+            data[:self.length] = self.data[:self.length]
+        self.data = data
+
+    @property
+    def values(self):
+        """
+        A numpy view of the values in the column (not a copy).
+        """
+        if self.data is None:
+            return np.empty(0)
+        return self.data[:self.length]
+
+    def fingerprint(self):
+        """
+        Adds the values appended since the last fingerprint to the digest and
+        returns its hex digest. Numbers are digested as floats so that the
+        digest does not depend on when the column was promoted.
+        """
+        values = self.values[self.hashed:]
+        if len(values):
+            if values.dtype.kind in 'biuf':
+                data = values.astype(np.float64).tobytes()
+            else:
+                data = "".join(json.dumps(value) + "\n" for value in values.tolist())
+            self.digest.update(data)
+            self.hashed = self.length
+        return self.digest.hexdigest()
+
+    def clear(self):
+        """
+        Empties the column, keeping the allocated array for reuse. The values
+        are added to the digest before they are cleared.
+        """
+        self.fingerprint()
+        self.length = 0
+        self.hashed = 0
+
+    def __len__(self):
+        return self.length
+
 ##########################################################################
 ## Results Object
 ##########################################################################
@@ -41,14 +173,44 @@ class Results(object):
     @classmethod
     def load(klass, fp):
         """
-        Load a results object from a JSON file on disk.
+        Load a results object from a JSON file on disk, or from a binary npz
+        file if the file has the npz extension. The columns of a binary file
+        on disk are memory-mapped rather than read into memory.
         """
+        if is_binary(fp):
+            data, results = load_npz(fp)
+            return klass(results=results, **data)
+
+        if is_stream(fp):
+            return klass.load_stream(fp)
+
         data = json.load(fp)
         return klass(**data)
 
+    @classmethod
+    def load_stream(klass, fp):
+        """
+        Load a results object from a JSON lines file written by `stream`,
+        concatenating the chunks of every column. Later headers update the
+        metadata of earlier ones.
+        """
+        data    = {}
+        results = defaultdict(list)
+
+        for line in fp:
+            if not line.strip():
+                continue
+
+            record = json.loads(line)
+            data.update(record.get('header', {}))
+            for key, values in record.get('results', {}).iteritems():
+                results[key].extend(values)
+
+        return klass(results=results, **data)
+
     def __init__(self, **kwargs):
         # Set reasonable defaults for results
-        self.results    = defaultdict(list)
+        self.columns    = {}
         self.timer      = Timer()
         self.simulation = None
         self.version    = gvas.get_version()
@@ -56,20 +218,136 @@ class Results(object):
         self.timesteps  = settings.max_sim_time
         self.cluster    = settings.defaults
 
+        # The file the results are being streamed to, if any
+        self._stream    = None
+        self._chunk     = STREAM_CHUNK
+
         # Set any properties that need to be serialized (override above)
         for key, val in kwargs.iteritems():
             setattr(self, key, val)
 
+    @property
+    def results(self):
+        """
+        A dictionary of the values of each metric as numpy arrays, which are
+        views on the underlying columns rather than copies.
+        """
+        return dict(
+            (key, column.values) for key, column in self.columns.iteritems()
+        )
+
+    @results.setter
+    def results(self, results):
+        self.columns = dict(
+            (key, Column(values)) for key, values in results.iteritems()
+        )
+
+    def fingerprint(self):
+        """
+        Returns the digest of every value recorded for each metric so far,
+        which only costs as much as the values recorded since the last call.
+        """
+        return dict(
+            (key, column.fingerprint()) for key, column in self.columns.iteritems()
+        )
+
     def update(self, key, value):
         """
         Updates the results by appending the value to the appropriate key.
+        Columns are preallocated for the number of timesteps in the run, or
+        for a chunk if the results are being streamed, in which case the
+        results are flushed to disk whenever a column fills a chunk.
         """
-        self.results[key].append(value)
+        if key not in self.columns:
+            capacity = self.timesteps
+            if self._stream is not None:
+                capacity = min(capacity, self._chunk)
+            self.columns[key] = Column(capacity=capacity)
+
+        column = self.columns[key]
+        column.append(value)
+
+        if self._stream is not None and len(column) >= self._chunk:
+            self.flush()
+
+    def stream(self, fp, chunk=STREAM_CHUNK):
+        """
+        Streams the results to a JSON lines file while the simulation runs so
+        that memory stays bounded and a crash doesn't lose the run. A header
+        of metadata is written first, then every chunk of values is written
+        as a line of results and removed from memory. Call `close` at the end
+        of the run to flush the remaining values and write the final header.
+        """
+        self._stream = fp
+        self._chunk  = chunk
+        self.write_line({'header': self.header()})
+
+    def flush(self):
+        """
+        Writes the values in every column to the stream and clears them.
+        """
+        if self._stream is None:
+            return
+
+        results = dict(
+            (key, values) for key, values in self.results.iteritems() if len(values)
+        )
+
+        if results:
+            self.write_line({'results': results})
+
+        for column in self.columns.itervalues():
+            column.clear()
+
+    def close(self):
+        """
+        Flushes the stream and writes the final header, e.g. with the timer.
+        """
+        if self._stream is None:
+            return
+
+        self.flush()
+        self.write_line({'header': self.header()})
+        self._stream = None
+
+    def write_line(self, record):
+        """
+        Writes a record as a line of JSON to the stream and flushes the file.
+        """
+        self._stream.write(json.dumps(record, cls=JSONEncoder) + "\n")
+        self._stream.flush()
+
+    def header(self):
+        """
+        Returns the serialized metadata of the results, e.g. without values.
+        """
+        data = self.serialize()
+        data.pop('results', None)
+        return data
+
+    def to_frame(self):
+        """
+        Returns the results as a pandas DataFrame with a column per metric.
+        """
+        return pd.DataFrame(dict(
+            (key, pd.Series(values, copy=False))
+            for key, values in self.results.iteritems()
+        ))
 
     def dump(self, fp, **kwargs):
         """
-        Write the results object back down to disk.
+        Write the results object back down to disk as JSON, or as a binary
+        npz file of the columns with the metadata as a JSON header if the file
+        has the npz extension.
         """
+        if is_binary(fp):
+            return dump_npz(fp, self.header(), self.results)
+
+        if is_stream(fp):
+            record = {'header': self.header(), 'results': self.results}
+            fp.write(json.dumps(record, cls=JSONEncoder, **kwargs) + "\n")
+            return
+
         kwargs['cls'] = kwargs.get('cls', JSONEncoder)
         json.dump(self, fp, **kwargs)
 
@@ -80,7 +358,9 @@ class Results(object):
 
         def properties(self):
             for key, val in self.__dict__.iteritems():
-                if not key.startswith('_') and not callable(val):
+                if key == 'columns':
+                    yield ('results', self.results)
+                elif not key.startswith('_') and not callable(val):
                     yield (key, val)
 
         return dict(properties(self))
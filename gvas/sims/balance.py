@@ -18,24 +18,13 @@ A load balancing simulation with the actor model.
 ##########################################################################
 
 from gvas.config import settings
-from gvas.dynamo import Stream, Normal
+from gvas.dynamo import Stream, Normal, substream
 from gvas.cluster.network import Message
 from gvas.base import Simulation, Process
 from gvas.cluster import create_default_cluster
 from gvas.actors import ActorProgram, ActorManager
 from gvas.utils.logger import LoggingMixin
 
-##########################################################################
-## Module Constants
-##########################################################################
-
-MESSAGE_SIZE     = settings.simulations.balance.message_size
-MESSAGE_MEAN     = settings.simulations.balance.message_mean
-MESSAGE_STDDEV   = settings.simulations.balance.message_stddev
-SPIKE_SCALE      = settings.simulations.balance.spike_scale
-SPIKE_PROBABILTY = settings.simulations.balance.spike_prob
-SPIKE_DURATION   = settings.simulations.balance.spike_duration
-
 ##########################################################################
 ## Data Generator (Stream)
 ##########################################################################
@@ -50,13 +39,31 @@ class StreamingData(Process, LoggingMixin):
     def __init__(self, env, service, **kwargs):
         """
         Takes an environment and an actor service, and streams data to it.
+        Optionally a precomputed trace of volumes can be passed in to be
+        streamed instead of the volumes generated from the stream dynamo.
         """
+        conf = settings.simulations.balance
+
         self.service = service
-        self.stream  = Stream(MESSAGE_MEAN, MESSAGE_STDDEV, SPIKE_SCALE, SPIKE_PROBABILTY, SPIKE_DURATION)
-        self.values  = Normal(64, 32)
+        rand = substream(env, 'streams')
+        self.stream  = Stream(conf.message_mean, conf.message_stddev, conf.spike_scale, conf.spike_prob, conf.spike_duration).seed(rand.getrandbits(32))
+        self.message_size = conf.message_size
+        self.values  = Normal(64, 32).seed(rand.getrandbits(32))
+        self.volumes = iter(kwargs.get('trace', self.stream.trace()))
         self.last_volume = 0
         super(StreamingData, self).__init__(env)
 
+    def serialize(self):
+        """
+        Returns the state of the data stream, e.g. for checkpoints.
+        """
+        return {
+            'last_volume': self.last_volume,
+            'in_spike': self.stream.in_spike,
+            'spike_ts': self.stream.spike_ts,
+            'spike_by': self.stream.spike_by,
+        }
+
     def run(self):
         """
         Creates messages based on the data volume and sends to the service.
@@ -66,11 +73,11 @@ class StreamingData(Process, LoggingMixin):
         yield self.env.timeout(5)
 
         while True:
-            volume = int(self.stream.next())
+            volume = int(next(self.volumes))
             if volume > 0:
-                self.logger.info("STREAM: NEW MESSAGES: {}".format(volume))
-                for idx in xrange(volume):
-                    self.service.route(Message(None, None, self.values.get(), MESSAGE_SIZE, self.env.now, None))
+                self.logger.info("STREAM: NEW MESSAGES: %s", volume)
+                for value in self.values.sample(volume).tolist():
+                    self.service.route(Message(None, None, value, self.message_size, self.env.now, None))
 
             self.last_volume = volume
             yield self.env.timeout(1)
@@ -79,7 +86,7 @@ class StreamingData(Process, LoggingMixin):
 class BalanceActor(ActorProgram):
 
     def handle(self, message):
-        self.logger.info("ACTOR: ID: {}, WORKING".format(self.id))
+        self.logger.info("ACTOR: ID: %s, WORKING", self.id)
         yield self.env.timeout(1)
 
 ##########################################################################
@@ -113,9 +120,35 @@ class BalanceSimulation(Simulation):
             self.diary.update('utilization', self.utilization)
             self.diary.update('backlog', self.backlog)
             self.diary.update('incoming', self.stream.last_volume)
+
+            # Record the network backlogs if messages queue for bandwidth.
+            if settings.defaults.network.overflow != 'raise':
+                for rack, depth, wait in self.cluster.get_queue_stats():
+                    self.diary.update('queue_depth.{}'.format(rack), depth)
+                    self.diary.update('queue_wait.{}'.format(rack), wait)
+
             # self.diary.update('ready', self.ready)
             yield self.env.timeout(1)
 
+    def reconfigure(self):
+        """
+        Passes changes to the balance settings on to the manager.
+        """
+        self.manager.reconfigure()
+
+    def state(self):
+        """
+        Adds the cluster, actors, manager, and stream to the state.
+        """
+        state = super(BalanceSimulation, self).state()
+        state.update({
+            'cluster': self.cluster.serialize(),
+            'actors': [actor.serialize() for actor in sorted(self.manager.actors(), key=lambda a: a.id)],
+            'manager': self.manager.serialize(),
+            'stream': self.stream.serialize(),
+        })
+        return state
+
     @property
     def utilization(self):
         """
@@ -160,8 +193,9 @@ class BalanceSimulation(Simulation):
         self.manager = ActorManager(self.env, self.cluster)
         self.stream  = StreamingData(self.env, self.manager)
 
-        # Create actor programs for every node in the cluster.
-        for node in self.cluster.nodes:
-            for idx in xrange(node.cpus):
-                program = BalanceActor(self.env, self.manager, ports=[idx+10, idx+20])
-                node.assign(program)
+        # Create an actor program for every cpu in the cluster, each placed
+        # by the cluster on the fullest node that still has a free cpu.
+        slots = sum(node.idle_cpus for node in self.cluster.nodes)
+        for idx in xrange(slots):
+            program = BalanceActor(self.env, self.manager, ports=[idx+10, idx+20])
+            self.cluster.assign(program)
@@ -23,7 +23,7 @@ TODO: Deprecate this simulation, it is just a stub.
 
 import simpy
 
-from gvas.dynamo import Sequence, Uniform
+from gvas.dynamo import Sequence, Uniform, substream
 from gvas.base import Process, NamedProcess
 from gvas.base import Simulation
 
@@ -52,7 +52,7 @@ class Car(NamedProcess):
 
     def __init__(self, env, station):
         self.station    = station
-        self.fuel_level = Uniform(*FUELTANK_LEVEL).get()
+        self.fuel_level = substream(env, 'fuel').randint(*FUELTANK_LEVEL)
 
         super(Car, self).__init__(env)
 
@@ -90,7 +90,7 @@ class CarGenerator(Process):
 
     def __init__(self, env, station):
         self.station = station
-        self.uniform = Uniform(*T_INTER)
+        self.uniform = Uniform(*T_INTER).seed(substream(env, 'arrivals').getrandbits(32))
         super(CarGenerator, self).__init__(env)
 
     def run(self):
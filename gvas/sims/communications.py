@@ -18,7 +18,7 @@ A simulation that can model different communication patterns.
 ##########################################################################
 
 from gvas.config import settings
-from gvas.dynamo import Stream, Normal
+from gvas.dynamo import Stream, Normal, substream
 from gvas.cluster.network import Message
 from gvas.base import Simulation, Process
 from gvas.cluster import create_default_cluster
@@ -26,18 +26,6 @@ from gvas.actors import BlueActor, GreenActor, RedActor, CommunicationsManager
 from gvas.utils.logger import LoggingMixin
 from .balance import BalanceSimulation
 
-##########################################################################
-## Module Constants
-##########################################################################
-
-MESSAGE_SIZE     = settings.simulations.communications.message_size
-MESSAGE_MEAN     = settings.simulations.communications.message_mean
-MESSAGE_STDDEV   = settings.simulations.communications.message_stddev
-SPIKE_SCALE      = settings.simulations.communications.spike_scale
-SPIKE_PROBABILTY = settings.simulations.communications.spike_prob
-SPIKE_DURATION   = settings.simulations.communications.spike_duration
-INITIAL_COLOR    = settings.simulations.communications.initial_color
-
 ##########################################################################
 ## Data Generator (Stream)
 ##########################################################################
@@ -50,13 +38,32 @@ class StreamingData(Process, LoggingMixin):
     def __init__(self, env, service, **kwargs):
         """
         Takes an environment and an actor service, and streams data to it.
+        Optionally a precomputed trace of volumes can be passed in to be
+        streamed instead of the volumes generated from the stream dynamo.
         """
+        conf = settings.simulations.communications
+
         self.service = service
-        self.stream  = Stream(MESSAGE_MEAN, MESSAGE_STDDEV, SPIKE_SCALE, SPIKE_PROBABILTY, SPIKE_DURATION)
-        self.values  = Normal(64, 32)
+        rand = substream(env, 'streams')
+        self.stream  = Stream(conf.message_mean, conf.message_stddev, conf.spike_scale, conf.spike_prob, conf.spike_duration).seed(rand.getrandbits(32))
+        self.message_size = conf.message_size
+        self.color   = conf.initial_color
+        self.values  = Normal(64, 32).seed(rand.getrandbits(32))
+        self.volumes = iter(kwargs.get('trace', self.stream.trace()))
         self.last_volume = 0
         super(StreamingData, self).__init__(env)
 
+    def serialize(self):
+        """
+        Returns the state of the data stream, e.g. for checkpoints.
+        """
+        return {
+            'last_volume': self.last_volume,
+            'in_spike': self.stream.in_spike,
+            'spike_ts': self.stream.spike_ts,
+            'spike_by': self.stream.spike_by,
+        }
+
     def run(self):
         """
         Creates messages based on the data volume and sends to the service.
@@ -66,11 +73,11 @@ class StreamingData(Process, LoggingMixin):
         yield self.env.timeout(5)
 
         while True:
-            volume = int(self.stream.next())
+            volume = int(next(self.volumes))
             if volume > 0:
-                self.logger.info("STREAM: NEW MESSAGES: {}".format(volume))
-                for idx in xrange(volume):
-                    self.service.route(Message(None, None, self.values.get(), MESSAGE_SIZE, self.env.now, INITIAL_COLOR))
+                self.logger.info("STREAM: NEW MESSAGES: %s", volume)
+                for value in self.values.sample(volume).tolist():
+                    self.service.route(Message(None, None, value, self.message_size, self.env.now, self.color))
 
             self.last_volume = volume
             yield self.env.timeout(1)
@@ -81,6 +88,12 @@ class StreamingData(Process, LoggingMixin):
 
 class CommunicationsSimulation(BalanceSimulation):
 
+    def __init__(self, **kwargs):
+        super(CommunicationsSimulation, self).__init__(**kwargs)
+
+        # Record the communications configuration in the results object.
+        self.diary.configuration = settings.simulations.communications
+
     def instrument(self):
         """
         A side process that records the state of the cluster at every step.
@@ -89,6 +102,13 @@ class CommunicationsSimulation(BalanceSimulation):
             self.diary.update('utilization', self.utilization)
             self.diary.update('backlog', self.backlog)
             self.diary.update('incoming', self.stream.last_volume)
+
+            # Record the network backlogs if messages queue for bandwidth.
+            if settings.defaults.network.overflow != 'raise':
+                for rack, depth, wait in self.cluster.get_queue_stats():
+                    self.diary.update('queue_depth.{}'.format(rack), depth)
+                    self.diary.update('queue_wait.{}'.format(rack), wait)
+
             yield self.env.timeout(1)
 
     def initial_actor(self, color):
@@ -105,10 +125,11 @@ class CommunicationsSimulation(BalanceSimulation):
         """
         self.manager = CommunicationsManager(self.env, self.cluster)
         self.stream  = StreamingData(self.env, self.manager)
-        Actor = self.initial_actor(INITIAL_COLOR)
-
-        # Create actor programs for every node in the cluster.
-        for node in self.cluster.nodes:
-            for idx in xrange(node.cpus):
-                program = Actor(self.env, self.manager, ports=[idx+10, idx+20])
-                node.assign(program)
+        Actor = self.initial_actor(settings.simulations.communications.initial_color)
+
+        # Create an actor program for every cpu in the cluster, each placed
+        # by the cluster on the fullest node that still has a free cpu.
+        slots = sum(node.idle_cpus for node in self.cluster.nodes)
+        for idx in xrange(slots):
+            program = Actor(self.env, self.manager, ports=[idx+10, idx+20])
+            self.cluster.assign(program)
@@ -23,7 +23,6 @@ A relatively simple simulation to exercise the cluster objects.
 ##########################################################################
 
 import simpy
-import random
 import sys
 
 from gvas.config import settings
@@ -31,23 +30,7 @@ from gvas.base import Process, NamedProcess
 from gvas.base import Simulation
 from gvas.cluster import *
 from gvas.cluster.network import Message, Address
-from gvas.dynamo import Uniform
-
-##########################################################################
-# Simulation Configuration
-##########################################################################
-
-CLUSTER_SIZE    = settings.defaults.cluster.size
-RACK_SIZE       = settings.defaults.rack.size
-NODE_CPUS       = settings.defaults.node.cpus
-NODE_MEMORY     = settings.defaults.node.memory
-
-NODE_COUNT      = settings.simulations.simple.node_count
-START_COUNT     = settings.simulations.simple.start_team_size
-MIN_MSG_SIZE    = settings.simulations.simple.min_msg_size
-MAX_MSG_SIZE    = settings.simulations.simple.max_msg_size
-MIN_MSG_VALUE   = settings.simulations.simple.min_msg_value
-MAX_MSG_VALUE   = settings.simulations.simple.max_msg_value
+from gvas.dynamo import Uniform, substream
 
 ##########################################################################
 # Classes
@@ -125,16 +108,18 @@ class SimpleSimulation(Simulation):
         return latency / len(self.cluster.racks)
 
     def script(self):
+        conf = settings.simulations.simple
+
         rack_options = {
-            'size': RACK_SIZE
+            'size': settings.defaults.rack.size
         }
         node_options = {
-            'cpus': NODE_CPUS,
-            'memory': NODE_MEMORY
+            'cpus': settings.defaults.node.cpus,
+            'memory': settings.defaults.node.memory
         }
         gen = Cluster.create(
             self.env,
-            size=CLUSTER_SIZE,
+            size=settings.defaults.cluster.size,
             rack_options=rack_options,
             node_options=node_options,
         )
@@ -145,15 +130,15 @@ class SimpleSimulation(Simulation):
         pgen = PingProgram.create(self.env, cpus=1, memory=4, ports=[3333, 4444])
 
         # create nodes using cluster's node generator
-        nodes = [cluster.add() for i in range(NODE_COUNT)]
+        nodes = [cluster.add() for i in range(conf.node_count)]
 
         # assign new programs to each node
         for n in nodes:
             n.assign(pgen.next())
 
         # set some programs to start working instead of waiting
-        starters = random.sample(nodes, START_COUNT)
-        work_maker = Uniform(10, 50, 'int')
+        starters = substream(self.env, 'placement').sample(nodes, conf.start_team_size)
+        work_maker = Uniform(10, 50, 'int').seed(substream(self.env, 'work').getrandbits(32))
         for n in starters:
             p = n.programs[n.programs.keys()[0]]
             p.work_queue.append(work_maker.next())
@@ -163,8 +148,10 @@ class PingProgram(Program):
 
     def __init__(self, env, *args, **kwargs):
         self.work_queue = []
-        self.message_size_gen = Uniform(MIN_MSG_SIZE, MAX_MSG_SIZE, 'int')
-        self.message_value_gen = Uniform(MIN_MSG_VALUE, MAX_MSG_VALUE, 'int')
+        conf = settings.simulations.simple
+        rand = substream(env, 'actors')
+        self.message_size_gen = Uniform(conf.min_msg_size, conf.max_msg_size, 'int').seed(rand.getrandbits(32))
+        self.message_value_gen = Uniform(conf.min_msg_value, conf.max_msg_value, 'int').seed(rand.getrandbits(32))
         self.msg_received = env.event()
 
         super(PingProgram, self).__init__(env, *args, **kwargs)
@@ -209,7 +196,9 @@ class PingProgram(Program):
         self.node.send(
             dst=recip.address._replace(port=3333),
             size=self.message_size_gen.next(),
-            value=self.message_value_gen.next()
+            value=self.message_value_gen.next(),
+            sent=self.env.now,
+            color=None,
         )
 
         # print "Program {}: done sending at {}\n".format(self.id, self.env.now)
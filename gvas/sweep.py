@@ -0,0 +1,350 @@
+# gvas.sweep
+# Runs a simulation across a grid of configuration overrides in parallel.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 14 10:12:44 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: sweep.py [] benjamin@bengfort.com $
+
+"""
+Runs a simulation across a grid of configuration overrides in parallel.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import json
+import shutil
+import tempfile
+import multiprocessing
+
+from itertools import product
+
+from gvas.config import settings
+from gvas.dynamo import Sequence
+from gvas.results import Results
+from gvas.aggregate import Aggregate
+from gvas.cache import cache_key, merge
+from gvas.checkpoint import configuration, fork_variant
+from gvas.utils.serialize import JSONEncoder
+from gvas.exceptions import UnknownSimulation, InvalidSweep
+from peak.util.imports import lazyModule
+
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+# Settings that are only read when a simulation starts, which variants
+# continued from a running simulation therefore cannot change.
+STARTUP_SETTINGS = (
+    'random_seed',
+    'simulations.balance.dispatch',
+    'simulations.communications.dispatch',
+)
+
+##########################################################################
+## Sweep Specification
+##########################################################################
+
+def nest(overrides):
+    """
+    Converts a dictionary of dotted keys, e.g. "defaults.cluster.size" into
+    the nested dictionary that `settings.configure` expects.
+    """
+    conf = {}
+    for key, value in overrides.iteritems():
+        parts = key.split(".")
+        level = conf
+        for part in parts[:-1]:
+            level = level.setdefault(part, {})
+        level[parts[-1]] = value
+    return conf
+
+
+def expand(spec):
+    """
+    Expands a sweep specification into a list of override dictionaries with
+    dotted keys. The specification is a dictionary with any of the keys:
+
+        - runs: a list of overrides, each of which is a separate run
+        - grid: a mapping of dotted key to a list of values to sweep over
+        - seeds: a list of random seeds to run every configuration with
+
+    The cartesian product of the runs, the grid, and the seeds is returned.
+    The warmup and variants keys of a sweep are expanded by `variants`.
+    """
+    if not isinstance(spec, dict):
+        raise InvalidSweep("A sweep specification must be a mapping.")
+
+    unknown = set(spec) - set(('runs', 'grid', 'seeds', 'warmup', 'variants'))
+    if unknown:
+        raise InvalidSweep(
+            "Unknown sweep specification keys: {}".format(", ".join(sorted(unknown)))
+        )
+
+    runs  = spec.get('runs') or [{}]
+    grid  = spec.get('grid') or {}
+    seeds = spec.get('seeds') or [None]
+
+    keys  = sorted(grid)
+    for key in keys:
+        if not isinstance(grid[key], (list, tuple)):
+            raise InvalidSweep("Grid values for {} must be a list.".format(key))
+
+    overrides = []
+    for run in runs:
+        for values in product(*[grid[key] for key in keys]):
+            for seed in seeds:
+                override = dict(run)
+                override.update(zip(keys, values))
+                if seed is not None:
+                    override['random_seed'] = seed
+                overrides.append(override)
+
+    return overrides
+
+
+def variants(spec):
+    """
+    Expands the variants of a sweep specification: a nested specification
+    of runs and grid (but not seeds) of overrides that are applied to every
+    run of the sweep at its warmup timestep. Runs with variants share the
+    simulation up to the warmup timestep, which is only computed once.
+    Returns [{}] if the sweep has no variants.
+    """
+    if 'variants' not in spec:
+        return [{}]
+
+    if spec.get('warmup') is None:
+        raise InvalidSweep("Sweep variants require a warmup timestep.")
+
+    if 'seeds' in spec['variants'] or 'variants' in spec['variants']:
+        raise InvalidSweep("Sweep variants cannot change the seed or have variants.")
+
+    return check_variants(expand(spec['variants']))
+
+
+def check_variants(overrides):
+    """
+    Returns the overrides of the variants of a running simulation, or raises
+    InvalidSweep if any of them change a setting that is only read at the
+    start of the simulation, e.g. the seed.
+    """
+    fixed = set(
+        key for variant in overrides for key in variant if key in STARTUP_SETTINGS
+    )
+    if fixed:
+        raise InvalidSweep(
+            "Variants cannot change settings read at the start of the "
+            "simulation: {}".format(", ".join(sorted(fixed)))
+        )
+    return overrides
+
+##########################################################################
+## Worker Process
+##########################################################################
+
+def serialize(results):
+    """
+    Returns the JSON serialized header and the numpy arrays of the results,
+    since the results object itself cannot be pickled.
+    """
+    header = json.loads(json.dumps(results.header(), cls=JSONEncoder))
+    return header, dict(
+        (key, np.array(values)) for key, values in results.results.iteritems()
+    )
+
+
+def prepare(overrides):
+    """
+    Configures the settings of a worker process with the overrides and
+    resets the sequence counters, so that every run in a worker starts from
+    the same state as a run in a fresh interpreter.
+    """
+    from gvas.base import NamedProcess
+    from gvas.utils.logger import SimulationLogger
+
+    settings.logging.silent = True
+    settings.checkpoint.interval = 0
+    settings.configure(nest(overrides))
+
+    NamedProcess.counter = Sequence()
+    SimulationLogger.counter = Sequence()
+
+
+def run_simulation(task):
+    """
+    Runs the simulations of a task in a worker process. The task is a tuple
+    of the registered simulation name, the overrides, the warmup timestep,
+    and a list of (index, variant) runs. Because the worker has its own copy
+    of the global settings and sequence counters they are configured and
+    reset here without affecting other runs.
+
+    Without a warmup the single run is simulated from start to finish.
+    Otherwise the simulation is run up to the warmup timestep once, then
+    each variant is continued from there in a forked child process.
+
+    Returns a list of the index, the results header, and the results arrays
+    of every run in the task.
+    """
+    from gvas.sims import registry
+
+    name, overrides, warmup, runs = task
+    prepare(overrides)
+
+    simulation = registry[name].klass()
+    simulation.diary.overrides = overrides
+
+    if warmup is None:
+        simulation.run()
+        return [(index,) + serialize(simulation.diary) for index, variant in runs]
+
+    simulation.diary.warmup = warmup
+    simulation.setup()
+    simulation.script()
+    simulation.advance(warmup)
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        completed = []
+        for index, variant in runs:
+            path = os.path.join(tmpdir, "{}.npz".format(index))
+            fork_variant(simulation, variant, path)
+            with open(path, 'rb') as fp:
+                completed.append((index,) + serialize(Results.load(fp)))
+        return completed
+    finally:
+        shutil.rmtree(tmpdir)
+
+##########################################################################
+## Sweep Runner
+##########################################################################
+
+class Sweep(object):
+    """
+    Runs a registered simulation once for every set of overrides in a sweep
+    specification (and every variant of them), in worker processes.
+    Iterating over the sweep yields (index, overrides, results) tuples as
+    the runs complete, which may not be in the order of the specification.
+
+    If a results cache is given, runs whose results are in the cache are
+    not run again and the results of new runs are added to the cache.
+    """
+
+    def __init__(self, name, spec, workers=None, cache=None):
+        from gvas.sims import registry
+
+        if name not in registry:
+            raise UnknownSimulation('"{}" is not a valid simulation.'.format(name))
+
+        self.name      = name
+        self.klass     = registry[name].klass
+        self.bases     = expand(spec)
+        self.variants  = variants(spec)
+        self.warmup    = spec.get('warmup') if 'variants' in spec else None
+        self.workers   = workers or multiprocessing.cpu_count()
+        self.cache     = cache
+
+        # The overrides of every run, indexed by run.
+        self.overrides = [
+            merge(base, variant)
+            for base in self.bases for variant in self.variants
+        ]
+
+    def key(self, index):
+        """
+        Returns the cache key of the run with the given index.
+        """
+        base    = self.bases[index // len(self.variants)]
+        variant = self.variants[index % len(self.variants)]
+        conf    = merge(configuration(settings), nest(base))
+
+        if self.warmup is None:
+            return cache_key(self.klass, conf)
+        return cache_key(self.klass, conf, self.warmup, variant)
+
+    def tasks(self, skip=()):
+        """
+        Returns the tasks that are sent to the worker processes, one for
+        every base configuration (with all of its variants) except for the
+        runs with the indices to skip.
+        """
+        tasks = []
+        for bdx, base in enumerate(self.bases):
+            runs = [
+                (bdx * len(self.variants) + vdx, variant)
+                for vdx, variant in enumerate(self.variants)
+            ]
+            runs = [run for run in runs if run[0] not in skip]
+            if runs:
+                tasks.append((self.name, base, self.warmup, runs))
+        return tasks
+
+    def __iter__(self):
+        # Yield the cached runs first, then run everything else.
+        cached = set()
+        if self.cache is not None:
+            for index, overrides in enumerate(self.overrides):
+                results = self.cache.get(self.key(index))
+                if results is not None:
+                    cached.add(index)
+                    yield index, overrides, results
+
+        tasks = self.tasks(cached)
+        if not tasks:
+            return
+
+        # A fresh process for every task, so no state leaks between runs.
+        pool = multiprocessing.Pool(self.workers, maxtasksperchild=1)
+        try:
+            for completed in pool.imap_unordered(run_simulation, tasks):
+                for index, header, results in completed:
+                    results = Results(results=results, **header)
+                    if self.cache is not None:
+                        self.cache.put(self.key(index), results)
+                    yield index, self.overrides[index], results
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+
+    def __len__(self):
+        return len(self.overrides)
+
+##########################################################################
+## Replica Runner
+##########################################################################
+
+class Replicas(Sweep):
+    """
+    Runs a registered simulation once for each of `replicas` random seeds,
+    starting at `seed`, in parallel worker processes and merges every run
+    into an `Aggregate` as it completes. Iterating over the replicas yields
+    (index, seed, aggregate) tuples where the aggregate holds the partial
+    statistics of all the replicas that have finished so far.
+    """
+
+    def __init__(self, name, replicas, seed=None, workers=None, overrides=None, **kwargs):
+        seed  = settings.random_seed if seed is None else seed
+        spec  = {
+            'runs': [overrides] if overrides else None,
+            'seeds': range(seed, seed + replicas),
+        }
+
+        super(Replicas, self).__init__(name, spec, workers)
+        self.aggregate = Aggregate(seed=seed, **kwargs)
+
+    def __iter__(self):
+        for index, overrides, results in super(Replicas, self).__iter__():
+            self.aggregate.update(results)
+            yield index, overrides['random_seed'], self.aggregate
@@ -99,11 +99,21 @@ class WrappedLogger(object):
 
         self.extras = kwargs
 
+    def isEnabledFor(self, level):
+        """
+        Returns True if the wrapped logger would handle messages at the level.
+        """
+        return self.logger.isEnabledFor(level)
+
     def log(self, level, message, *args, **kwargs):
         """
         This is the primary method to override to ensure logging with extra
-        options gets correctly specified.
+        options gets correctly specified. Messages may use %-style args that
+        are only interpolated if the message is actually emitted.
         """
+        if not self.isEnabledFor(level):
+            return
+
         extra = self.extras.copy()
         extra.update(kwargs.pop('extra', {}))
 
@@ -170,6 +180,10 @@ class SimulationLogger(WrappedLogger):
         """
         Provide current user as extra context to the logger
         """
+        # Don't build the extra context for messages that won't be emitted.
+        if not self.isEnabledFor(level):
+            return
+
         extra = kwargs.pop('extra', {})
         extra.update({
             'user':  self.user,
@@ -181,6 +195,20 @@ class SimulationLogger(WrappedLogger):
         super(SimulationLogger, self).log(level, message, *args, **kwargs)
 
 
+class SilentLogger(SimulationLogger):
+    """
+    A simulation logger for silent simulations that drops debug and info
+    messages without any level checks, so that logging calls in the hot
+    loops of the actors cost no more than a method call. Warnings and more
+    severe messages are still logged.
+    """
+
+    def debug(self, message, *args, **kwargs):
+        pass
+
+    def info(self, message, *args, **kwargs):
+        pass
+
 ##########################################################################
 ## Logging Mixin
 ##########################################################################
@@ -193,10 +221,12 @@ class LoggingMixin(object):
     @property
     def logger(self):
         """
-        Instantiates and returns a SmoakLogger instance
+        Instantiates and returns a SimulationLogger instance, or if the
+        simulation is configured to be silent, a SilentLogger instance.
         """
         if not hasattr(self, '_logger') or not self._logger:
-            self._logger = SimulationLogger(self.env)
+            klass = SilentLogger if settings.logging.silent else SimulationLogger
+            self._logger = klass(self.env)
         return self._logger
 
 if __name__ == '__main__':
@@ -1,5 +1,5 @@
 # gvas.utils.serialize
-# Provides helpers for JSON and CSV serialization to disk.
+# Provides helpers for JSON, CSV, and npz serialization to disk.
 #
 # Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
 # Created:  Sun Dec 06 21:37:53 2015 -0500
@@ -10,7 +10,7 @@
 # ID: gvas.utils.serialize.py [] benjamin@bengfort.com $
 
 """
-Provides helpers for JSON and CSV serialization to disk.
+Provides helpers for JSON, CSV, and npz serialization to disk.
 """
 
 ##########################################################################
@@ -18,8 +18,21 @@ Provides helpers for JSON and CSV serialization to disk.
 ##########################################################################
 
 import json
+import struct
+import zipfile
 
 from gvas.utils.timez import dthandler
+from peak.util.imports import lazyModule
+
+# Perform lazy loading of numeric libraries
+np = lazyModule('numpy')
+
+##########################################################################
+## Module Constants
+##########################################################################
+
+NPZ_HEADER = "__header__"       # Name of the JSON metadata in npz files
+ZIP_LOCAL_HEADER = "<4s5H3I2H"  # Layout of a zip local file header
 
 ##########################################################################
 ## JSON encoding
@@ -37,7 +50,7 @@ class JSONEncoder(json.JSONEncoder):
         """
         Convert np.array to a list object.
         """
-        return list(obj)
+        return obj.tolist()
 
     def default(self, obj):
         """
@@ -64,3 +77,75 @@ class JSONEncoder(json.JSONEncoder):
                     obj.__class__.__name__, self.__class__.__name__
                 )
             )
+
+
+##########################################################################
+## npz encoding
+##########################################################################
+
+def dump_npz(fp, header, arrays):
+    """
+    Writes a dictionary of numpy arrays to an uncompressed npz file, along
+    with a header of metadata that is stored as a JSON string.
+    """
+    arrays = dict(arrays)
+    arrays[NPZ_HEADER] = np.array(json.dumps(header, cls=JSONEncoder))
+    np.savez(fp, **arrays)
+
+
+def load_npz(fp):
+    """
+    Loads the header and the dictionary of arrays from an npz file written by
+    `dump_npz`. If the file is on disk then the arrays are memory-mapped
+    rather than read into memory.
+    """
+    path = getattr(fp, 'name', None)
+    npz  = np.load(fp)
+
+    try:
+        header = json.loads(npz[NPZ_HEADER].item())
+        arrays = {}
+
+        for name in npz.files:
+            if name == NPZ_HEADER:
+                continue
+
+            arrays[name] = None
+            if path is not None:
+                arrays[name] = memmap_npz_member(path, npz.zip.getinfo(name + '.npy'))
+
+            if arrays[name] is None:
+                arrays[name] = npz[name]
+
+        return header, arrays
+    finally:
+        npz.close()
+
+
+def memmap_npz_member(path, info):
+    """
+    Memory-maps an uncompressed .npy member of an npz file by locating its
+    data in the zip archive. Returns None if the member can't be mapped.
+    """
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+
+    with open(path, 'rb') as f:
+        # Skip the local file header, its file name and extra fields
+        f.seek(info.header_offset)
+        local = struct.unpack(ZIP_LOCAL_HEADER, f.read(struct.calcsize(ZIP_LOCAL_HEADER)))
+        f.seek(local[-2] + local[-1], 1)
+
+        # Read the .npy header to find the array layout
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+
+    if dtype.hasobject or not all(shape):
+        return None
+
+    order = 'F' if fortran else 'C'
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order=order)
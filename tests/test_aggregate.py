@@ -0,0 +1,97 @@
+# tests.test_aggregate
+# Tests for the aggregation of replicated simulation results.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 15 11:05:13 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_aggregate.py [] benjamin@bengfort.com $
+
+"""
+Tests for the aggregation of replicated simulation results.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+import numpy as np
+
+from gvas.results import Results
+from gvas.aggregate import Aggregate, MetricAggregate
+
+##########################################################################
+## Aggregate Tests
+##########################################################################
+
+class MetricAggregateTests(unittest.TestCase):
+
+    def setUp(self):
+        self.replicas = np.random.RandomState(42).normal(10, 2, size=(20, 50))
+
+    def test_statistics(self):
+        """
+        Ensure the online statistics match those computed in memory.
+        """
+        metric = MetricAggregate()
+        for values in self.replicas:
+            metric.update(values)
+
+        self.assertEqual(metric.replicas, 20)
+        self.assertTrue(np.allclose(metric.mean, self.replicas.mean(axis=0)))
+        self.assertTrue(np.allclose(metric.stddev, self.replicas.std(axis=0, ddof=1)))
+        self.assertTrue(np.allclose(
+            metric.percentile(50), np.percentile(self.replicas, 50, axis=0)
+        ))
+
+        lower, upper = metric.interval()
+        self.assertTrue((lower < metric.mean).all())
+        self.assertTrue((upper > metric.mean).all())
+
+    def test_reservoir(self):
+        """
+        Ensure the percentile samples are bounded by the reservoir size.
+        """
+        metric = MetricAggregate(reservoir=5)
+        for values in self.replicas:
+            metric.update(values)
+
+        self.assertEqual(metric.samples.shape, (5, 50))
+        self.assertTrue(np.allclose(metric.mean, self.replicas.mean(axis=0)))
+
+    def test_ragged(self):
+        """
+        Ensure replicas with different lengths are counted per timestep.
+        """
+        metric = MetricAggregate()
+        metric.update([1, 2])
+        metric.update([3, 4, 5])
+
+        self.assertEqual(metric.count.tolist(), [2, 2, 1])
+        self.assertEqual(metric.mean.tolist(), [2.0, 3.0, 5.0])
+        self.assertEqual(metric.percentile(50).tolist(), [2.0, 3.0, 5.0])
+
+
+class AggregateTests(unittest.TestCase):
+
+    def test_to_results(self):
+        """
+        Ensure the aggregate is converted into results of every statistic.
+        """
+        aggregate = Aggregate(percentiles=(50,))
+        for seed in xrange(3):
+            results = Results(simulation='TestSimulation', randseed=seed, timesteps=2)
+            results.update('backlog', seed)
+            results.update('backlog', seed * 2)
+            aggregate.update(results)
+
+        results = aggregate.to_results()
+        self.assertEqual(results.replicas, 3)
+        self.assertEqual(results.seeds, [0, 1, 2])
+        self.assertEqual(results.simulation, 'TestSimulation')
+        self.assertEqual(results.results['backlog.mean'].tolist(), [1.0, 2.0])
+        self.assertEqual(results.results['backlog.p50'].tolist(), [1.0, 2.0])
+        self.assertIn('backlog.lower', results.results)
@@ -0,0 +1,141 @@
+# tests.test_bench
+# Tests for the benchmark suite and baseline comparison.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 22 12:01:44 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_bench.py [] benjamin@bengfort.com $
+
+"""
+Tests for the benchmark suite and baseline comparison.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+
+from StringIO import StringIO
+from gvas.config import settings
+from gvas.base import NamedProcess
+from gvas.checkpoint import configuration
+from gvas.utils.logger import SimulationLogger
+from gvas.bench import SUITE, load_suite, compare, report
+from gvas.bench import count_events, run_benchmark
+from gvas.exceptions import BenchmarkError, UnknownSimulation
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+def make_record(scale='small', **kwargs):
+    record = {
+        'simulation': 'balance',
+        'scale': scale,
+        'max_sim_time': 100,
+        'events': 20000,
+        'messages': 4000,
+        'wall_time': 1.0,
+        'events_per_second': 20000.0,
+        'messages_per_second': 4000.0,
+        'peak_rss': 40.0,
+    }
+    record.update(kwargs)
+    return record
+
+##########################################################################
+## Benchmark Tests
+##########################################################################
+
+class BenchmarkSuiteTests(unittest.TestCase):
+
+    def test_default_suite(self):
+        """
+        Ensure the default suite runs every simulation at every scale.
+        """
+        with open(SUITE, 'r') as fp:
+            benchmarks = load_suite(fp)
+
+        self.assertEqual(len(benchmarks), 6)
+        name, scale, overrides = benchmarks[0]
+        self.assertEqual((name, scale), ('balance', 'large'))
+        self.assertIn('max_sim_time', overrides)
+        self.assertIn('random_seed', overrides)
+
+    def test_invalid_suite(self):
+        """
+        Ensure invalid suites raise an exception.
+        """
+        with self.assertRaises(BenchmarkError):
+            load_suite(StringIO("simulations: [balance]"))
+
+        with self.assertRaises(BenchmarkError):
+            load_suite(StringIO("scales: {small: {}}\nscale: {}"))
+
+        with self.assertRaises(UnknownSimulation):
+            load_suite(StringIO("simulations: [foo]\nscales: {small: {}}"))
+
+
+    def test_run_benchmark(self):
+        """
+        Ensure a benchmark is timed unprofiled with the events counted apart.
+        """
+        task = ('balance', 'tiny', {
+            'random_seed': 42,
+            'max_sim_time': 20,
+            'defaults.network.capacity': 10**9,
+            'defaults.cluster.node_count': 4,
+        })
+
+        # Benchmarks reset the settings and the global sequence counters.
+        conf     = configuration(settings)
+        counters = (NamedProcess.counter, SimulationLogger.counter)
+        try:
+            events = count_events(task)
+            record = run_benchmark(task, events)
+        finally:
+            settings.configure(conf)
+            NamedProcess.counter, SimulationLogger.counter = counters
+
+        self.assertFalse(settings.profiling.enabled)
+        self.assertEqual((record['simulation'], record['scale']), ('balance', 'tiny'))
+        self.assertGreater(events, 0)
+        self.assertEqual(record['events'], events)
+        self.assertGreater(record['messages'], 0)
+        self.assertAlmostEqual(
+            record['events_per_second'], record['events'] / record['wall_time']
+        )
+
+
+class BaselineTests(unittest.TestCase):
+
+    def test_compare(self):
+        """
+        Ensure regressions beyond the tolerance are flagged.
+        """
+        baseline = {'benchmarks': [make_record(), make_record('large')]}
+        records  = [
+            make_record(events_per_second=19000.0, peak_rss=60.0),
+            make_record('large', wall_time=0.5),
+            make_record('huge', wall_time=100.0),
+        ]
+
+        regressions = compare(records, baseline, tolerance=0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(regressions[0][:3], ('balance', 'small', 'peak_rss'))
+        self.assertAlmostEqual(regressions[0][-1], 0.5)
+
+        self.assertEqual(len(compare(records, baseline, tolerance=0.01)), 2)
+
+    def test_report(self):
+        """
+        Ensure the report includes the change from the baseline.
+        """
+        baseline = {'benchmarks': [make_record()]}
+        output   = report([make_record(events_per_second=30000.0)], baseline)
+        self.assertIn("+50.0%", output)
+        self.assertEqual(len(output.splitlines()), 2)
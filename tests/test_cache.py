@@ -0,0 +1,117 @@
+# tests.test_cache
+# Tests for the local cache of simulation results.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Wed Jan 20 11:02:17 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_cache.py [] benjamin@bengfort.com $
+
+"""
+Tests for the local cache of simulation results.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from gvas.results import Results
+from gvas.config import settings
+from gvas.cache import ResultsCache, cache_key, merge
+from gvas.checkpoint import configuration
+
+##########################################################################
+## Cache Tests
+##########################################################################
+
+class CacheKeyTests(unittest.TestCase):
+
+    def test_merge(self):
+        """
+        Ensure nested overrides are merged without changing the original.
+        """
+        conf   = {'a': {'b': 1, 'c': 2}, 'd': 3}
+        merged = merge(conf, {'a': {'b': 4}})
+
+        self.assertEqual(merged, {'a': {'b': 4, 'c': 2}, 'd': 3})
+        self.assertEqual(conf['a']['b'], 1)
+
+    def test_cache_key(self):
+        """
+        Ensure cache keys only change with the settings that matter.
+        """
+        conf = configuration(settings)
+        conf['random_seed'] = 42
+        key  = cache_key('gvas.sims.BalanceSimulation', conf)
+
+        self.assertEqual(key, cache_key('gvas.sims.BalanceSimulation', dict(conf)))
+        self.assertNotEqual(key, cache_key('gvas.sims.CommunicationsSimulation', conf))
+        self.assertNotEqual(key, cache_key('gvas.sims.BalanceSimulation', merge(conf, {'random_seed': 43})))
+        self.assertNotEqual(key, cache_key('gvas.sims.BalanceSimulation', conf, 10, {'max_sim_time': 20}))
+
+        # Logging and other ignored settings do not change the results.
+        quiet = merge(conf, {'logging': {'silent': not settings.logging.silent}})
+        self.assertEqual(key, cache_key('gvas.sims.BalanceSimulation', quiet))
+
+        # Unseeded runs cannot be cached.
+        self.assertIsNone(cache_key('gvas.sims.BalanceSimulation', merge(conf, {'random_seed': None})))
+
+
+class CacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def make_results(self, size=10):
+        results = Results(simulation='TestSimulation', timesteps=size)
+        for idx in xrange(size):
+            results.update('utilization', idx)
+        return results
+
+    def test_get_put(self):
+        """
+        Ensure results are written to and read from the cache.
+        """
+        cache = ResultsCache(self.tmpdir, max_size=1)
+        self.assertIsNone(cache.get('abc'))
+        self.assertNotIn('abc', cache)
+
+        cache.put('abc', self.make_results())
+        self.assertIn('abc', cache)
+        self.assertEqual(len(cache), 1)
+
+        loaded = cache.get('abc')
+        self.assertEqual(loaded.simulation, 'TestSimulation')
+        self.assertEqual(loaded.results['utilization'].tolist(), range(10))
+
+    def test_evict(self):
+        """
+        Ensure the least recently used entries are evicted.
+        """
+        cache = ResultsCache(self.tmpdir, max_size=1)
+        for key in ('a', 'b', 'c'):
+            path = cache.put(key, self.make_results())
+            os.utime(path, (ord(key), ord(key)))
+
+        # Reading an entry makes it the most recently used.
+        cache.get('a')
+
+        size = os.path.getsize(cache.path('a'))
+        cache.max_size = (2.5 * size) / (1024 * 1024)
+        self.assertEqual(cache.evict(), 1)
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
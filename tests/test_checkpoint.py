@@ -0,0 +1,116 @@
+# tests.test_checkpoint
+# Tests for checkpointing, replaying, and forking simulations.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 18 15:32:11 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_checkpoint.py [] benjamin@bengfort.com $
+
+"""
+Tests for checkpointing, replaying, and forking simulations.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from gvas.config import settings
+from gvas.results import Results
+from gvas.sims.balance import BalanceSimulation
+from gvas.checkpoint import Checkpoint, configuration
+from gvas.exceptions import CheckpointMismatch
+
+##########################################################################
+## Checkpoint Tests
+##########################################################################
+
+class CheckpointTests(unittest.TestCase):
+
+    def setUp(self):
+        self.settings = configuration(settings)
+        self.tmpdir   = tempfile.mkdtemp()
+
+        settings.configure({
+            'logging': {'silent': True},
+            'defaults': {
+                'network': {'capacity': 10**9},
+                'cluster': {'node_count': 8},
+            },
+            'checkpoint': {'interval': 10, 'directory': self.tmpdir},
+        })
+
+        self.simulation = BalanceSimulation(max_sim_time=30, random_seed=7)
+        self.simulation.run()
+
+        settings.checkpoint.interval = 0
+
+    def tearDown(self):
+        settings.configure(self.settings)
+        shutil.rmtree(self.tmpdir)
+
+    def load(self, now):
+        path = os.path.join(self.tmpdir, "BalanceSimulation-7-{:08d}.json".format(now))
+        with open(path, 'r') as fp:
+            return Checkpoint.load(fp)
+
+    def assertResultsEqual(self, first, second):
+        self.assertEqual(sorted(first), sorted(second))
+        for key in first:
+            self.assertEqual(first[key].tolist(), second[key].tolist())
+
+    def test_checkpoints(self):
+        """
+        Ensure checkpoints are written at the interval with results so far.
+        """
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir)),
+            ["BalanceSimulation-7-00000010.json", "BalanceSimulation-7-00000020.json"]
+        )
+
+        checkpoint = self.load(20)
+        self.assertEqual(checkpoint.now, 20)
+        self.assertEqual(len(checkpoint.to_results().results['backlog']), 20)
+
+    def test_replay(self):
+        """
+        Ensure a replayed simulation matches the uninterrupted simulation.
+        """
+        simulation = self.load(20).run()
+        self.assertResultsEqual(simulation.diary.results, self.simulation.diary.results)
+
+    def test_mismatch(self):
+        """
+        Ensure a replayed simulation is verified against the checkpoint.
+        """
+        checkpoint = self.load(10)
+        checkpoint.digest = "0" * 40
+
+        with self.assertRaises(CheckpointMismatch):
+            checkpoint.replay()
+
+    def test_fork(self):
+        """
+        Ensure variants are forked from a checkpoint and run to completion.
+        """
+        variants = [{}, {'max_sim_time': 40}]
+        paths = [os.path.join(self.tmpdir, "variant-{}.json".format(idx)) for idx in xrange(2)]
+
+        forked = list(self.load(10).fork(variants, paths, workers=2))
+        self.assertEqual(len(forked), 2)
+
+        with open(paths[0], 'r') as fp:
+            results = Results.load(fp)
+        self.assertResultsEqual(results.results, self.simulation.diary.results)
+
+        with open(paths[1], 'r') as fp:
+            results = Results.load(fp)
+        self.assertEqual(results.variant, {'max_sim_time': 40})
+        self.assertEqual(len(results.results['backlog']), 40)
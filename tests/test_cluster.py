@@ -0,0 +1,397 @@
+# tests.test_cluster
+# Tests for the cluster, rack, and node resource accounting.
+#
+# Author:   Allen Leis <allen.leis@gmail.com>
+# Created:  Tue Jan 12 10:48:31 2016 -0500
+#
+# Copyright (C) 2016 Allen Leis
+# For license information, see LICENSE.txt
+#
+# ID: test_cluster.py [] allen.leis@gmail.com $
+
+"""
+Tests for the cluster, rack, and node resource accounting.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import pickle
+import unittest
+
+from gvas.cluster import Program
+from gvas.cluster import create_default_cluster
+from gvas.config import settings
+from gvas.cluster.rack import Rack
+from gvas.cluster.network import Address, Message, Network
+from gvas.cluster.delivery import TimingWheel
+from gvas.cluster.latency import LinearLatency
+from gvas.exceptions import ClusterLacksCapacity, BandwidthExceeded
+from gvas.exceptions import UndeliverableMessage
+
+##########################################################################
+## Mock Program
+##########################################################################
+
+class MockProgram(Program):
+
+    def __init__(self, env, *args, **kwargs):
+        self.received = []
+        super(MockProgram, self).__init__(env, *args, **kwargs)
+
+    def recv(self, message):
+        self.received.append((self.env.now, message.value))
+
+    def run(self):
+        yield self.env.timeout(1)
+
+
+class MockRack(object):
+
+    id = 1
+
+    def __init__(self, env):
+        self.env = env
+        self.received = []
+
+    def recv(self, message):
+        self.received.append((self.env.now, message))
+
+
+def items(sent):
+    """
+    Returns the items of the (item, latency) pairs sent by a network.
+    """
+    return [item for item, latency in sent]
+
+##########################################################################
+## Cluster Tests
+##########################################################################
+
+class ClusterCapacityTests(unittest.TestCase):
+
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.cluster = create_default_cluster(
+            self.env, node_count=4, cpus=4, memory=16
+        )
+
+    def test_node_accounting(self):
+        """
+        Ensure node resources are tracked through assign and unassign.
+        """
+        node = self.cluster.first(lambda n: True)
+        program = MockProgram(self.env, cpus=3, memory=8, ports=[10])
+
+        node.assign(program)
+        self.assertEqual(node.idle_cpus, 1)
+        self.assertEqual(node.idle_memory, 8)
+        self.assertIs(self.cluster.addresses.lookup(program.address), program)
+
+        self.assertIs(node.unassign(program), program)
+        self.assertEqual(node.idle_cpus, 4)
+        self.assertEqual(node.idle_memory, 16)
+        self.assertIsNone(program.node)
+        self.assertIsNone(node.unassign(program))
+
+    def test_capacity_index(self):
+        """
+        Ensure the capacity index finds the best fitting node.
+        """
+        nodes = list(self.cluster.nodes)
+        nodes[1].assign(MockProgram(self.env, cpus=2, memory=2, ports=[10]))
+        nodes[2].assign(MockProgram(self.env, cpus=3, memory=2, ports=[10]))
+
+        self.assertIs(self.cluster.capacity.find(1), nodes[2])
+        self.assertIs(self.cluster.capacity.find(2), nodes[1])
+        self.assertIn(self.cluster.capacity.find(4), (nodes[0], nodes[3]))
+        self.assertIsNone(self.cluster.capacity.find(5))
+        self.assertIsNone(self.cluster.capacity.find(1, memory=32))
+
+    def test_cluster_assign(self):
+        """
+        Ensure programs are placed until the cluster is out of capacity.
+        """
+        for idx in xrange(16):
+            self.cluster.assign(MockProgram(self.env, cpus=1, memory=1, ports=[10]))
+
+        self.assertEqual(len(self.cluster.capacity.find(0).programs), 4)
+        with self.assertRaises(ClusterLacksCapacity):
+            self.cluster.assign(MockProgram(self.env, cpus=1, memory=1, ports=[10]))
+
+    def test_address_cache(self):
+        """
+        Ensure addresses are cached until a node moves to another rack.
+        """
+        cluster = create_default_cluster(
+            self.env, csize=2, rsize=2, node_count=2, cpus=4, memory=16
+        )
+        racks = list(cluster.racks.values())
+        node  = next(iter(racks[0].nodes.values()))
+        program = MockProgram(self.env, cpus=1, memory=1, ports=[10])
+        node.assign(program)
+
+        address = program.address
+        self.assertIs(program.address, address)
+        self.assertEqual(address, (racks[0].id, node.id, 10, program.id))
+
+        racks[0].remove(node)
+        racks[1].add(node)
+        self.assertEqual(node.address.rack, racks[1].id)
+        self.assertEqual(program.address, (racks[1].id, node.id, 10, program.id))
+
+
+
+class AddressingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.cluster = create_default_cluster(
+            self.env, csize=2, rsize=2, node_count=4, cpus=4, memory=16
+        )
+        self.nodes = list(self.cluster.nodes)
+        self.programs = [
+            MockProgram(self.env, cpus=1, memory=1, ports=ports)
+            for ports in ([10], [10, 20], [20])
+        ]
+        for program in self.programs:
+            self.nodes[0].assign(program)
+
+    def message(self, address):
+        return Message(None, address, 1, 5, 0, None)
+
+    def test_resolve(self):
+        """
+        Ensure the address table resolves pids and ports on the right node.
+        """
+        table = self.cluster.addresses
+        rack, node = self.nodes[0].rack.id, self.nodes[0].id
+        first, second, third = self.programs
+
+        self.assertEqual(table.resolve(Address(rack, node, 10, None)), [first, second])
+        self.assertEqual(table.resolve(Address(rack, node, 20, None)), [second, third])
+        self.assertEqual(table.resolve(Address(rack, node, 30, None)), [])
+        self.assertEqual(table.resolve(Address(rack, node, 10, third.id)), [third])
+
+        # The pid must be on the addressed rack and node
+        other = self.nodes[-1]
+        self.assertNotEqual(other.rack.id, rack)
+        self.assertIsNone(table.lookup(Address(rack, other.id, 10, first.id)))
+        self.assertIsNone(table.lookup(Address(other.rack.id, node, 10, first.id)))
+        self.assertIs(table.lookup(first.address), first)
+
+    def test_node_recv(self):
+        """
+        Ensure a node delivers port addressed messages to every listener.
+        """
+        node = self.nodes[0]
+        node.recv(self.message(node.address._replace(port=20)))
+        node.recv(self.message(self.programs[0].address))
+
+        self.assertEqual([len(p.received) for p in self.programs], [1, 1, 1])
+        with self.assertRaises(UndeliverableMessage):
+            node.recv(self.message(node.address._replace(port=30)))
+
+    def test_standalone_rack(self):
+        """
+        Ensure nodes in a rack without a cluster deliver to their programs.
+        """
+        rack = Rack(self.env, size=2)
+        node = rack.node_generator.next()
+        rack.add(node)
+        first, second = [
+            MockProgram(self.env, cpus=1, memory=1, ports=[10]) for _ in xrange(2)
+        ]
+        node.assign(first)
+        node.assign(second)
+        self.assertIsNone(node.cluster)
+
+        node.recv(self.message(node.address._replace(port=10)))
+        node.recv(self.message(second.address))
+        self.assertEqual([len(p.received) for p in (first, second)], [1, 2])
+
+        with self.assertRaises(UndeliverableMessage):
+            node.recv(self.message(node.address._replace(port=10, pid=-1)))
+
+
+class MessageTests(unittest.TestCase):
+
+    def test_routing_header(self):
+        """
+        Ensure a message can be rerouted in place and copied with changes.
+        """
+        message = Message(None, None, 3, 5, 0, 'blue')
+        message.dst = (1, 2, 10, 4)
+        self.assertEqual(list(message), [None, (1, 2, 10, 4), 3, 5, 0, 'blue'])
+
+        copy = message._replace(dst=None)
+        self.assertIsNone(copy.dst)
+        self.assertEqual(message.dst, (1, 2, 10, 4))
+        self.assertNotEqual(copy, message)
+
+    def test_serialize(self):
+        """
+        Ensure messages serialize and pickle like the tuples they replace.
+        """
+        message = Message(None, (1, 2, 10, 4), 3, 5, 0, 'blue')
+        self.assertEqual(message.serialize(), [None, (1, 2, 10, 4), 3, 5, 0, 'blue'])
+        self.assertEqual(pickle.loads(pickle.dumps(message)), message)
+        self.assertEqual(pickle.loads(pickle.dumps(message, 2)), message)
+
+
+class NetworkDeliveryTests(unittest.TestCase):
+
+    scheduler = 'batched'
+
+    def setUp(self):
+        self.env = simpy.Environment()
+        settings.defaults.network.delivery = self.scheduler
+        self.cluster = create_default_cluster(
+            self.env, csize=2, rsize=2, node_count=4, cpus=4, memory=16
+        )
+
+    def tearDown(self):
+        settings.defaults.network.delivery = 'batched'
+
+    def test_batched_delivery(self):
+        """
+        Ensure messages are delivered in batches per rack and tick, in order.
+        """
+        racks = sorted(self.cluster.racks.itervalues(), key=lambda r: r.id)
+        local, remote = [rack.nodes.values()[0] for rack in racks]
+        latency = racks[0].network.latency
+
+        target = MockProgram(self.env, cpus=1, memory=1, ports=[10])
+        faraway = MockProgram(self.env, cpus=1, memory=1, ports=[10])
+        local.assign(target)
+        remote.assign(faraway)
+
+        for idx in xrange(3):
+            local.send(Message(local.address, target.address, idx, 5, 0, None))
+            local.send(Message(local.address, faraway.address, idx, 5, 0, None))
+
+        # Both the local and outbound hops share one batch on the local rack.
+        self.assertEqual(self.cluster.delivery.serialize(), [
+            (latency, racks[0].id, 6),
+            (latency + racks[1].egress_latency, racks[1].id, 3),
+        ])
+        self.assertEqual(racks[0].network.traffic, 30)
+        self.assertEqual(racks[1].network.traffic, 15)
+
+        self.env.run()
+
+        self.assertEqual(target.received, [(latency, idx) for idx in xrange(3)])
+        self.assertEqual(
+            faraway.received,
+            [(latency + racks[1].egress_latency, idx) for idx in xrange(3)]
+        )
+
+        self.assertEqual(len(self.cluster.delivery), 0)
+        for rack in racks:
+            self.assertEqual(rack.network.traffic, 0)
+            self.assertEqual(rack.network.message_count, 0)
+
+    def test_delivery_order(self):
+        """
+        Ensure messages due between pending deliveries are not delayed.
+        """
+        rack = MockRack(self.env)
+        delivery = self.cluster.delivery
+
+        delivery.schedule(rack, 'a', 10)
+        delivery.schedule(rack, 'b', 5)
+        delivery.schedule(rack, 'c', 7)
+
+        self.env.run()
+        self.assertEqual(rack.received, [(5, 'b'), (7, 'c'), (10, 'a')])
+        self.assertEqual(len(delivery), 0)
+
+
+class TimingWheelDeliveryTests(NetworkDeliveryTests):
+
+    scheduler = 'wheel'
+
+    def test_wheel(self):
+        """
+        Ensure the wheel wakes up at every due tick and grows as needed.
+        """
+        rack  = MockRack(self.env)
+        wheel = TimingWheel(self.env, slots=4)
+
+        wheel.schedule(rack, 'c', 3)
+        wheel.schedule(rack, 'a', 1)
+        wheel.schedule(rack, 'd', 9)
+        wheel.schedule(rack, 'b', 1)
+        self.assertGreaterEqual(wheel.slots, 10)
+        self.assertEqual(len(wheel), 4)
+
+        self.env.run()
+        self.assertEqual(rack.received, [(1, 'a'), (1, 'b'), (3, 'c'), (9, 'd')])
+        self.assertEqual(len(wheel), 0)
+
+
+class NetworkBacklogTests(unittest.TestCase):
+
+    def setUp(self):
+        self.env = simpy.Environment()
+
+    def test_raise(self):
+        """
+        Ensure the network raises when it lacks bandwidth by default.
+        """
+        network = Network(self.env, capacity=10, overflow='raise')
+        self.assertEqual(items(network.request(8, 'a')), ['a'])
+        with self.assertRaises(BandwidthExceeded):
+            network.request(8, 'b')
+
+    def test_fifo(self):
+        """
+        Ensure queued messages are sent in order as bandwidth is released.
+        """
+        network = Network(self.env, capacity=10, overflow='fifo')
+        self.assertEqual(items(network.request(8, 'a')), ['a'])
+        self.assertEqual(items(network.request(6, 'b')), [])
+        self.assertEqual(items(network.request(1, 'c')), [])
+        self.assertEqual(network.depth, 2)
+
+        self.env.run(until=5)
+        network.recv(8)
+        self.assertEqual(items(network.admit()), ['b', 'c'])
+        self.assertEqual(network.depth, 0)
+        self.assertEqual(network.max_depth, 2)
+        self.assertEqual(network.mean_wait, 5.0)
+
+        with self.assertRaises(BandwidthExceeded):
+            network.request(11, 'd')
+
+    def test_priority(self):
+        """
+        Ensure the smallest queued messages are sent first.
+        """
+        network = Network(self.env, capacity=10, overflow='priority')
+        self.assertEqual(items(network.request(8, 'a')), ['a'])
+        self.assertEqual(items(network.request(6, 'b')), [])
+        self.assertEqual(items(network.request(4, 'c')), [])
+        self.assertEqual(items(network.request(1, 'd')), ['d'])
+
+        network.recv(8)
+        self.assertEqual(items(network.admit()), ['c'])
+        self.assertEqual(network.depth, 1)
+
+    def test_admitted_latency(self):
+        """
+        Ensure the latency of a queued item is the latency when it is sent.
+        """
+        network = Network(
+            self.env, capacity=10, overflow='fifo',
+            latency_model=LinearLatency(10, slope=100),
+        )
+
+        self.assertEqual(network.request(5, 'a'), [('a', 60.0)])
+        self.assertEqual(network.request(8, 'b'), [])
+
+        # Sent once the bandwidth of a is released, at 80% utilization
+        network.recv(5)
+        self.assertEqual(network.admit(), [('b', 90.0)])
@@ -23,6 +23,9 @@ from gvas.dynamo import Sequence
 from gvas.dynamo import ExponentialSequence
 from gvas.dynamo import NormalDistribution
 from gvas.dynamo import UniformDistribution
+from gvas.dynamo import Prefetch
+from gvas.dynamo import Stream
+from gvas.dynamo import RandomStreams
 from gvas.exceptions import UnknownType
 
 ##########################################################################
@@ -154,3 +157,110 @@ class DistributionTests(unittest.TestCase):
         mean    = total / samples
 
         self.assertAlmostEqual(mean, 0.0, places=2)
+
+
+##########################################################################
+## Vectorized Sampling Tests
+##########################################################################
+
+class SamplingTests(unittest.TestCase):
+    """
+    Make sure that vectorized samples behave like the distributions.
+    """
+
+    def test_uniform_sample(self):
+        """
+        Test vectorized int and float uniform samples are in range.
+        """
+        ints = UniformDistribution(10, 100).sample(100000)
+        self.assertEqual(len(ints), 100000)
+        self.assertGreaterEqual(ints.min(), 10)
+        self.assertLessEqual(ints.max(), 100)
+
+        floats = UniformDistribution(1.0, 10.0).sample(100000)
+        self.assertGreaterEqual(floats.min(), 1.0)
+        self.assertLessEqual(floats.max(), 10.0)
+
+    def test_normal_sample(self):
+        """
+        Assert that the mean of a vectorized sample approximates the mean.
+        """
+        dist = NormalDistribution(0, 1)
+        self.assertAlmostEqual(dist.sample(1000000).mean(), 0.0, places=2)
+
+    def test_seeded_sample(self):
+        """
+        Ensure that seeded samples are reproducible.
+        """
+        dist = NormalDistribution(0, 1)
+        dist.seed(42)
+        first = dist.sample(100).tolist()
+        dist.seed(42)
+        self.assertEqual(dist.sample(100).tolist(), first)
+
+    def test_prefetch(self):
+        """
+        Ensure prefetched values match the vectorized sample stream.
+        """
+        dist = NormalDistribution(0, 1)
+        dist.seed(42)
+        expected = dist.sample(25).tolist()
+
+        prefetch = Prefetch(NormalDistribution(0, 1), block=10)
+        prefetch.seed(42)
+        self.assertEqual([prefetch.next() for idx in xrange(10)], expected[:10])
+
+    def test_stream_series(self):
+        """
+        Ensure a stream series is continuous across chunks and the trace.
+        """
+        stream = Stream(16, 8, 5, 0.2, 6)
+        stream.seed(42)
+        series = stream.series(100).tolist() + stream.series(100).tolist()
+
+        stream = Stream(16, 8, 5, 0.2, 6)
+        stream.seed(42)
+        trace = stream.trace(chunk=100)
+        self.assertEqual([next(trace) for idx in xrange(200)], series)
+
+    def test_seeded_next(self):
+        """
+        Ensure single values are reproducible from the seed of the dynamo.
+        """
+        first  = UniformDistribution(0, 100).seed(42)
+        second = UniformDistribution(0, 100).seed(42)
+        self.assertEqual(
+            [first.next() for idx in xrange(10)],
+            [second.next() for idx in xrange(10)],
+        )
+
+##########################################################################
+## Random Streams Tests
+##########################################################################
+
+class RandomStreamsTests(unittest.TestCase):
+
+    def test_reproducible(self):
+        """
+        Ensure substreams with the same root seed and name are identical.
+        """
+        first  = RandomStreams(42).stream('actors')
+        second = RandomStreams(42).stream('actors')
+        self.assertEqual(
+            [first.random() for idx in xrange(10)],
+            [second.random() for idx in xrange(10)],
+        )
+
+    def test_independent(self):
+        """
+        Ensure draws from one substream do not affect another.
+        """
+        streams = RandomStreams(42)
+        streams['placement'].random()
+        streams['placement'].random()
+        values  = [streams['actors'].random() for idx in xrange(10)]
+
+        streams = RandomStreams(42)
+        self.assertEqual([streams['actors'].random() for idx in xrange(10)], values)
+        self.assertNotEqual(streams.spawn('actors'), streams.spawn('placement'))
+        self.assertNotEqual(streams.spawn('actors'), RandomStreams(43).spawn('actors'))
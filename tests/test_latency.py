@@ -0,0 +1,101 @@
+# tests.test_latency
+# Tests for the network latency models.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Tue Jan 26 11:52:36 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_latency.py [] benjamin@bengfort.com $
+
+"""
+Tests for the network latency models.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import unittest
+
+from confire import ImproperlyConfigured
+from gvas.exceptions import UnknownType
+from gvas.cluster.network import Network
+from gvas.cluster.latency import create_latency_model
+from gvas.cluster.latency import ConstantLatency, LinearLatency
+from gvas.cluster.latency import MM1Latency, PiecewiseLatency
+
+##########################################################################
+## Latency Model Tests
+##########################################################################
+
+class LatencyModelTests(unittest.TestCase):
+
+    def test_constant(self):
+        """
+        Ensure the constant model ignores the utilization.
+        """
+        model = ConstantLatency(10)
+        self.assertTrue(model.constant)
+        self.assertEqual(model(0.0), 10)
+        self.assertEqual(model(1.0), 10)
+
+    def test_linear(self):
+        """
+        Ensure the linear model grows with the utilization in whole ticks.
+        """
+        model = LinearLatency(10, slope=100)
+        self.assertEqual(model(0.0), 10)
+        self.assertEqual(model(0.255), 36)
+        self.assertEqual(model(1.0), 110)
+
+    def test_mm1(self):
+        """
+        Ensure the M/M/1 model grows without bound until its maximum.
+        """
+        model = MM1Latency(10, maximum=500)
+        self.assertEqual(model(0.0), 10)
+        self.assertEqual(model(0.5), 20)
+        self.assertEqual(model(0.9), 100)
+        self.assertEqual(model(0.999), 500)
+        self.assertEqual(model(1.0), 500)
+
+    def test_piecewise(self):
+        """
+        Ensure the piecewise model looks up the step of the utilization.
+        """
+        model = PiecewiseLatency(10, table=[[0.9, 50], [0.5, 20]])
+        self.assertEqual(model(0.2), 10)
+        self.assertEqual(model(0.5), 20)
+        self.assertEqual(model(0.89), 20)
+        self.assertEqual(model(0.95), 50)
+
+        with self.assertRaises(ImproperlyConfigured):
+            PiecewiseLatency(10, table=[])
+
+    def test_create(self):
+        """
+        Ensure latency models are created by name.
+        """
+        self.assertIsInstance(create_latency_model(10, 'mm1'), MM1Latency)
+        with self.assertRaises(UnknownType):
+            create_latency_model(10, 'quadratic')
+
+    def test_network_latency(self):
+        """
+        Ensure the network latency is updated as its bandwidth changes.
+        """
+        env = simpy.Environment()
+        network = Network(
+            env, capacity=100, base_latency=10,
+            latency_model=LinearLatency(10, slope=100),
+        )
+
+        self.assertEqual(network.latency, 10)
+        network.send(50)
+        self.assertEqual(network.utilization, 0.5)
+        self.assertEqual(network.latency, 60)
+        network.recv(50)
+        self.assertEqual(network.latency, 10)
@@ -0,0 +1,130 @@
+# tests.test_logger
+# Tests for the level gating of the simulation loggers.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Tue Jan 19 10:24:51 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_logger.py [] benjamin@bengfort.com $
+
+"""
+Tests for the level gating of the simulation loggers.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import logging
+import unittest
+
+from gvas.config import settings
+from gvas.utils.logger import SimulationLogger, SilentLogger, LoggingMixin
+
+##########################################################################
+## Mocks
+##########################################################################
+
+class Formatted(object):
+    """
+    A message argument that counts how many times it is formatted.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "formatted"
+
+
+class RecordingHandler(logging.Handler):
+    """
+    Formats and keeps every record it handles.
+    """
+
+    def __init__(self):
+        super(RecordingHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.format(record)
+        self.records.append(record)
+
+
+class MockProcess(LoggingMixin):
+
+    def __init__(self, env):
+        self.env = env
+
+##########################################################################
+## Logger Tests
+##########################################################################
+
+class SimulationLoggerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger('gvas.tests.logger')
+        self.logger.propagate = False
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        settings.logging.silent = False
+
+    def create(self, klass, level):
+        self.logger.setLevel(level)
+        return klass(self.env, logger=self.logger, user='tester')
+
+    def levels(self):
+        return [record.levelno for record in self.handler.records]
+
+    def test_below_level(self):
+        """
+        Ensure messages below the level are dropped without being formatted.
+        """
+        logger = self.create(SimulationLogger, logging.INFO)
+        arg = Formatted()
+
+        logger.debug("debug %s", arg)
+        self.assertEqual(arg.count, 0)
+        self.assertEqual(self.handler.records, [])
+
+        logger.info("info %s", arg)
+        logger.warning("warning %s", arg)
+        self.assertEqual(arg.count, 2)
+        self.assertEqual(self.levels(), [logging.INFO, logging.WARNING])
+        self.assertEqual(self.handler.records[0].getMessage(), "info formatted")
+        self.assertEqual(self.handler.records[0].user, 'tester')
+
+    def test_silent(self):
+        """
+        Ensure silent loggers drop debug and info messages but not warnings.
+        """
+        logger = self.create(SilentLogger, logging.DEBUG)
+        arg = Formatted()
+
+        logger.debug("debug %s", arg)
+        logger.info("info %s", arg)
+        self.assertEqual(arg.count, 0)
+        self.assertEqual(self.handler.records, [])
+
+        logger.warning("warning %s", arg)
+        logger.error("error %s", arg)
+        self.assertEqual(arg.count, 2)
+        self.assertEqual(self.levels(), [logging.WARNING, logging.ERROR])
+
+    def test_mixin(self):
+        """
+        Ensure the logging mixin uses a silent logger in silent simulations.
+        """
+        self.assertIsInstance(MockProcess(self.env).logger, SimulationLogger)
+        self.assertNotIsInstance(MockProcess(self.env).logger, SilentLogger)
+
+        settings.logging.silent = True
+        self.assertIsInstance(MockProcess(self.env).logger, SilentLogger)
@@ -0,0 +1,193 @@
+# tests.test_manager
+# Tests for the dispatch and balancing schedules of the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 28 14:06:37 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_manager.py [] benjamin@bengfort.com $
+
+"""
+Tests for the dispatch and balancing schedules of the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import unittest
+
+from gvas.config import settings
+from gvas.actors import ActorManager, CommunicationsManager
+from gvas.actors.routing import FirstPolicy, RoundRobinPolicy
+from gvas.actors.scaling import HeuristicAutoscaler, PIDAutoscaler
+from gvas.cluster import create_default_cluster
+from gvas.cluster.network import Message
+from gvas.sims.balance import BalanceActor
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Actor Manager Tests
+##########################################################################
+
+class ActorManagerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.env = simpy.Environment()
+        self.cluster = create_default_cluster(
+            self.env, node_count=2, cpus=2, memory=16
+        )
+
+    def tearDown(self):
+        settings.simulations.balance.dispatch = 'poll'
+        settings.simulations.balance.balance_interval = 1
+        settings.simulations.communications.dispatch = 'poll'
+        settings.simulations.balance.routing = 'first'
+        settings.simulations.balance.autoscaler = 'heuristic'
+        settings.simulations.balance.autoscale_gains = [0.05, 0.005, 0.0]
+
+    def create_manager(self):
+        manager = ActorManager(self.env, self.cluster)
+        for node in self.cluster.nodes:
+            for idx in xrange(node.cpus):
+                node.assign(BalanceActor(self.env, manager, ports=[idx+10]))
+        return manager
+
+    def stream(self, manager, count):
+        yield self.env.timeout(5)
+        for idx in xrange(count):
+            manager.route(Message(None, None, idx, 5, self.env.now, None))
+
+    def test_event_dispatch(self):
+        """
+        Ensure queued messages are dispatched as actors become available.
+        """
+        settings.simulations.balance.dispatch = 'event'
+        manager = self.create_manager()
+        self.env.process(self.stream(manager, 20))
+
+        self.env.run(until=6)
+        self.assertEqual(len(manager.queue), 20)
+
+        self.env.run(until=200)
+        self.assertEqual(len(manager.queue), 0)
+        self.assertEqual(self.cluster.get_routed_count(), 20)
+
+    def test_balance_interval(self):
+        """
+        Ensure the actors are balanced every balance interval.
+        """
+        settings.simulations.balance.balance_interval = 5
+        for dispatch in ('poll', 'event'):
+            settings.simulations.balance.dispatch = dispatch
+            self.setUp()
+            manager = self.create_manager()
+
+            balanced = []
+            manager.balance = lambda: balanced.append(self.env.now)
+            self.env.run(until=20)
+            self.assertEqual(balanced, [0, 5, 10, 15])
+
+    def test_local_routing(self):
+        """
+        Ensure actors put their address on the messages they send only if
+        the routing policy routes by the source of messages.
+        """
+        for routing, local in (('first', False), ('rack-local', True)):
+            settings.simulations.balance.routing = routing
+            self.setUp()
+            manager = self.create_manager()
+            actor = next(iter(self.cluster.nodes)).programs.values()[0]
+
+            routed = []
+            manager.route = routed.append
+            self.env.process(actor.send(Message(None, None, 1, 5, 0, None)))
+            self.env.run(until=5)
+
+            self.assertEqual(len(routed), 1)
+            self.assertEqual(routed[0].src, actor.address if local else None)
+
+    def test_hysteresis(self):
+        """
+        Ensure the hysteresis autoscaler scales the actors to the load.
+        """
+        settings.simulations.balance.autoscaler = 'hysteresis'
+        manager = self.create_manager()
+        self.env.process(self.stream(manager, 20))
+
+        self.env.run(until=5)
+        self.assertEqual(manager.active_count, 0)
+
+        self.env.run(until=8)
+        self.assertEqual(manager.active_count, 4)
+
+        self.env.run(until=200)
+        self.assertEqual(len(manager.queue), 0)
+        self.assertEqual(self.cluster.get_routed_count(), 20)
+        self.assertEqual(manager.active_count, 0)
+
+    def test_reconfigure_routing(self):
+        """
+        Ensure the routing policy is rebuilt when its settings change.
+        """
+        manager = self.create_manager()
+        self.env.run(until=2)
+        manager.activate(3)
+        self.env.run(until=3)
+        self.assertIsInstance(manager.policy, FirstPolicy)
+
+        policy = manager.policy
+        manager.reconfigure()
+        self.assertIs(manager.policy, policy)
+
+        settings.simulations.balance.routing = 'round-robin'
+        manager.reconfigure()
+        self.assertIsInstance(manager.policy, RoundRobinPolicy)
+        self.assertNotIn(policy.update, manager.registry.callbacks)
+        self.assertIn(manager.policy.update, manager.registry.callbacks)
+
+        # The new policy indexes the actors that are already available
+        self.assertEqual(len(manager.policy.indexed), 3)
+        self.assertEqual(manager.policy.indexed, dict(manager.registry.available))
+
+    def test_reconfigure_autoscaler(self):
+        """
+        Ensure the autoscaler is rebuilt when its settings change.
+        """
+        manager = self.create_manager()
+        self.assertIsInstance(manager.autoscaler, HeuristicAutoscaler)
+
+        autoscaler = manager.autoscaler
+        manager.reconfigure()
+        self.assertIs(manager.autoscaler, autoscaler)
+
+        settings.simulations.balance.autoscaler = 'pid'
+        manager.reconfigure()
+        self.assertIsInstance(manager.autoscaler, PIDAutoscaler)
+
+        settings.simulations.balance.autoscale_gains = [1.0, 0.0, 0.0]
+        manager.reconfigure()
+        self.assertEqual(manager.autoscaler.kp, 1.0)
+
+    def test_unknown_dispatch(self):
+        """
+        Ensure an unknown dispatch mode raises an exception.
+        """
+        settings.simulations.balance.dispatch = 'sometimes'
+        with self.assertRaises(UnknownType):
+            ActorManager(self.env, self.cluster)
+
+    def test_section(self):
+        """
+        Ensure each manager reads the settings of its own simulation.
+        """
+        settings.simulations.communications.dispatch = 'event'
+        self.assertEqual(ActorManager(self.env, self.cluster).dispatch_mode, 'poll')
+        self.assertEqual(CommunicationsManager(self.env, self.cluster).dispatch_mode, 'event')
+
+        settings.simulations.communications.dispatch = 'sometimes'
+        with self.assertRaises(UnknownType):
+            CommunicationsManager(self.env, self.cluster)
@@ -0,0 +1,159 @@
+# tests.test_pool
+# Tests for the array-backed message pool of the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Wed Jan 27 11:48:05 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_pool.py [] benjamin@bengfort.com $
+
+"""
+Tests for the array-backed message pool of the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+
+from gvas.actors.pool import MessagePool
+from gvas.cluster.network import Message, Address
+
+##########################################################################
+## Message Pool Tests
+##########################################################################
+
+class MessagePoolTests(unittest.TestCase):
+
+    def test_append_popleft(self):
+        """
+        Ensure messages come out of the pool in the order they went in.
+        """
+        pool = MessagePool(capacity=4)
+        src  = Address(1, 2, 10, 4)
+        for idx in xrange(10):
+            pool.append(Message(src if idx % 2 else None, None, idx, 5, idx, 'blue'))
+
+        self.assertEqual(len(pool), 10)
+        self.assertEqual(pool.popleft(), Message(None, None, 0, 5, 0, 'blue'))
+        self.assertEqual(pool.popleft(), Message(src, None, 1, 5, 1, 'blue'))
+        self.assertEqual([msg.value for msg in pool], range(2, 10))
+        self.assertEqual(len(pool), 8)
+
+    def test_ring(self):
+        """
+        Ensure rows wrap around the end of the buffer and it grows when full.
+        """
+        pool = MessagePool(capacity=4)
+        for idx in xrange(3):
+            pool.append(Message(None, None, idx, 5, idx, None))
+        pool.popleft()
+        pool.popleft()
+
+        rows = MessagePool(capacity=4)
+        for idx in xrange(3, 6):
+            rows.append(Message(None, None, idx, 5, idx, None))
+        pool.extend(rows.take())
+
+        self.assertEqual(pool.capacity, 4)
+        self.assertEqual([msg.value for msg in pool], [2, 3, 4, 5])
+
+        pool.append(Message(None, None, 6, 5, 6, None))
+        self.assertEqual([msg.value for msg in pool], [2, 3, 4, 5, 6])
+        self.assertEqual(pool.capacity, 8)
+
+    def test_take(self):
+        """
+        Ensure take empties the pool and can reverse the rows.
+        """
+        pool = MessagePool()
+        for idx, color in enumerate(('red', 'blue', 'red')):
+            pool.append(Message(None, None, idx, 5, idx, color))
+
+        rows = pool.take(reverse=True)
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(list(rows['sent']), [2, 1, 0])
+        self.assertEqual(
+            [msg.color for msg in pool.messages(rows)], ['red', 'blue', 'red']
+        )
+
+        with self.assertRaises(IndexError):
+            pool.popleft()
+
+    def test_reverse(self):
+        """
+        Ensure a reversed pool appends, pops and grows at its new end.
+        """
+        pool = MessagePool(capacity=4)
+        for idx in xrange(3):
+            pool.append(Message(None, None, idx, 5, idx, None))
+
+        pool.reverse()
+        self.assertEqual([msg.value for msg in pool], [2, 1, 0])
+
+        for idx in xrange(3, 6):
+            pool.append(Message(None, None, idx, 5, idx, None))
+        self.assertEqual([msg.value for msg in pool], [2, 1, 0, 3, 4, 5])
+        self.assertEqual(pool.capacity, 8)
+
+        pool.reverse()
+        pool.append(Message(None, None, 6, 5, 6, None))
+        self.assertEqual(pool.pop().value, 6)
+        self.assertEqual(pool.pop().value, 2)
+        self.assertEqual(pool.popleft().value, 5)
+        self.assertEqual([msg.value for msg in pool], [4, 3, 0, 1])
+        self.assertEqual(list(pool.column('sent')), [4, 3, 0, 1])
+        self.assertEqual(list(pool.take()['sent']), [4, 3, 0, 1])
+
+    def test_remove(self):
+        """
+        Ensure rows are removed from the middle of the pool in place.
+        """
+        for flip in (False, True):
+            pool = MessagePool(capacity=8)
+            for idx in xrange(6):
+                pool.append(Message(None, None, idx, 5, idx, None))
+            pool.popleft()
+            for idx in xrange(6, 9):
+                pool.append(Message(None, None, idx, 5, idx, None))
+
+            if flip:
+                pool.reverse()
+            values = [msg.value for msg in pool]
+
+            pool.remove([0, 2, 3])
+            del values[3], values[2], values[0]
+            self.assertEqual([msg.value for msg in pool], values)
+            self.assertEqual(pool.row(1)['value'], values[1])
+            self.assertEqual(len(pool), 5)
+
+    def test_round_trip(self):
+        """
+        Ensure values keep their type and sizes and sent times are integers.
+        """
+        pool = MessagePool()
+        values = [3, 2.5, 'payload', (1, 2)]
+        for idx, value in enumerate(values):
+            pool.append(Message(None, None, value, 5.0, idx, None))
+
+        messages = list(pool)
+        self.assertEqual([msg.value for msg in messages], values)
+        self.assertIsInstance(messages[0].value, int)
+        self.assertTrue(all(type(msg.size) is int for msg in messages))
+        self.assertTrue(all(type(msg.sent) is int for msg in messages))
+
+    def test_invalid(self):
+        """
+        Ensure messages the pool can't store are rejected when appended.
+        """
+        pool = MessagePool()
+        with self.assertRaises(ValueError):
+            pool.append(Message(None, None, 1, 5.5, 0, None))
+        with self.assertRaises(ValueError):
+            pool.append(Message(None, None, 1, 5, 0.25, None))
+        with self.assertRaises(TypeError):
+            pool.append(Message(None, None, 1, None, 0, None))
+        self.assertEqual(len(pool), 0)
@@ -0,0 +1,71 @@
+# tests.test_profiler
+# Tests for the event profiling of simulation environments.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 21 11:40:09 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_profiler.py [] benjamin@bengfort.com $
+
+"""
+Tests for the event profiling of simulation environments.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+
+from gvas.base import Environment, NamedProcess
+from gvas.profiler import ProfiledEnvironment, SCRIPT
+
+##########################################################################
+## Fixtures
+##########################################################################
+
+class Ticker(NamedProcess):
+
+    def __init__(self, env, delay):
+        self.delay = delay
+        self.ticks = []
+        super(Ticker, self).__init__(env)
+
+    def run(self):
+        while True:
+            self.ticks.append(self.env.now)
+            yield self.env.timeout(self.delay)
+
+##########################################################################
+## Profiler Tests
+##########################################################################
+
+class ProfiledEnvironmentTests(unittest.TestCase):
+
+    def test_profile(self):
+        """
+        Ensure events are counted per process without changing the run.
+        """
+        plain = Environment()
+        fast, slow = Ticker(plain, 1), Ticker(plain, 5)
+        plain.run(until=20)
+
+        env = ProfiledEnvironment()
+        pfast, pslow = Ticker(env, 1), Ticker(env, 5)
+        env.run(until=20)
+
+        self.assertEqual(pfast.ticks, fast.ticks)
+        self.assertEqual(pslow.ticks, slow.ticks)
+
+        profiler = env.profiler
+        self.assertEqual(profiler.processed['Ticker.run'], 24)
+        self.assertEqual(profiler.scheduled['Ticker.run'], 24)
+        self.assertEqual(profiler.scheduled[SCRIPT], 3)
+        self.assertGreater(profiler.events_per_second, 0)
+
+        report = profiler.report(top=1)
+        self.assertEqual(report['events'], profiler.events)
+        self.assertEqual(len(report['processes']), 1)
+        self.assertIn('Ticker.run', profiler.summary())
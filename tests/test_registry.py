@@ -0,0 +1,171 @@
+# tests.test_registry
+# Tests for the live actor state indices used by the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Jan 11 15:21:48 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_registry.py [] benjamin@bengfort.com $
+
+"""
+Tests for the live actor state indices used by the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import random
+import unittest
+
+from gvas.actors.registry import ActorIndex, ActorRegistry
+
+##########################################################################
+## Mock Actor
+##########################################################################
+
+class MockActor(object):
+
+    def __init__(self, id, active=False, ready=False, color=None):
+        self.id     = id
+        self.active = active
+        self.ready  = ready
+        self.color  = color
+
+##########################################################################
+## Registry Tests
+##########################################################################
+
+class ActorRegistryTests(unittest.TestCase):
+
+    def test_update_indices(self):
+        """
+        Ensure actors move between indices as their state changes.
+        """
+        registry = ActorRegistry()
+        actor = MockActor(1)
+
+        registry.update(actor)
+        self.assertEqual(len(registry), 1)
+        self.assertIn(1, registry.inactive)
+        self.assertNotIn(1, registry.available)
+
+        actor.active = True
+        actor.ready  = True
+        registry.update(actor)
+        self.assertNotIn(1, registry.inactive)
+        self.assertIn(1, registry.available)
+        self.assertIn(1, registry.ready)
+
+        actor.ready = False
+        registry.update(actor)
+        self.assertNotIn(1, registry.available)
+        self.assertNotIn(1, registry.ready)
+
+    def test_color_index(self):
+        """
+        Ensure available actors are indexed by their current color.
+        """
+        registry = ActorRegistry()
+        actor = MockActor(1, True, True, 'blue')
+
+        registry.update(actor)
+        self.assertIn(1, registry.colors['blue'])
+
+        actor.color = 'teal'
+        registry.update(actor)
+        self.assertNotIn(1, registry.colors['blue'])
+        self.assertIn(1, registry.colors['teal'])
+
+        actor.active = False
+        registry.update(actor)
+        self.assertNotIn(1, registry.colors['teal'])
+
+    def test_first(self):
+        """
+        Ensure first returns a bounded snapshot of an index.
+        """
+        registry = ActorRegistry()
+        for idx in xrange(10):
+            registry.update(MockActor(idx))
+
+        self.assertEqual(len(registry.first(registry.inactive)), 10)
+        self.assertEqual(len(registry.first(registry.inactive, 3)), 3)
+        self.assertEqual(registry.first(registry.available), [])
+
+    def test_last(self):
+        """
+        Ensure last returns a bounded snapshot of the end of an index.
+        """
+        actors   = [MockActor(idx) for idx in xrange(10)]
+        registry = ActorRegistry()
+        for actor in actors:
+            registry.update(actor)
+
+        self.assertEqual(registry.last(registry.inactive), actors)
+        self.assertEqual(registry.last(registry.inactive, 3), actors[7:])
+        self.assertEqual(registry.last(registry.available, 3), [])
+
+    def test_callback(self):
+        """
+        Ensure the callbacks are called with every updated actor.
+        """
+        updated  = []
+        registry = ActorRegistry(callbacks=[updated.append])
+        actor = MockActor(1)
+
+        registry.update(actor)
+        actor.active = True
+        registry.update(actor)
+        self.assertEqual(updated, [actor, actor])
+
+    def test_rank_order(self):
+        """
+        Ensure the indices iterate over actors in the order of the ranking.
+        """
+        actors   = [MockActor(idx) for idx in (9, 2, 17, 8, 1)]
+        registry = ActorRegistry(ranking=lambda: iter(actors))
+
+        for actor in reversed(actors):
+            registry.update(actor)
+        self.assertEqual(registry.inactive.keys(), [9, 2, 17, 8, 1])
+
+        for actor in actors[:3]:
+            actor.active = actor.ready = True
+            registry.update(actor)
+        actors[0].ready = False
+        registry.update(actors[0])
+
+        self.assertEqual(registry.first(registry.available), actors[1:3])
+        self.assertEqual(list(registry.colors[None]), [2, 17])
+        self.assertEqual(list(registry.inactive), [8, 1])
+
+        # Actors outside of the ranking are ranked after it
+        registry.update(MockActor(0))
+        self.assertEqual(list(registry.inactive), [8, 1, 0])
+
+    def test_index_order(self):
+        """
+        Ensure an index keeps the rank order as actors come and go.
+        """
+        rng     = random.Random(42)
+        ranks   = dict((idx, rng.random()) for idx in xrange(100))
+        ranking = sorted(ranks, key=ranks.get)
+        ranks   = dict((key, rank) for rank, key in enumerate(ranking))
+        index   = ActorIndex(ranks)
+        members = set()
+
+        for _ in xrange(1000):
+            key = rng.randrange(100)
+            if key in members:
+                index.discard(key)
+                members.discard(key)
+            else:
+                index.add(MockActor(key))
+                members.add(key)
+
+            expected = [key for key in ranking if key in members]
+            self.assertEqual(list(index), expected)
+        self.assertEqual(list(reversed(index)), expected[::-1])
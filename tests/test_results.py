@@ -0,0 +1,158 @@
+# tests.test_results
+# Tests for the results data structure and its serialization.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Wed Jan 13 11:32:05 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_results.py [] benjamin@bengfort.com $
+
+"""
+Tests for the results data structure and its serialization.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from StringIO import StringIO
+from gvas.results import Results, Column
+
+##########################################################################
+## Results Tests
+##########################################################################
+
+class ColumnTests(unittest.TestCase):
+
+    def test_growth(self):
+        """
+        Ensure a column grows beyond its preallocated capacity.
+        """
+        column = Column(capacity=4)
+        for idx in xrange(10):
+            column.append(idx)
+
+        self.assertEqual(len(column), 10)
+        self.assertGreaterEqual(len(column.data), 10)
+        self.assertEqual(column.values.tolist(), range(10))
+
+    def test_promotion(self):
+        """
+        Ensure an int column is promoted when a float is appended.
+        """
+        column = Column(capacity=4)
+        column.append(1)
+        self.assertEqual(column.values.dtype.kind, 'i')
+
+        column.append(1.5)
+        self.assertEqual(column.values.dtype.kind, 'f')
+        self.assertEqual(column.values.tolist(), [1.0, 1.5])
+
+    def test_fingerprint(self):
+        """
+        Ensure the digest of a column doesn't depend on when it is taken.
+        """
+        first, second = Column(), Column()
+        for idx in xrange(10):
+            first.append(idx)
+            first.fingerprint()
+            if idx == 4:
+                first.clear()
+            second.append(idx)
+
+        # Promotion after the ints were digested doesn't change the digest
+        first.append(1.5)
+        second.append(1.5)
+        self.assertEqual(first.fingerprint(), second.fingerprint())
+
+        second.append(2)
+        self.assertNotEqual(first.fingerprint(), second.fingerprint())
+
+
+class ResultsTests(unittest.TestCase):
+
+    def test_update(self):
+        """
+        Ensure updates are exposed as numpy arrays in the results.
+        """
+        results = Results(timesteps=5)
+        for idx in xrange(5):
+            results.update('backlog', idx * 2)
+
+        self.assertEqual(results.results['backlog'].tolist(), [0, 2, 4, 6, 8])
+        self.assertEqual(len(results.columns['backlog'].data), 5)
+
+    def test_dump_load(self):
+        """
+        Ensure results can be dumped to JSON and loaded again.
+        """
+        results = Results(simulation='TestSimulation', timesteps=3)
+        for idx in xrange(3):
+            results.update('utilization', idx)
+            results.update('latency', idx / 2.0)
+
+        fp = StringIO()
+        results.dump(fp)
+        fp.seek(0)
+
+        loaded = Results.load(fp)
+        self.assertEqual(loaded.simulation, 'TestSimulation')
+        self.assertEqual(loaded.results['utilization'].tolist(), [0, 1, 2])
+        self.assertEqual(loaded.results['latency'].tolist(), [0.0, 0.5, 1.0])
+
+    def test_dump_load_binary(self):
+        """
+        Ensure results can be dumped to npz and memory-mapped on load.
+        """
+        results = Results(simulation='TestSimulation', timesteps=3)
+        for idx in xrange(3):
+            results.update('utilization', idx)
+            results.update('latency', idx / 2.0)
+
+        tmpdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmpdir, 'results.npz')
+            with open(path, 'wb') as fp:
+                results.dump(fp)
+
+            with open(path, 'rb') as fp:
+                loaded = Results.load(fp)
+
+            self.assertEqual(loaded.simulation, 'TestSimulation')
+            self.assertEqual(loaded.timesteps, 3)
+            self.assertEqual(loaded.results['utilization'].tolist(), [0, 1, 2])
+            self.assertEqual(loaded.results['latency'].tolist(), [0.0, 0.5, 1.0])
+            self.assertIsNotNone(loaded.columns['latency'].data.base)
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def test_stream(self):
+        """
+        Ensure streamed results are flushed in chunks and can be loaded.
+        """
+        fp = StringIO()
+        fp.name = 'results.jsonl'
+
+        results = Results(simulation='TestSimulation', timesteps=10)
+        results.stream(fp, chunk=4)
+        for idx in xrange(10):
+            results.update('utilization', idx)
+
+        # Only the values since the last flush are kept in memory.
+        self.assertEqual(results.results['utilization'].tolist(), [8, 9])
+        results.close()
+
+        fp.seek(0)
+        self.assertEqual(len(fp.readlines()), 5)
+
+        fp.seek(0)
+        loaded = Results.load(fp)
+        self.assertEqual(loaded.simulation, 'TestSimulation')
+        self.assertEqual(loaded.results['utilization'].tolist(), range(10))
@@ -0,0 +1,245 @@
+# tests.test_routing
+# Tests for the routing policies of the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Fri Jan 29 14:21:50 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_routing.py [] benjamin@bengfort.com $
+
+"""
+Tests for the routing policies of the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import unittest
+
+from gvas.config import settings
+from gvas.actors.routing import ColorPolicy, create_policy
+from gvas.actors.registry import ActorRegistry
+from gvas.cluster.network import Message, Address
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Mocks
+##########################################################################
+
+class MockRack(object):
+
+    def __init__(self, id):
+        self.id = id
+
+
+class MockNode(object):
+
+    def __init__(self, id, rack):
+        self.id   = id
+        self.rack = rack
+
+
+class MockActor(object):
+
+    def __init__(self, id, node, active=True, ready=True, color=None):
+        self.id     = id
+        self.node   = node
+        self.active = active
+        self.ready  = ready
+        self.color  = color
+
+
+class MockManager(object):
+
+    def __init__(self):
+        self.env      = simpy.Environment()
+        self.conf     = settings.simulations.balance
+        self.registry = ActorRegistry()
+
+##########################################################################
+## Routing Policy Tests
+##########################################################################
+
+class RoutingPolicyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = MockManager()
+        self.racks   = [MockRack(1), MockRack(2)]
+        self.nodes   = [MockNode(idx, self.racks[idx // 2]) for idx in xrange(4)]
+        self.actors  = [MockActor(idx, self.nodes[idx // 2]) for idx in xrange(8)]
+
+    def create(self, name, **options):
+        policy = create_policy(self.manager, name, **options)
+        self.manager.registry.callbacks.append(policy.update)
+        for actor in self.actors:
+            self.manager.registry.update(actor)
+        return policy
+
+    def set(self, actor, active=True, ready=True):
+        actor.active = active
+        actor.ready  = ready
+        self.manager.registry.update(actor)
+
+    def message(self, src=None, value=1, color=None):
+        return Message(src, None, value, 5, 0, color)
+
+    def test_first(self):
+        """
+        Ensure first walks the available, then inactive actors, then None.
+        """
+        policy = self.create('first')
+        self.set(self.actors[1], ready=False)
+        self.set(self.actors[2], active=False, ready=False)
+        for actor in self.actors[4:]:
+            self.set(actor, ready=False)
+
+        chosen = [policy.select(self.message()) for _ in xrange(5)]
+        self.assertEqual(
+            [actor and actor.id for actor in chosen], [0, 3, 2, None, 0]
+        )
+
+        # Skipping continues the walk and counts the actors it takes
+        policy.reset()
+        self.assertEqual(policy.skip(2), 2)
+        self.assertIs(policy.select(self.message()), self.actors[2])
+
+        # Without available actors, skipping walks the inactive ones again
+        self.set(self.actors[0], ready=False)
+        self.set(self.actors[3], ready=False)
+        self.set(self.actors[5], active=False, ready=False)
+        policy.reset()
+
+        self.assertEqual(policy.skip(7), 5)
+        self.assertIs(policy.select(self.message()), self.actors[5])
+        self.assertEqual(policy.skip(3), 2)
+        self.assertIsNone(policy.select(self.message()))
+
+    def test_round_robin(self):
+        """
+        Ensure round robin routes to the available actors in turn.
+        """
+        policy = self.create('round-robin')
+        self.set(self.actors[1], ready=False)
+
+        chosen = [policy.select(self.message()).id for _ in xrange(9)]
+        self.assertEqual(chosen, [0, 2, 3, 4, 5, 6, 7, 0, 2])
+
+    def test_least_loaded(self):
+        """
+        Ensure least loaded routes to the node with the fewest busy actors.
+        """
+        policy = self.create('least-loaded')
+        for actor in self.actors[:5]:
+            self.set(actor, ready=False)
+
+        self.assertEqual(policy.select(self.message()).node.id, 3)
+        self.set(self.actors[6], ready=False)
+        self.set(self.actors[7], ready=False)
+        self.assertIs(policy.select(self.message()), self.actors[5])
+
+    def test_rack_local(self):
+        """
+        Ensure rack local routes to the rack the message was sent from.
+        """
+        policy = self.create('rack-local')
+        self.assertTrue(policy.local)
+
+        src = Address(2, 3, 10, 7)
+        self.assertEqual(policy.select(self.message(src)).node.rack.id, 2)
+        self.assertEqual(policy.select(self.message()).node.rack.id, 1)
+
+        for actor in self.actors[4:]:
+            self.set(actor, ready=False)
+        self.assertEqual(policy.select(self.message(src)).node.rack.id, 1)
+
+    def test_power_of_two(self):
+        """
+        Ensure power of two routes to the less loaded of its two choices.
+        """
+        policy = self.create('power-of-two')
+        for actor in self.actors[:7]:
+            if actor is not self.actors[0]:
+                self.set(actor, ready=False)
+
+        # Only actors 0 and 7 are available, and only 7 has a busy neighbor.
+        self.set(self.actors[1], active=False)
+        self.assertEqual(len(policy.actors), 2)
+        for _ in xrange(10):
+            self.assertIs(policy.select(self.message()), self.actors[0])
+
+    def test_consistent_hash(self):
+        """
+        Ensure messages with the same key go to the same available actor.
+        """
+        policy = self.create('consistent-hash', replicas=4)
+        self.assertEqual(len(policy.ring), 32)
+
+        owner = policy.select(self.message(color='teal'))
+        self.assertIs(policy.select(self.message(color='teal')), owner)
+
+        self.set(owner, ready=False)
+        self.assertEqual(len(policy.ring), 28)
+        other = policy.select(self.message(color='teal'))
+        self.assertIsNot(other, owner)
+
+        self.set(owner)
+        self.assertIs(policy.select(self.message(color='teal')), owner)
+
+    def test_inactive_fallback(self):
+        """
+        Ensure an inactive actor is selected if none are available.
+        """
+        policy = self.create('round-robin')
+        for actor in self.actors:
+            self.set(actor, ready=False)
+        self.assertIsNone(policy.select(self.message()))
+
+        self.set(self.actors[3], active=False, ready=False)
+        self.assertIs(policy.select(self.message()), self.actors[3])
+
+    def test_color(self):
+        """
+        Ensure messages are routed to available actors of their color.
+        """
+        for actor in self.actors:
+            actor.color = 'blue' if actor.id % 2 else 'red'
+
+        policy = ColorPolicy(self.manager, 'round-robin')
+        self.manager.registry.callbacks.append(policy.update)
+        for actor in self.actors:
+            self.manager.registry.update(actor)
+
+        chosen = [policy.select(self.message(color='blue')).id for _ in xrange(5)]
+        self.assertEqual(chosen, [1, 3, 5, 7, 1])
+
+        # An actor that switches colors is routed to by its new color
+        self.actors[0].color = 'blue'
+        self.manager.registry.update(self.actors[0])
+        chosen = [policy.select(self.message(color='blue')).id for _ in xrange(5)]
+        self.assertEqual(chosen, [3, 5, 7, 0, 1])
+        chosen = [policy.select(self.message(color='red')).id for _ in xrange(4)]
+        self.assertEqual(chosen, [2, 4, 6, 2])
+
+        # Without an available actor of the color, an inactive actor is chosen
+        self.assertIsNone(policy.select(self.message(color='green')))
+        self.set(self.actors[7], active=False, ready=False)
+        self.assertIs(policy.select(self.message(color='green')), self.actors[7])
+
+        # The first policy routes to the first available actor of the color
+        policy = ColorPolicy(self.manager, 'first')
+        self.assertIs(policy.select(self.message(color='red')), self.actors[2])
+        self.assertIs(policy.select(self.message(color='blue')), self.actors[0])
+
+        with self.assertRaises(UnknownType):
+            ColorPolicy(self.manager, 'random')
+
+    def test_unknown_policy(self):
+        """
+        Ensure an unknown policy raises an exception.
+        """
+        with self.assertRaises(UnknownType):
+            create_policy(self.manager, 'random')
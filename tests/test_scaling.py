@@ -0,0 +1,178 @@
+# tests.test_scaling
+# Tests for the autoscalers of the actor manager.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Mon Feb 01 15:32:08 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_scaling.py [] benjamin@bengfort.com $
+
+"""
+Tests for the autoscalers of the actor manager.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import simpy
+import unittest
+
+from confire import ImproperlyConfigured
+from gvas.config import settings
+from gvas.actors.scaling import create_autoscaler
+from gvas.exceptions import UnknownType
+
+##########################################################################
+## Mocks
+##########################################################################
+
+class MockManager(object):
+    """
+    Keeps counts of actors in place of a registry of them.
+    """
+
+    def __init__(self, actors=20, active=10, busy=5, backlog=0):
+        self.env = simpy.Environment()
+        self.conf = settings.simulations.balance
+        self.registry = range(actors)
+        self.active_count = active
+        self.busy_count = busy
+        self.queue = range(backlog)
+        self.balance_interval = 1
+        self.activations_requested = 0
+        self.route_count = 0
+        self.resets = 0
+
+    def activate(self, count):
+        self.active_count += count
+
+    def deactivate(self, count):
+        self.active_count -= count
+
+    def reset(self):
+        self.resets += 1
+
+##########################################################################
+## Autoscaler Tests
+##########################################################################
+
+class AutoscalerTests(unittest.TestCase):
+
+    def test_target_utilization(self):
+        """
+        Ensure the load is provisioned for at the target utilization.
+        """
+        manager = MockManager(busy=5, backlog=3)
+        scaler  = create_autoscaler(manager, 'target-utilization', utilization=0.5)
+        self.assertEqual(scaler.target(), 16)
+
+        self.assertEqual(scaler.balance(), 6)
+        self.assertEqual(manager.active_count, 16)
+        self.assertEqual(manager.resets, 1)
+
+        # The target is clamped to the number of actors
+        scaler.utilization = 0.25
+        self.assertEqual(scaler.balance(), 4)
+        self.assertEqual(manager.active_count, 20)
+
+    def test_ewma(self):
+        """
+        Ensure the predicted load moves toward the latest load.
+        """
+        manager = MockManager(busy=4)
+        scaler  = create_autoscaler(manager, 'ewma', alpha=0.5, utilization=1.0)
+        self.assertEqual(scaler.target(), 4)
+
+        manager.queue = range(8)
+        self.assertEqual(scaler.target(), 8)
+        self.assertEqual(scaler.target(), 10)
+
+    def test_pid(self):
+        """
+        Ensure the controller provisions for the backlog and its history.
+        """
+        manager = MockManager(busy=2, backlog=10)
+        scaler  = create_autoscaler(manager, 'pid', setpoint=0, gains=(0.5, 0.1, 0.0))
+        self.assertEqual(scaler.target(), 8)
+        self.assertEqual(scaler.target(), 9)
+
+        # The integral is clamped (anti-windup)
+        for _ in xrange(100):
+            scaler.target()
+        self.assertEqual(scaler.integral, 200)
+
+        manager.queue = []
+        self.assertEqual(scaler.target(), 22)
+
+    def test_hysteresis(self):
+        """
+        Ensure small changes are ignored and scaling waits for the cooldown.
+        """
+        manager = MockManager(active=10, busy=8)
+        scaler  = create_autoscaler(
+            manager, 'hysteresis', base='target-utilization',
+            tolerance=0.1, cooldown=(2, 10),
+        )
+        scaler.base.utilization = 1.0
+
+        # Within the tolerance
+        manager.busy_count = 11
+        self.assertEqual(scaler.target(), 10)
+
+        manager.busy_count = 14
+        self.assertEqual(scaler.balance(), 4)
+        self.assertEqual(scaler.scaled, 0)
+
+        # Scaling down waits for the down cooldown after scaling
+        manager.busy_count = 2
+        self.assertEqual(scaler.target(), 14)
+        manager.env.run(until=9)
+        self.assertEqual(scaler.target(), 14)
+        manager.env.run(until=10)
+        self.assertEqual(scaler.target(), 2)
+
+    def test_heuristic(self):
+        """
+        Ensure the heuristic autoscaler uses the manager's own balancing.
+        """
+        manager = MockManager()
+        balanced = []
+        manager._balance_up = lambda: balanced.append('up')
+        manager._balance_down = lambda: balanced.append('down')
+
+        scaler = create_autoscaler(manager, 'heuristic')
+        scaler.balance()
+        manager.activations_requested = 3
+        scaler.balance()
+        self.assertEqual(balanced, ['down', 'up'])
+
+    def test_improperly_configured(self):
+        """
+        Ensure autoscalers that cannot control the actors raise an exception.
+        """
+        invalid = (
+            ('target-utilization', {'utilization': 0}),
+            ('ewma', {'alpha': 0}),
+            ('ewma', {'alpha': 1.5}),
+            ('pid', {'gains': (0.5, -0.1, 0.0)}),
+            ('hysteresis', {'base': 'hysteresis'}),
+            ('hysteresis', {'base': 'heuristic'}),
+        )
+
+        for autoscaler, options in invalid:
+            with self.assertRaises(ImproperlyConfigured):
+                create_autoscaler(MockManager(), autoscaler, **options)
+
+        # Without an integral gain the integral isn't clamped
+        scaler = create_autoscaler(MockManager(), 'pid', gains=(0.5, 0.0, 0.0))
+        self.assertEqual(scaler.target(), 5)
+
+    def test_unknown_autoscaler(self):
+        """
+        Ensure an unknown autoscaler raises an exception.
+        """
+        with self.assertRaises(UnknownType):
+            create_autoscaler(MockManager(), 'magic')
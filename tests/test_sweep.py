@@ -0,0 +1,135 @@
+# tests.test_sweep
+# Tests for the expansion of parameter sweep specifications.
+#
+# Author:   Benjamin Bengfort <bengfort@cs.umd.edu>
+# Created:  Thu Jan 14 11:40:02 2016 -0500
+#
+# Copyright (C) 2016 University of Maryland
+# For license information, see LICENSE.txt
+#
+# ID: test_sweep.py [] benjamin@bengfort.com $
+
+"""
+Tests for the expansion of parameter sweep specifications.
+"""
+
+##########################################################################
+## Imports
+##########################################################################
+
+import unittest
+
+from gvas.sweep import Sweep, nest, expand, variants
+from gvas.exceptions import InvalidSweep
+
+##########################################################################
+## Sweep Tests
+##########################################################################
+
+class SweepSpecificationTests(unittest.TestCase):
+
+    def test_nest(self):
+        """
+        Ensure dotted keys are nested for the settings configuration.
+        """
+        conf = nest({
+            'random_seed': 7,
+            'defaults.cluster.size': 4,
+            'defaults.cluster.node_count': 16,
+        })
+
+        self.assertEqual(conf, {
+            'random_seed': 7,
+            'defaults': {'cluster': {'size': 4, 'node_count': 16}},
+        })
+
+    def test_expand(self):
+        """
+        Ensure the runs, grid, and seeds are expanded as a product.
+        """
+        overrides = expand({
+            'runs': [{'max_sim_time': 10}, {'max_sim_time': 20}],
+            'grid': {
+                'defaults.cluster.size': [1, 2],
+                'simulations.balance.spike_prob': [0.1, 0.2, 0.3],
+            },
+            'seeds': [1, 2],
+        })
+
+        self.assertEqual(len(overrides), 24)
+        self.assertEqual(overrides[0], {
+            'max_sim_time': 10,
+            'defaults.cluster.size': 1,
+            'simulations.balance.spike_prob': 0.1,
+            'random_seed': 1,
+        })
+        self.assertEqual(len(set(map(str, overrides))), 24)
+
+    def test_expand_empty(self):
+        """
+        Ensure an empty specification is a single run with no overrides.
+        """
+        self.assertEqual(expand({}), [{}])
+
+    def test_invalid(self):
+        """
+        Ensure invalid specifications raise an exception.
+        """
+        with self.assertRaises(InvalidSweep):
+            expand({'grdi': {}})
+
+        with self.assertRaises(InvalidSweep):
+            expand({'grid': {'defaults.cluster.size': 2}})
+
+    def test_variants(self):
+        """
+        Ensure variants are expanded and require a warmup timestep.
+        """
+        spec = {
+            'grid': {'defaults.cluster.size': [1, 2]},
+            'warmup': 10,
+            'variants': {'grid': {'simulations.balance.spike_prob': [0.1, 0.2]}},
+        }
+
+        self.assertEqual(len(expand(spec)), 2)
+        self.assertEqual(variants(spec), [
+            {'simulations.balance.spike_prob': 0.1},
+            {'simulations.balance.spike_prob': 0.2},
+        ])
+        self.assertEqual(variants({}), [{}])
+
+        with self.assertRaises(InvalidSweep):
+            variants({'variants': {'runs': [{}]}})
+
+        with self.assertRaises(InvalidSweep):
+            variants({'warmup': 10, 'variants': {'seeds': [1, 2]}})
+
+        # Settings that are only read at the start cannot be varied
+        with self.assertRaises(InvalidSweep):
+            variants({'warmup': 10, 'variants': {'runs': [{'random_seed': 2}]}})
+
+        with self.assertRaises(InvalidSweep):
+            variants({
+                'warmup': 10,
+                'variants': {'grid': {'simulations.balance.dispatch': ['poll', 'event']}},
+            })
+
+    def test_cached_warmup(self):
+        """
+        Ensure a warmup is only run for the variants that aren't cached.
+        """
+        spec = {
+            'grid': {'defaults.cluster.size': [1, 2]},
+            'warmup': 10,
+            'variants': {'grid': {'simulations.balance.spike_prob': [0.1, 0.2]}},
+        }
+
+        sweep = Sweep('balance', spec, workers=1)
+        self.assertEqual(len(sweep), 4)
+        self.assertEqual(len(sweep.tasks()), 2)
+
+        # All of the variants of the first warmup are cached
+        tasks = sweep.tasks(skip=set([0, 1, 3]))
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0][2], 10)
+        self.assertEqual(tasks[0][3], [(2, {'simulations.balance.spike_prob': 0.1})])